@@ -0,0 +1,65 @@
+import json
+
+import pytest
+
+from utils import dereference
+from utils import read
+from utils import write
+
+pytest.importorskip("msgpack")
+
+
+def test_dereferenced_round_trip(tmp_path, input_paths):
+    """
+    Assess if dereferenced statements written in the binary format are read back equal to their JSON content.
+    """
+    tables = {"statements"}
+    db = dereference.load_database(input_paths, tables=tables)
+    dereference.dereference_concurrently(db, tables=tables)
+    data = {
+        "about": read.json_records(file="referenced/about.json"),
+        "content": db.statements.records,
+    }
+    file = str(tmp_path / "statements.msgpack")
+    write.binary(data, file=file, quiet=True)
+    assert json.dumps(read.binary_records(file)) == json.dumps(data)
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        [1, 1.0, True, None, "1", {"1": 1}, {"1": 1.0}, {"1": True}],
+        {"a": [], "b": {}, "c": [[], {}], "é": "ünïcode"},
+        "text",
+        3.5,
+        None,
+    ],
+)
+def test_values_round_trip(data):
+    """
+    Assess if values that are equal in Python but not in JSON, such as 1, 1.0, and True, keep their types, and if
+    empty, nested, non-ASCII, and top level scalar values are decoded as encoded.
+    """
+    decoded = read.decode_binary(write.encode_binary(data))
+    assert json.dumps(decoded) == json.dumps(data)
+
+
+def test_shared_objects():
+    """
+    Assess if an object that appears several times is stored once and decoded as equal values.
+    """
+    gene = {"id": 0, "name": "ABL1"}
+    data = [{"gene": gene}, {"gene": gene}, {"gene": dict(gene)}]
+    decoded = read.decode_binary(write.encode_binary(data))
+    assert decoded == data
+    assert decoded[0]["gene"] is decoded[2]["gene"]
+
+
+def test_not_binary(tmp_path):
+    """
+    Assess if a file that is not in the binary format is rejected with a ValueError.
+    """
+    file = tmp_path / "not.msgpack"
+    file.write_bytes(write.msgpack.packb(["other", 1]))
+    with pytest.raises(ValueError):
+        read.binary_records(str(file))
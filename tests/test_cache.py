@@ -0,0 +1,86 @@
+import json
+import pathlib
+import shutil
+
+import pytest
+
+from utils import dereference
+from utils import read
+from utils.cache import BuildCache
+
+
+@pytest.fixture
+def copied_paths(tmp_path, input_paths):
+    paths = {}
+    for name, path in input_paths.items():
+        paths[name] = str(tmp_path / pathlib.Path(path).name)
+        shutil.copyfile(path, paths[name])
+    return paths
+
+
+def test_changed_input_invalidates_dependents(tmp_path, copied_paths):
+    """
+    Assess if changing one referenced file invalidates the cached tables that depend on it, and only those.
+    """
+    cache = BuildCache(directory=str(tmp_path / "cache"))
+    tables = {"diseases", "documents", "genes"}
+    db = dereference.load_database(copied_paths, cache=cache, tables=tables)
+    dereference.dereference_concurrently(db, tables=tables)
+    dereference.store_database(db, cache)
+    before = dereference.table_keys(
+        copied_paths, cache, tables=dereference.TABLE_CLASSES
+    )
+
+    genes = read.json_records(file=copied_paths["genes"])
+    genes[0]["name"] = f"{genes[0]['name']}-changed"
+    with open(copied_paths["genes"], "w") as fp:
+        json.dump(genes, fp, indent=2)
+
+    after = dereference.table_keys(
+        copied_paths, cache, tables=dereference.TABLE_CLASSES
+    )
+    changed = {
+        name for name in dereference.TABLE_CLASSES if before[name] != after[name]
+    }
+    assert changed == dereference.dependents({"genes"})
+
+    db = dereference.load_database(copied_paths, cache=cache, tables=tables)
+    from_cache = {
+        name
+        for name in dereference.required_tables(tables)
+        if getattr(db, name)._from_cache
+    }
+    assert from_cache == dereference.required_tables(tables) - {"genes"}
+    dereference.dereference_concurrently(db, tables=tables)
+    assert db.genes.records[0]["name"] == genes[0]["name"]
+
+
+def test_source_files_cover_imported_modules():
+    """
+    Assess if cache keys depend on the source of the modules that dereference.py imports, not only its own.
+    """
+    names = {pathlib.Path(path).name for path in dereference.source_files()}
+    assert {
+        "dereference.py",
+        "pagination.py",
+        "ranking.py",
+        "stats.py",
+        "therapy_index.py",
+    } <= names
+
+
+def test_unreadable_entry_is_a_miss(tmp_path):
+    """
+    Assess if a cache entry that cannot be unpickled, such as one that refers to a removed module, is treated as a
+    miss rather than raising.
+    """
+    cache = BuildCache(directory=str(tmp_path / "cache"))
+    cache.put("key", [{"id": 0}])
+    assert cache.get("key") == [{"id": 0}]
+    entry = tmp_path / "cache" / "resolved" / "key.pickle"
+    entry.write_bytes(
+        b"\x80\x04\x95\x1b\x00\x00\x00\x00\x00\x00\x00\x8c\x0emissing_module\x94\x8c\x05Thing\x94\x93\x94."
+    )
+    assert cache.get("key") is None
+    entry.write_bytes(b"\x80\x04K")
+    assert cache.get("key") is None
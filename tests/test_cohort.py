@@ -0,0 +1,50 @@
+import random
+
+import pytest
+
+from utils import cohort
+
+
+@pytest.fixture(scope="module")
+def samples(data):
+    rng = random.Random(0)
+    biomarker_ids = [record["id"] for record in data["biomarkers"]]
+    samples = {"none": set(), "all": set(biomarker_ids)}
+    for record in rng.sample(data["propositions"], 20):
+        biomarkers = set(record.get("biomarkers") or [])
+        samples[f"proposition-{record['id']}"] = biomarkers
+        samples[f"partial-{record['id']}"] = set(list(biomarkers)[1:])
+    for i in range(20):
+        samples[f"random-{i}"] = set(rng.sample(biomarker_ids, 10))
+    return samples
+
+
+def test_statements_match_set_logic(data, samples):
+    """
+    Assess if the statements that each sample satisfies are those whose proposition's biomarkers are all among the
+    sample's biomarkers, in the order of the statements table, whatever the block size.
+    """
+    propositions = {
+        record["id"]: set(record.get("biomarkers") or [])
+        for record in data["propositions"]
+    }
+    expected = {
+        sample: [
+            record["id"]
+            for record in data["statements"]
+            if propositions[record["proposition_id"]] <= biomarkers
+        ]
+        for sample, biomarkers in samples.items()
+    }
+    evaluator = cohort.Cohort(data)
+    assert evaluator.words > 1
+    assert evaluator.statements(samples) == expected
+    assert evaluator.statements(samples, block=7) == expected
+
+
+def test_unknown_biomarker(data):
+    """
+    Assess if a sample with a biomarker that does not exist is rejected with a KeyError.
+    """
+    with pytest.raises(KeyError):
+        cohort.Cohort(data).statements({"sample": [-1]})
@@ -0,0 +1,57 @@
+import copy
+import json
+
+from utils import populate_statement_description_from_indication as descriptions
+from utils import read
+
+
+def test_statement_descriptions_are_in_sync(data):
+    """
+    Assess if each statement associated with an indication has the description of its indication.
+    """
+    statements = copy.deepcopy(data["statements"])
+    changes = descriptions.sync_descriptions(statements, data["indications"])
+    assert not changes, (
+        f"Statement descriptions out of sync with indications: {[change['id'] for change in changes]}"
+    )
+
+
+def test_check_reports_stale_descriptions_without_writing(tmp_path):
+    """
+    Assess if check mode reports stale descriptions, skips statements without an indication or whose indication does
+    not exist, and leaves the statements file unchanged.
+    """
+    indications = [
+        {"id": 1, "description": "Current."},
+        {"id": 2, "description": "Unchanged."},
+    ]
+    statements = [
+        {"id": 0, "indication_id": 1, "description": "Stale."},
+        {"id": 1, "indication_id": 2, "description": "Unchanged."},
+        {"id": 2, "indication_id": None, "description": "No indication."},
+        {"id": 3, "indication_id": 9, "description": "Missing indication."},
+    ]
+    file = tmp_path / "statements.json"
+    file.write_text(json.dumps(statements, indent=2))
+
+    changes = descriptions.main(
+        statements=read.json_records(file=str(file)),
+        indications=indications,
+        file=str(file),
+        check=True,
+    )
+    assert changes == [
+        {"id": 0, "indication_id": 1, "old": "Stale.", "new": "Current."}
+    ]
+    assert read.json_records(file=str(file)) == statements
+
+
+def test_sync_is_idempotent():
+    """
+    Assess if syncing descriptions updates stale statements in place and a second sync changes nothing.
+    """
+    indications = [{"id": 1, "description": "Current."}]
+    statements = [{"id": 0, "indication_id": 1, "description": "Stale."}]
+    assert len(descriptions.sync_descriptions(statements, indications)) == 1
+    assert statements[0]["description"] == "Current."
+    assert descriptions.sync_descriptions(statements, indications) == []
@@ -0,0 +1,64 @@
+import copy
+
+from utils import diff
+
+
+def test_referenced_diff(data):
+    """
+    Assess if diffing two referenced trees reports added, removed, and modified records, and records that changed
+    only through a record they reference.
+    """
+    old = diff.Source(about={"release": "1"}, tables=data, referenced=True)
+    tables = copy.deepcopy(data)
+    tables["genes"][0]["name"] = "ABL1-changed"
+    tables["agents"].append({**tables["agents"][0], "id": 1000})
+    removed = tables["strengths"].pop()
+    new = diff.Source(about={"release": "2"}, tables=tables, referenced=True)
+
+    result = diff.diff(old, new)
+    assert result["about"] == [{"path": "release", "old": "1", "new": "2"}]
+    assert result["tables"]["genes"].modified == {
+        0: [{"path": "name", "old": "ABL1", "new": "ABL1-changed"}]
+    }
+    assert result["tables"]["agents"].added == [1000]
+    assert result["tables"]["strengths"].removed == [removed["id"]]
+    assert result["tables"]["biomarkers"].dependency_changed[12] == [["genes", 0]]
+    assert not result["tables"]["codings"]
+
+    summary = diff.summarize(result)
+    assert "genes: 0 added, 0 removed, 1 modified" in summary
+    assert "  ~ 0: name" in summary
+    assert "  + 1000" in summary
+    assert "codings" not in summary
+    assert set(diff.to_dict(result)["tables"]) == {
+        name for name, table in result["tables"].items() if table
+    }
+
+
+def test_identical_trees(data):
+    """
+    Assess if diffing a referenced tree with itself reports no differences.
+    """
+    source = diff.Source(about=None, tables=data, referenced=True)
+    assert diff.summarize(diff.diff(source, source)) == "No differences."
+
+
+def test_dereferenced_embedded_changes():
+    """
+    Assess if statements of a dereferenced output whose only changes are within embedded records are reported as
+    changed through dependencies rather than modified.
+    """
+    old = [
+        {"id": 0, "description": "a", "proposition": {"id": 0, "predicate": "x"}},
+        {"id": 1, "description": "b", "proposition": {"id": 1, "predicate": "x"}},
+    ]
+    new = copy.deepcopy(old)
+    new[0]["proposition"]["predicate"] = "y"
+    new[1]["description"] = "c"
+    result = diff.diff(
+        diff.Source(about=None, tables={"statements": old}, referenced=False),
+        diff.Source(about=None, tables={"statements": new}, referenced=False),
+    )
+    statements = result["tables"]["statements"]
+    assert statements.dependency_changed == {0: ["proposition"]}
+    assert list(statements.modified) == [1]
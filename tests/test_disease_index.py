@@ -0,0 +1,125 @@
+import json
+import random
+
+import pytest
+
+from utils import disease_index
+
+
+def brute_force_descendants(parents: dict[str, set[str]], code: str) -> set[str]:
+    """
+    Returns the code and every code that reaches it by following parents, one code at a time.
+    """
+    return {
+        other
+        for other in parents
+        if other == code or code in brute_force_ancestors(parents, other)
+    }
+
+
+def brute_force_ancestors(parents: dict[str, set[str]], code: str) -> set[str]:
+    ancestors = set()
+    pending = list(parents[code])
+    while pending:
+        parent = pending.pop()
+        if parent not in ancestors:
+            ancestors.add(parent)
+            pending.extend(parents[parent])
+    return ancestors
+
+
+def test_descendant_closure_matches_brute_force():
+    """
+    Assess if the descendant closure of a random hierarchy, where codes may have several parents, includes each code
+    itself and exactly the codes that reach it through their parents.
+    """
+    rng = random.Random(0)
+    codes = [f"C{i}" for i in range(60)]
+    # Parents always come earlier in the list, so the hierarchy has no cycles
+    parents = {
+        code: set(rng.sample(codes[:i], k=min(i, rng.randint(0, 3))))
+        for i, code in enumerate(codes)
+    }
+    closure = disease_index.descendant_closure(parents)
+    assert set(closure) == set(codes)
+    for code in codes:
+        assert closure[code] == brute_force_descendants(parents, code), code
+
+
+def test_cycle_raises():
+    """
+    Assess if a hierarchy with a cycle raises a ValueError rather than looping.
+    """
+    with pytest.raises(ValueError, match="Cycle"):
+        disease_index.descendant_closure({"A": {"C"}, "B": {"A"}, "C": {"B"}})
+
+
+def test_hierarchy_formats(tmp_path):
+    """
+    Assess if hierarchies read from a TSV file, a list of records, and a dictionary of parents are the same.
+    """
+    expected = {"NSCLC": {"LUNG"}, "LUAD": {"NSCLC"}, "LUNG": set()}
+    tsv = tmp_path / "hierarchy.tsv"
+    tsv.write_text("code\tparent\n# comment\nNSCLC\tLUNG\nLUAD\tNSCLC\n")
+    records = tmp_path / "records.json"
+    records.write_text(
+        json.dumps(
+            [
+                {"code": "NSCLC", "parent": "LUNG"},
+                {"code": "LUAD", "parent": "NSCLC"},
+                {"code": "LUNG", "parent": None},
+            ]
+        )
+    )
+    mapping = tmp_path / "mapping.json"
+    mapping.write_text(json.dumps({"NSCLC": ["LUNG"], "LUAD": "NSCLC"}))
+    for path in [tsv, records, mapping]:
+        assert disease_index.read_hierarchy(str(path)) == expected, path.name
+
+
+def statements_on(data: dict, coding_ids: set[str]) -> set[int]:
+    """
+    Returns statements whose disease is coded, by its primary coding or a mapping, by any of the coding ids.
+    """
+    mapping_codings = {
+        mapping["id"]: mapping["coding_id"] for mapping in data["mappings"]
+    }
+    diseases = {
+        disease["id"]
+        for disease in data["diseases"]
+        if (
+            {disease["primary_coding_id"]}
+            | {mapping_codings[m] for m in disease.get("mappings", [])}
+        )
+        & coding_ids
+    }
+    propositions = {
+        proposition["id"]
+        for proposition in data["propositions"]
+        if proposition["conditionQualifier_id"] in diseases
+    }
+    return {
+        statement["id"]
+        for statement in data["statements"]
+        if statement["proposition_id"] in propositions
+    }
+
+
+def test_statements_of_descendants(data):
+    """
+    Assess if a query returns the statements on the queried disease and on every disease that descends from it, and
+    only the exact disease without a hierarchy.
+    """
+    hierarchy = {"LUNG": set(), "NSCLC": {"LUNG"}, "LUAD": {"NSCLC"}, "SCLC": {"LUNG"}}
+    index = disease_index.DiseaseIndex.from_tables(
+        data, hierarchies={"oncotree": hierarchy}
+    )
+    flat = disease_index.DiseaseIndex.from_tables(data)
+    closure = disease_index.descendant_closure(hierarchy)
+    for code, descendants in closure.items():
+        expected = statements_on(data, {f"oncotree:{value}" for value in descendants})
+        assert index.statements(f"oncotree:{code}") == expected, code
+        assert index.statements(code.lower()) == expected, code
+    assert index.statements("oncotree:LUNG") >= index.statements("oncotree:NSCLC")
+    assert flat.statements("oncotree:NSCLC") == statements_on(data, {"oncotree:NSCLC"})
+    assert index.statements("oncotree:NSCLC")
@@ -0,0 +1,144 @@
+import collections
+import random
+
+import numpy
+import pytest
+
+from utils import graph
+
+
+@pytest.fixture(scope="module")
+def referenced_graph(data):
+    return graph.Graph.from_tables(data)
+
+
+@pytest.fixture(scope="module")
+def edges(data):
+    """
+    Every reference between records as sets of `(table, id)` pairs, forward from each record to the records it
+    references and in reverse.
+    """
+    forward = collections.defaultdict(set)
+    reverse = collections.defaultdict(set)
+    for source, key, target in graph.relation_keys():
+        for record in data[source]:
+            value = record.get(key)
+            values = (
+                [] if value is None else value if isinstance(value, list) else [value]
+            )
+            for target_id in values:
+                forward[(source, record["id"])].add((target, target_id))
+                reverse[(target, target_id)].add((source, record["id"]))
+    return forward, reverse
+
+
+def closure(start: set, adjacency: dict) -> set:
+    found = set(start)
+    pending = list(start)
+    while pending:
+        for node in adjacency.get(pending.pop(), ()):
+            if node not in found:
+                found.add(node)
+                pending.append(node)
+    return found
+
+
+def sample_ids(data: dict, table: str, k: int = 5) -> list:
+    return random.Random(table).sample([record["id"] for record in data[table]], k)
+
+
+def test_walk_from_genes_to_statements(data, referenced_graph):
+    """
+    Assess if walking from genes to statements through biomarkers and propositions returns the statements found by
+    joining the referenced tables.
+    """
+    gene_ids = sample_ids(data, "genes")
+    biomarkers = {
+        record["id"]
+        for record in data["biomarkers"]
+        if set(record.get("genes", [])) & set(gene_ids)
+    }
+    propositions = {
+        record["id"]
+        for record in data["propositions"]
+        if set(record["biomarkers"]) & biomarkers
+    }
+    expected = {
+        record["id"]
+        for record in data["statements"]
+        if record["proposition_id"] in propositions
+    }
+    steps = [
+        "~biomarkers.genes",
+        "~propositions.biomarkers",
+        "~statements.proposition_id",
+    ]
+    assert set(referenced_graph.walk("genes", gene_ids, steps)) == expected
+
+
+def test_walk_forward_and_invalid_steps(data, referenced_graph):
+    """
+    Assess if a relation is followed forward to the records it references, and a step that does not start from the
+    current table raises.
+    """
+    statements = {record["id"]: record for record in data["statements"]}
+    statement_ids = sample_ids(data, "statements")
+    assert set(
+        referenced_graph.walk("statements", statement_ids, ["statements.reportedIn"])
+    ) == {document for i in statement_ids for document in statements[i]["reportedIn"]}
+    with pytest.raises(ValueError):
+        referenced_graph.walk("genes", [0], ["statements.proposition_id"])
+
+
+@pytest.mark.parametrize(
+    "table, target",
+    [
+        ("genes", "diseases"),
+        ("therapies", "diseases"),
+        ("diseases", "therapies"),
+        ("codings", "statements"),
+        ("documents", "genes"),
+    ],
+)
+def test_related_matches_set_logic(data, referenced_graph, edges, table, target):
+    """
+    Assess if related records are those referenced, directly or transitively, by the statements that reference the
+    starting records, directly or transitively.
+    """
+    forward, reverse = edges
+    found = set()
+    for record_id in sample_ids(data, table):
+        statements = {
+            node
+            for node in closure({(table, record_id)}, reverse)
+            if node[0] == "statements"
+        }
+        expected = {
+            node_id for name, node_id in closure(statements, forward) if name == target
+        }
+        assert set(referenced_graph.related(table, [record_id], target)) == expected
+        found |= expected
+    assert found
+
+
+def test_npz_round_trip(tmp_path, data, referenced_graph):
+    """
+    Assess if a graph saved to and loaded from a `.npz` file has the same ids, with integer and string ids kept
+    apart, the same relations, and the same traversals.
+    """
+    file = str(tmp_path / "graph.npz")
+    referenced_graph.save(file)
+    loaded = graph.Graph.load(file)
+    assert loaded.ids == referenced_graph.ids
+    for table, ids in loaded.ids.items():
+        assert [type(i) for i in ids] == [type(i) for i in referenced_graph.ids[table]]
+    assert loaded.relations.keys() == referenced_graph.relations.keys()
+    for name, relation in loaded.relations.items():
+        original = referenced_graph.relations[name]
+        assert (relation.source, relation.target) == (original.source, original.target)
+        assert numpy.array_equal(relation.indptr, original.indptr)
+        assert numpy.array_equal(relation.indices, original.indices)
+    gene_ids = sample_ids(data, "genes")
+    assert loaded.related("genes", gene_ids, "therapies") == (
+        referenced_graph.related("genes", gene_ids, "therapies")
+    )
@@ -0,0 +1,100 @@
+import pytest
+
+from utils import match
+
+
+@pytest.fixture(scope="module")
+def matcher(data):
+    return match.Matcher(data)
+
+
+def test_somatic_variant(matcher, data):
+    """
+    Assess if a somatic variant matches its biomarker by protein change or by genomic position, and if the match
+    reaches the propositions whose biomarkers are all satisfied and their statements.
+    """
+    by_protein_change = match.Alteration(
+        type=match.SOMATIC_VARIANT, gene="braf", protein_change="V600E"
+    )
+    by_position = match.Alteration(
+        type=match.SOMATIC_VARIANT,
+        gene="BRAF",
+        chromosome="chr7",
+        start_position=140453136,
+        reference_allele="A",
+        alternate_allele="T",
+    )
+    for alteration in (by_protein_change, by_position):
+        biomarkers = matcher.biomarkers([alteration])
+        assert 16 in biomarkers  # BRAF p.V600E
+        assert 17 not in biomarkers  # BRAF p.V600K
+
+    result = matcher.match([by_protein_change])
+    propositions = [
+        record["id"]
+        for record in data["propositions"]
+        if set(record.get("biomarkers") or []) <= set(result.biomarkers)
+        and record.get("biomarkers")
+    ]
+    assert result.propositions == sorted(propositions)
+    assert result.statements == sorted(
+        record["id"]
+        for record in data["statements"]
+        if record["proposition_id"] in propositions
+    )
+
+
+@pytest.mark.parametrize("gene, partner", [("BCR", "ABL1"), ("ABL1", "BCR")])
+def test_fusion_in_either_order(matcher, gene, partner):
+    """
+    Assess if a fusion matches its biomarker whichever partner is given first, and if a biomarker of the fusion's
+    absence is not satisfied by it, even for a complete profile.
+    """
+    alteration = match.Alteration(
+        type=match.REARRANGEMENT,
+        gene=gene,
+        partner=partner,
+        rearrangement_type="Fusion",
+    )
+    assert 12 in matcher.biomarkers([alteration])  # BCR::ABL1
+    assert 15 not in matcher.biomarkers([alteration], complete=True)  # no BCR::ABL1
+    assert 15 in matcher.biomarkers([], complete=True)
+    assert 12 not in matcher.biomarkers(
+        [match.Alteration(type=match.REARRANGEMENT, gene=gene, partner="EML4")]
+    )
+
+
+def test_fusion_with_any_partner(matcher):
+    """
+    Assess if a fusion matches a biomarker of its gene fused to any partner, such as v::ALK for EML4::ALK.
+    """
+    for gene, partner in (("EML4", "ALK"), ("ALK", "EML4")):
+        alteration = match.Alteration(
+            type=match.REARRANGEMENT, gene=gene, partner=partner
+        )
+        assert 8 in matcher.biomarkers([alteration])
+
+
+@pytest.mark.parametrize(
+    "unit, value, expected",
+    [
+        ("Tumor Proportion Score (TPS)", 0.6, {33, 39, 71}),
+        ("Tumor Proportion Score (TPS)", 0.05, {33, 71}),
+        ("Tumor Proportion Score (TPS)", 0.005, {57}),
+        ("Combined Positive Score (CPS)", "7", {42, 56}),
+    ],
+)
+def test_protein_expression_threshold(matcher, unit, value, expected):
+    """
+    Assess if a PD-L1 result matches the biomarkers whose thresholds it meets, in the same unit, including
+    thresholds equal to the result.
+    """
+    alteration = match.Alteration.from_dict(
+        {
+            "type": match.PROTEIN_EXPRESSION,
+            "marker": "PD-L1",
+            "unit": unit,
+            "value": value,
+        }
+    )
+    assert set(matcher.match_alteration(alteration)) == expected
@@ -0,0 +1,130 @@
+import os
+
+from utils import mentions
+
+
+def find(automaton, text):
+    return [(text[start:end], value) for start, end, value in automaton.find(text)]
+
+
+def test_overlapping_patterns():
+    """
+    Assess if patterns that share prefixes and suffixes, such as he, she, his, and hers, are each found as whole
+    words, and not within one another.
+    """
+    automaton = mentions.Automaton()
+    for pattern in ("he", "she", "his", "hers"):
+        automaton.add(pattern, pattern)
+    assert find(automaton, "she said hers, not his; he") == [
+        ("she", "she"),
+        ("hers", "hers"),
+        ("his", "his"),
+        ("he", "he"),
+    ]
+    assert find(automaton, "ushers") == []
+
+
+def test_overlapping_phrases():
+    """
+    Assess if a pattern that ends within a longer pattern is found along with it.
+    """
+    automaton = mentions.Automaton()
+    automaton.add("non-small cell lung cancer", "nsclc")
+    automaton.add("lung cancer", "lung")
+    assert [value for _, value in find(automaton, "Non-Small Cell Lung Cancer")] == [
+        "nsclc",
+        "lung",
+    ]
+
+
+def test_case_sensitive_patterns():
+    """
+    Assess if case sensitive patterns, such as the gene MET, only match text of the same case, while other patterns
+    match any case.
+    """
+    automaton = mentions.Automaton()
+    automaton.add("MET", "gene", case_sensitive=True)
+    automaton.add("Capmatinib", "drug")
+    assert find(automaton, "MET exon 14 skipping, treated with CAPMATINIB") == [
+        ("MET", "gene"),
+        ("CAPMATINIB", "drug"),
+    ]
+    assert find(automaton, "patients who have met the criteria") == []
+
+
+def linked_records():
+    return {
+        "genes": [{"id": 0, "name": "EGFR"}, {"id": 1, "name": "MET"}],
+        "biomarkers": [{"id": 0, "genes": [0]}],
+        "therapies": [
+            {"id": 0, "name": "Osimertinib"},
+            {"id": 1, "name": "Capmatinib"},
+        ],
+        "therapy_groups": [],
+        "documents": [
+            {"id": "doc:tagrisso", "drug_name_brand": "Tagrisso"},
+            {"id": "doc:other", "drug_name_brand": "Tabrecta"},
+        ],
+        "propositions": [{"id": 0, "therapy_id": 0, "biomarkers": [0]}],
+        "indications": [
+            {
+                "id": "ind:0",
+                "document_id": "doc:tagrisso",
+                "indication": "TAGRISSO is indicated for EGFR mutated NSCLC.",
+            },
+        ],
+        "statements": [
+            {
+                "id": 0,
+                "indication_id": "ind:0",
+                "proposition_id": 0,
+                "reportedIn": ["doc:tagrisso"],
+                "description": "Capmatinib is indicated for MET altered NSCLC.",
+            },
+        ],
+    }
+
+
+def test_finding_kinds():
+    """
+    Assess if a text that mentions its document's drug and its genes has no findings, and if one that mentions
+    neither, but mentions other drugs and genes, reports each kind of finding.
+    """
+    findings = mentions.lint(linked_records())
+    assert [(f.table, f.record_id, f.kind, f.names) for f in findings] == [
+        ("statements", 0, "missing_drug", ["tagrisso"]),
+        ("statements", 0, "missing_gene", ["egfr"]),
+        ("statements", 0, "unexpected_drug", ["capmatinib"]),
+        ("statements", 0, "unexpected_gene", ["met"]),
+    ]
+
+
+def test_baseline(tmp_path):
+    """
+    Assess if findings in a baseline are not reported again, while new names of an accepted finding are.
+    """
+    records = linked_records()
+    path = os.path.join(tmp_path, "baseline.tsv")
+    mentions.write_baseline(mentions.lint(records), path)
+    assert (
+        mentions.new_findings(mentions.lint(records), mentions.read_baseline(path))
+        == []
+    )
+
+    records["genes"].append({"id": 2, "name": "ALK"})
+    records["statements"][0]["description"] += " Not for ALK fusions."
+    new = mentions.new_findings(mentions.lint(records), mentions.read_baseline(path))
+    assert [(f.kind, f.names) for f in new] == [("unexpected_gene", ["alk"])]
+
+
+def test_checked_in_baseline(data):
+    """
+    Assess if the curated text introduces no findings beyond those accepted in mentions/baseline.tsv.
+    """
+    found = mentions.new_findings(
+        mentions.lint(data), mentions.read_baseline(mentions.BASELINE)
+    )
+    assert not found, "\n".join(
+        f"{f.table}:{f.record_id}:{f.field}: {f.kind}: {', '.join(f.names)}"
+        for f in found
+    )
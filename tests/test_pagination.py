@@ -0,0 +1,83 @@
+import pytest
+
+from utils import dereference
+from utils import pagination
+
+IDS = [5, "b", 2, "a", 10, 1]
+
+
+def test_traversal_in_id_order():
+    """
+    Assess if paging through records visits each one once, integer ids in numeric order and then string ids in
+    lexical order, and if a listing resumes after the record its cursor was issued for.
+    """
+    index = pagination.IdIndex(IDS)
+    visited = []
+    cursor = None
+    while True:
+        page, cursor = index.page(cursor, limit=2)
+        visited.extend(IDS[position] for position in page)
+        if cursor is None:
+            break
+    assert visited == [1, 2, 5, 10, "a", "b"]
+    assert [IDS[position] for position in index.iterate()] == visited
+
+    cursor = pagination.encode_cursor(5)
+    assert [IDS[position] for position in index.iterate(cursor)] == [10, "a", "b"]
+    # resuming after a removed record continues from the next id
+    assert [
+        IDS[position] for position in index.iterate(pagination.encode_cursor(3))
+    ] == [5, 10, "a", "b"]
+
+
+def test_filtered_pages():
+    """
+    Assess if paging through a subset of records, given by their sorted ranks, returns only those records in id order.
+    """
+    index = pagination.IdIndex(IDS)
+    ranks = index.ranks_of([IDS.index("b"), IDS.index(1), IDS.index(10)])
+    page, cursor = index.page(limit=2, ranks=ranks)
+    assert [IDS[position] for position in page] == [1, 10]
+    page, cursor = index.page(cursor, limit=2, ranks=ranks)
+    assert ([IDS[position] for position in page], cursor) == (["b"], None)
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "not a cursor",
+        "e30",  # {}
+        pagination.encode_cursor(1)[:-2],
+        pagination.encode_cursor([1]),
+        "WzIsMV0",  # [2,1], another version
+    ],
+)
+def test_invalid_cursors(cursor):
+    """
+    Assess if malformed cursors, and cursors of another version, are rejected with a ValueError.
+    """
+    with pytest.raises(ValueError):
+        pagination.IdIndex(IDS).page(cursor)
+
+
+def test_invalid_limit():
+    """
+    Assess if a limit that is not positive is rejected with a ValueError.
+    """
+    with pytest.raises(ValueError):
+        pagination.IdIndex(IDS).page(limit=0)
+
+
+def test_table_pages(input_paths):
+    """
+    Assess if paging through a table returns every record in id order.
+    """
+    db = dereference.load_database(input_paths, tables={"genes"})
+    items = []
+    page = db.genes.page(limit=100)
+    items.extend(page.items)
+    while page.next_cursor is not None:
+        page = db.genes.page(page.next_cursor, limit=100)
+        items.extend(page.items)
+    assert items == sorted(db.genes.records, key=lambda record: record["id"])
+    assert list(db.genes.iter_records()) == items
@@ -0,0 +1,74 @@
+import copy
+import random
+
+import pytest
+
+from utils import dereference
+from utils import ranking
+from utils import shards
+from utils.cache import BuildCache
+
+
+@pytest.fixture(scope="module")
+def statements(input_paths):
+    db = dereference.load_database(input_paths, tables={"statements"})
+    dereference.dereference_concurrently(db, tables={"statements"})
+    return db.statements
+
+
+def test_sort_key_is_stable(statements):
+    """
+    Assess if no two statements have equal sort keys, so that the rank order does not depend on the order statements
+    are added in.
+    """
+    keys = [ranking.sort_key(record) for record in statements.records]
+    assert len(set(keys)) == len(keys)
+
+    shuffled = list(statements.records)
+    random.Random(0).shuffle(shuffled)
+    assert ranking.rank(shuffled) == ranking.rank(statements.records)
+
+
+def test_missing_strength_sorts_last(statements):
+    """
+    Assess if a statement without an evidence strength is ranked after every statement with one.
+    """
+    record = copy.deepcopy(statements.records[0])
+    record["strength"] = None
+    record["id"] = -1
+    order = ranking.rank([record, *statements.records])["order"]
+    assert order[-1] == -1
+
+
+def test_entity_lists_are_in_rank_order(statements):
+    """
+    Assess if the statements of each gene, disease, and therapy are listed in rank order, and are exactly the
+    statements about that entity.
+    """
+    rankings = ranking.rank(statements.records)
+    expected = {kind: {} for kind in ranking.ENTITIES}
+    records = {record["id"]: record for record in statements.records}
+    for statement_id in rankings["order"]:
+        for kind, entities in shards.statement_entities(records[statement_id]).items():
+            for entity in entities:
+                expected[kind].setdefault(entity, []).append(statement_id)
+    for kind in ranking.ENTITIES:
+        assert rankings[kind] == expected[kind]
+
+
+def test_cached_statements_rank_as_built(tmp_path, input_paths, statements):
+    """
+    Assess if ranking statements loaded from the build cache, which have no rankings of their own, gives the rankings
+    computed while the statements were dereferenced.
+    """
+    assert statements.rankings.to_dict() == ranking.rank(statements.records)
+
+    cache = BuildCache(directory=str(tmp_path / "cache"))
+    db = dereference.load_database(input_paths, cache=cache, tables={"statements"})
+    dereference.dereference_concurrently(db, tables={"statements"})
+    dereference.store_database(db, cache)
+
+    cached = dereference.load_database(input_paths, cache=cache, tables={"statements"})
+    assert cached.statements._from_cache
+    assert cached.statements.rankings is None
+    assert ranking.rank(cached.statements.records) == statements.rankings.to_dict()
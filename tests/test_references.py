@@ -1,5 +1,6 @@
 import pytest
 
+from utils import identifiers
 from utils import json_utils
 
 def test_associated_indication_ids_are_valid(data):
@@ -39,3 +40,17 @@ def test_no_mismatch_between_document_for_indication_and_statement(data):
         f"  - Indication document: {indication['document_id']}"
         )
         assert indication['document_id'] in statement['reportedIn'], error_message
+
+def test_gene_names_resolve_to_one_gene(data):
+    """
+    Ensures that each gene name resolves to exactly one gene through the identifier index
+    """
+    index = identifiers.IdentifierIndex.from_tables(data)
+    for gene in data['genes']:
+        resolution = index.resolve(gene['name'])
+        error_message = (
+        f"Gene name does not resolve to exactly one gene.\n"
+        f"  - Gene ID: {gene['id']}\n"
+        f"  - Resolved genes: {resolution.genes if resolution else None}"
+        )
+        assert resolution is not None and resolution.genes == [gene['id']], error_message
@@ -0,0 +1,93 @@
+import json
+
+import pytest
+
+from utils import release
+
+
+@pytest.fixture
+def bundle(tmp_path):
+    blob = tmp_path / "moalmanac.json"
+    blob.write_text(json.dumps({"content": [{"id": 0}, {"id": 1}]}))
+    genes = tmp_path / "genes"
+    genes.mkdir()
+    for record_id in [1, 0]:
+        (genes / f"{record_id}.json").write_text(json.dumps({"id": record_id}))
+    output_dir = tmp_path / "release"
+    manifest = release.build_bundle(
+        output_dir=str(output_dir),
+        blobs=[str(blob)],
+        concepts=[("genes", str(genes))],
+        about={"version": "test"},
+        quiet=True,
+    )
+    return output_dir, manifest
+
+
+def rewrite_manifest(output_dir, manifest: dict) -> None:
+    (output_dir / release.MANIFEST).write_text(json.dumps(manifest))
+
+
+def test_bundle_round_trip(bundle):
+    """
+    Assess if a freshly built bundle verifies, lists every file with each available encoding, and combines a
+    concept's records into one table ordered by id.
+    """
+    output_dir, manifest = bundle
+    assert release.verify_bundle(str(output_dir)) == []
+    for name in ["moalmanac.json", "genes.json"]:
+        assert name in manifest["files"]
+        for encoding in release.available_encodings():
+            entry = manifest["files"][name + release.EXTENSIONS[encoding]]
+            assert entry["source"] == name
+            assert entry["encoding"] == encoding
+    assert json.loads((output_dir / "genes.json").read_text()) == [
+        {"id": 0},
+        {"id": 1},
+    ]
+
+
+def test_corrupted_files_are_reported(bundle):
+    """
+    Assess if a changed, truncated, or missing file is reported as a verification failure.
+    """
+    output_dir, manifest = bundle
+    content = (output_dir / "genes.json.gz").read_bytes()
+    (output_dir / "genes.json.gz").write_bytes(content[:-1] + bytes([content[-1] ^ 1]))
+    (output_dir / "moalmanac.json").write_text("{}")
+    (output_dir / "genes.json").unlink()
+    size = manifest["files"]["moalmanac.json"]["bytes"]
+    assert release.verify_bundle(str(output_dir)) == [
+        "genes.json: missing",
+        "genes.json.gz: checksum mismatch",
+        f"moalmanac.json: expected {size} bytes, found 2",
+    ]
+
+
+def test_variant_of_other_content_is_reported(bundle):
+    """
+    Assess if a compressed variant whose size and checksum match the manifest, but which does not decompress to its
+    source, is reported.
+    """
+    output_dir, manifest = bundle
+    content = release.compress(b"[]", "gzip", 9)
+    (output_dir / "genes.json.gz").write_bytes(content)
+    manifest["files"]["genes.json.gz"].update(
+        bytes=len(content), sha256=release.sha256(content)
+    )
+    rewrite_manifest(output_dir, manifest)
+    assert release.verify_bundle(str(output_dir)) == [
+        "genes.json.gz: does not decompress to genes.json"
+    ]
+
+
+def test_variant_without_source_is_reported(bundle):
+    """
+    Assess if a compressed variant whose source is not listed in the manifest is reported, rather than raising.
+    """
+    output_dir, manifest = bundle
+    del manifest["files"]["genes.json"]
+    rewrite_manifest(output_dir, manifest)
+    problems = release.verify_bundle(str(output_dir))
+    assert "genes.json.gz: source genes.json is not in the manifest" in problems
+    assert all(problem.startswith("genes.json.") for problem in problems)
@@ -0,0 +1,112 @@
+import itertools
+import random
+
+import pytest
+
+from utils import dereference
+
+
+def random_graph(seed: int, size: int = 10) -> dict[str, set[str]]:
+    """
+    Returns a random dependency graph without cycles, where tables only reference tables earlier in the list.
+    """
+    rng = random.Random(seed)
+    names = [f"t{i}" for i in range(size)]
+    return {
+        name: set(rng.sample(names[:i], k=min(i, rng.randint(0, 3))))
+        for i, name in enumerate(names)
+    }
+
+
+def chains(graph: dict[str, set[str]]) -> list[list[str]]:
+    """
+    Returns every chain of tables where each table references the one before it, by extending chains one table at a
+    time.
+    """
+    found = [[name] for name in graph]
+    pending = list(found)
+    while pending:
+        chain = pending.pop()
+        for name, references in graph.items():
+            if chain[-1] in references:
+                found.append(chain + [name])
+                pending.append(chain + [name])
+    return found
+
+
+def test_tables_follow_their_dependencies():
+    """
+    Assess if every table is ordered after the tables it references, for the tables of the database and for random
+    graphs.
+    """
+    graphs = [dereference.dependency_graph()] + [random_graph(i) for i in range(20)]
+    for graph in graphs:
+        order = dereference.topological_order(graph)
+        assert sorted(order) == sorted(graph)
+        for name, references in graph.items():
+            assert all(order.index(r) < order.index(name) for r in references), name
+
+
+@pytest.mark.parametrize(
+    "graph, cycle",
+    [
+        ({"a": set(), "b": {"c"}, "c": {"b"}}, {"b", "c"}),
+        ({"a": {"a"}, "b": set()}, {"a"}),
+        ({"a": {"c"}, "b": {"a"}, "c": {"b"}, "d": {"a"}}, {"a", "b", "c"}),
+    ],
+)
+def test_cycle_is_named(graph, cycle):
+    """
+    Assess if a graph with a cycle raises a ValueError naming only the tables in the cycle.
+    """
+    with pytest.raises(ValueError, match="Cycle") as error:
+        dereference.topological_order(graph)
+    names = str(error.value).split(": ")[1].split(" -> ")
+    assert names[0] == names[-1]
+    assert set(names) == cycle
+
+
+def test_cycle_raises_before_any_table_is_resolved(monkeypatch, data):
+    """
+    Assess if the scheduler checks the dependency graph for cycles before it resolves any table.
+    """
+    graph = dereference.dependency_graph()
+    graph["genes"] = graph["genes"] | {"statements"}
+    monkeypatch.setattr(dereference, "dependency_graph", lambda: graph)
+    db = dereference.build_database(data)
+    with pytest.raises(ValueError, match="Cycle"):
+        dereference.dereference_concurrently(db)
+    assert not any(getattr(db, name)._resolved for name in dereference.TABLE_CLASSES)
+
+
+def test_critical_path_matches_brute_force():
+    """
+    Assess if the critical path is a chain of dependent tables whose total duration is the longest of every chain.
+    """
+    for seed in range(20):
+        graph = random_graph(seed)
+        rng = random.Random(seed)
+        durations = {name: rng.random() for name in graph}
+        path = dereference.critical_path(graph, durations)
+        assert all(a in graph[b] for a, b in itertools.pairwise(path)), seed
+        longest = max(sum(durations[n] for n in chain) for chain in chains(graph))
+        assert sum(durations[n] for n in path) == pytest.approx(longest), seed
+
+
+def test_schedule_respects_dependencies(input_paths):
+    """
+    Assess if the scheduler resolves exactly the requested tables and their dependencies, starting each table only
+    after the tables it references are resolved.
+    """
+    db = dereference.load_database(input_paths, tables={"statements"})
+    schedule = dereference.dereference_concurrently(
+        db, workers=4, tables={"statements"}
+    )
+    graph = dereference.dependency_graph()
+    assert set(schedule.timings) == dereference.required_tables({"statements"})
+    for name, (start, _) in schedule.timings.items():
+        for reference in graph[name]:
+            assert schedule.timings[reference][1] <= start, (reference, name)
+    path = schedule.critical_path
+    assert path[-1] == "statements"
+    assert all(a in graph[b] for a, b in itertools.pairwise(path))
@@ -0,0 +1,118 @@
+import collections
+import math
+
+import pytest
+
+from utils import dereference
+from utils import search
+
+QUERIES = [
+    ("BRCA2 castration-sensitive", None),
+    ('"breast cancer" HER2-negative', None),
+    ('"breast cancer" HER2-negative', ["indication"]),
+    ("melanoma BRAF", ["statement", "document"]),
+    ("acute myeloid leukemia", None),
+    ("unmatchedterm", None),
+]
+
+
+@pytest.fixture(scope="module")
+def statements(input_paths):
+    db = dereference.load_database(input_paths, tables={"statements"})
+    dereference.dereference_concurrently(db, tables={"statements"})
+    return db.statements.records
+
+
+@pytest.fixture(scope="module")
+def index(statements):
+    return search.SearchIndex.build(statements)
+
+
+def brute_force(statements: list[dict], query: str, fields: list[str] | None):
+    """
+    Ranks statements by BM25 by scanning the tokens of every distinct text for each clause of the query.
+    """
+    tokens = {}
+    owners = collections.defaultdict(set)
+    for statement in statements:
+        for field, source_id, text in search.statement_texts(statement):
+            tokens.setdefault((field, source_id), search.tokenize(text))
+            owners[(field, source_id)].add(statement["id"])
+    average = sum(map(len, tokens.values())) / len(tokens)
+
+    scores = None
+    for phrase, word in search.QUERY.findall(query):
+        clause = search.tokenize(phrase or word)
+        if not clause:
+            continue
+        frequencies = {}
+        for key, text in tokens.items():
+            if fields is not None and key[0] not in fields:
+                continue
+            count = sum(
+                text[i : i + len(clause)] == clause
+                for i in range(len(text) - len(clause) + 1)
+            )
+            if count:
+                frequencies[key] = count
+        n = len(frequencies)
+        idf = math.log(1 + (len(tokens) - n + 0.5) / (n + 0.5))
+        clause_scores = collections.defaultdict(float)
+        for key, frequency in frequencies.items():
+            norm = (
+                1
+                - search.SearchIndex.b
+                + search.SearchIndex.b * len(tokens[key]) / average
+            )
+            score = (
+                idf
+                * frequency
+                * (search.SearchIndex.k1 + 1)
+                / (frequency + search.SearchIndex.k1 * norm)
+            )
+            for statement_id in owners[key]:
+                clause_scores[statement_id] += score
+        if scores is None:
+            scores = dict(clause_scores)
+        else:
+            scores = {
+                s: scores[s] + clause_scores[s] for s in scores.keys() & clause_scores
+            }
+    return sorted((scores or {}).items(), key=lambda item: (-item[1], str(item[0])))
+
+
+@pytest.mark.parametrize("query, fields", QUERIES)
+def test_ranking_matches_brute_force(statements, index, query, fields):
+    """
+    Assess if search results, their order, and their scores equal BM25 computed by scanning every text.
+    """
+    expected = brute_force(statements, query, fields)
+    results = index.search(query, limit=None, fields=fields)
+    assert [result.statement_id for result in results] == [s for s, _ in expected]
+    assert [result.score for result in results] == pytest.approx(
+        [score for _, score in expected], abs=1e-4
+    )
+
+
+def test_phrases_require_adjacent_tokens(index):
+    """
+    Assess if a quoted phrase matches a subset of the statements matching its words separately.
+    """
+    phrase = {result.statement_id for result in index.search('"breast cancer"', None)}
+    words = {result.statement_id for result in index.search("breast cancer", None)}
+    assert phrase
+    assert phrase <= words
+
+
+def test_saved_index_searches_the_same(tmp_path, index, capsys):
+    """
+    Assess if an index saved quietly and loaded again returns the same results as the index it was saved from.
+    """
+    file = str(tmp_path / "statements.idx")
+    index.save(file, quiet=True)
+    assert capsys.readouterr().out == ""
+    loaded = search.SearchIndex.load(file)
+    for query, fields in QUERIES:
+        assert loaded.search(query, limit=None, fields=fields) == index.search(
+            query, limit=None, fields=fields
+        )
@@ -0,0 +1,133 @@
+import gzip
+import json
+
+import pytest
+
+from utils import server
+
+
+@pytest.fixture(scope="module")
+def app():
+    return server.App.from_referenced("referenced")
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [
+        ("", False),
+        ("gzip", True),
+        ("deflate, gzip;q=0.5", True),
+        ("gzip;q=0", False),
+        ("gzip; q=0.0", False),
+        ("gzip;q=abc", False),
+        ("gzip;q=", False),
+        ("*", True),
+        ("*;q=1, gzip;q=0", False),
+        ("br", False),
+    ],
+)
+def test_accepts_gzip(value, expected):
+    """
+    Assess if Accept-Encoding headers are parsed without raising, treating a malformed quality as zero.
+    """
+    assert server.accepts_gzip(value) is expected
+
+
+def test_conditional_requests(app):
+    """
+    Assess if a matching ETag, a weak ETag, or `*` in If-None-Match is answered with 304 Not Modified.
+    """
+    status, headers, body = app.respond("GET", "/about", "", {})
+    assert status == 200
+    assert json.loads(body) == json.loads(app.get("/about")[1].body)
+    etag = dict(headers)["ETag"]
+    for value in (etag, f"W/{etag}", f'"other", {etag}', "*"):
+        status, _, body = app.respond("GET", "/about", "", {"if-none-match": value})
+        assert (status, body) == (304, b"")
+    status, _, _ = app.respond("GET", "/about", "", {"if-none-match": '"other"'})
+    assert status == 200
+    status, _, _ = app.respond("GET", "/missing", "", {"if-none-match": "*"})
+    assert status == 404
+
+
+def test_gzip_response(app):
+    """
+    Assess if large responses are gzip compressed when the client accepts gzip.
+    """
+    status, headers, body = app.respond(
+        "GET", "/genes", "", {"accept-encoding": "gzip"}
+    )
+    assert status == 200
+    assert dict(headers)["Content-Encoding"] == "gzip"
+    assert json.loads(gzip.decompress(body)) == json.loads(app.get("/genes")[1].body)
+
+
+def test_combinations(app):
+    """
+    Assess if therapy combinations served from the therapy index match a scan of every statement's therapeutic.
+    """
+    combinations = {}
+    for statement in json.loads(app.get("/statements")[1].body):
+        therapeutic = statement["proposition"]["objectTherapeutic"]
+        therapies = therapeutic.get("therapies", [therapeutic])
+        key = frozenset(therapy["name"] for therapy in therapies)
+        combinations.setdefault(key, []).append(statement["id"])
+
+    def served(query):
+        status, response = app.get("/combinations", query)
+        assert status == 200
+        return {
+            frozenset(therapy["name"] for therapy in row["therapies"]): row[
+                "statements"
+            ]
+            for row in json.loads(response.body)
+        }
+
+    wanted = {"Osimertinib", "Carboplatin"}
+    assert served("therapies=osimertinib,Carboplatin") == {
+        key: ids for key, ids in combinations.items() if wanted <= key
+    }
+    assert served("therapies=Osimertinib&match=exact") == {
+        key: ids for key, ids in combinations.items() if key == {"Osimertinib"}
+    }
+    assert served("therapies=Osimertinib,Carboplatin,Pemetrexed&match=subset") == {
+        key: ids
+        for key, ids in combinations.items()
+        if key <= {"Osimertinib", "Carboplatin", "Pemetrexed"}
+    }
+    assert app.get("/combinations", "therapies=not-a-therapy")[0] == 404
+    assert app.get("/combinations", "therapies=Osimertinib&match=any")[0] == 400
+    assert app.get("/combinations", "gene=EGFR")[0] == 400
+
+
+def test_filtered_pages(app):
+    """
+    Assess if paging through filtered statements returns the filtered listing in id order, reusing the sorted ranks
+    kept for the filter, and if invalid cursors, limits, and filters are answered with 400 Bad Request.
+    """
+    expected = sorted(
+        statement["id"]
+        for statement in json.loads(app.get("/statements", "gene=EGFR")[1].body)
+    )
+    ids = []
+    query = "gene=EGFR&limit=25"
+    while True:
+        status, response = app.get("/statements", query)
+        assert status == 200
+        page = json.loads(response.body)
+        ids.extend(statement["id"] for statement in page["items"])
+        if page["next_cursor"] is None:
+            break
+        query = f"gene=EGFR&limit=25&cursor={page['next_cursor']}"
+    assert ids == expected
+    statements = app.tables["statements"]
+    assert statements.ranked(gene="EGFR") is statements.ranked(gene="egfr")
+
+    for path, query in (
+        ("/statements", "cursor=not-a-cursor"),
+        ("/statements", "limit=0"),
+        ("/statements", "limit=ten"),
+        ("/statements", "color=red&limit=10"),
+        ("/genes", "gene=EGFR&limit=10"),
+    ):
+        assert app.get(path, query)[0] == 400
@@ -0,0 +1,90 @@
+import hashlib
+import json
+
+from utils import shards
+
+
+def entity(namespace: str, number: int, name: str) -> dict:
+    return {"name": name, "primaryCoding": {"id": f"{namespace}:{number}"}}
+
+
+def statement(statement_id: int, genes: list, disease: dict, therapeutic: dict):
+    return {
+        "id": statement_id,
+        "proposition": {
+            "biomarkers": [{"genes": [gene]} for gene in genes],
+            "conditionQualifier": disease,
+            "objectTherapeutic": therapeutic,
+        },
+    }
+
+
+BRAF = entity("hgnc", 1097, "BRAF")
+KRAS = entity("hgnc", 6407, "KRAS")
+MELANOMA = entity("oncotree", 1, "Melanoma")
+NSCLC = entity("oncotree", 2, "Non-Small Cell Lung Cancer")
+DABRAFENIB = entity("ncit", 1, "Dabrafenib")
+TRAMETINIB = entity("ncit", 2, "Trametinib")
+SOTORASIB = entity("ncit", 3, "Sotorasib")
+
+STATEMENTS = [
+    statement(0, [BRAF], MELANOMA, {"therapies": [DABRAFENIB, TRAMETINIB]}),
+    statement(1, [KRAS], NSCLC, SOTORASIB),
+    statement(2, [BRAF, KRAS], NSCLC, TRAMETINIB),
+]
+
+
+def test_statements_are_grouped_by_entity(tmp_path):
+    """
+    Assess if each shard holds exactly the statements about its gene, disease, or therapy, in statement order,
+    including each therapy of a therapy group.
+    """
+    index = shards.write_shards(STATEMENTS, output_dir=str(tmp_path), quiet=True)
+    expected = {
+        "genes": {"hgnc:1097": [0, 2], "hgnc:6407": [1, 2]},
+        "diseases": {"oncotree:1": [0], "oncotree:2": [1, 2]},
+        "therapies": {"ncit:1": [0], "ncit:2": [0, 2], "ncit:3": [1]},
+    }
+    grouped = {
+        kind: {
+            key: [
+                record["id"]
+                for record in json.loads((tmp_path / entry["file"]).read_text())
+            ]
+            for key, entry in entries.items()
+        }
+        for kind, entries in index.items()
+    }
+    assert grouped == expected
+
+
+def test_index_describes_shard_files(tmp_path):
+    """
+    Assess if the index written to index.json lists each shard's name, file, number of statements, size, and
+    checksum, matching the files that were written.
+    """
+    index = shards.write_shards(STATEMENTS, output_dir=str(tmp_path), quiet=True)
+    assert json.loads((tmp_path / "index.json").read_text()) == index
+    assert index["genes"]["hgnc:1097"]["file"] == "genes/hgnc_1097.json"
+    assert index["diseases"]["oncotree:2"]["name"] == "Non-Small Cell Lung Cancer"
+    for entries in index.values():
+        for entry in entries.values():
+            content = (tmp_path / entry["file"]).read_bytes()
+            assert entry["bytes"] == len(content)
+            assert entry["sha256"] == hashlib.sha256(content).hexdigest()
+            assert entry["statements"] == len(json.loads(content))
+
+
+def test_stale_shards_are_removed(tmp_path):
+    """
+    Assess if writing shards again removes the files of entities that no longer have statements, and keeps files
+    that are not shards.
+    """
+    shards.write_shards(STATEMENTS, output_dir=str(tmp_path), quiet=True)
+    (tmp_path / "genes" / "README.md").write_text("Not a shard.")
+    index = shards.write_shards(STATEMENTS[:1], output_dir=str(tmp_path), quiet=True)
+    for kind, entries in index.items():
+        files = {path.name for path in (tmp_path / kind).glob("*.json")}
+        assert files == {shards.shard_filename(key) for key in entries}
+    assert not (tmp_path / "genes" / "hgnc_6407.json").exists()
+    assert (tmp_path / "genes" / "README.md").exists()
@@ -0,0 +1,54 @@
+import collections
+
+from utils import spellcheck
+
+
+def test_spelling_errors(data):
+    """
+    Assess if any words in names, descriptions, indications, or extension descriptions are misspelled. Words are
+    checked against the word list and allowlist in spelling/, and the names of therapies, genes, and documents.
+    """
+    checker = spellcheck.SpellChecker.from_tables(
+        data, word_lists=[spellcheck.WORD_LIST], allowlists=[spellcheck.ALLOWLIST]
+    )
+    misspellings = checker.check_tables(data)
+    assert not misspellings, (
+        f"Misspelled words found:\n{spellcheck.report(misspellings)}"
+    )
+
+
+def test_misspellings_are_found():
+    """
+    Assess if misspelled words are reported with suggestions, and words within URLs are not checked.
+    """
+    data = {
+        "indications": [
+            {
+                "id": 0,
+                "description": "Patients who recieve chemotherapy, see https://www.accessdata.fda.gov/drugsatfda.",
+            }
+        ]
+    }
+    checker = spellcheck.SpellChecker.from_tables(
+        data, word_lists=[spellcheck.WORD_LIST], allowlists=[spellcheck.ALLOWLIST]
+    )
+    misspellings = checker.check_tables(data)
+    assert [(m.record_id, m.path, m.word) for m in misspellings] == [
+        (0, "description", "recieve")
+    ]
+    assert "receive" in misspellings[0].suggestions
+
+
+def test_suggestions_by_distance():
+    """
+    Assess if suggestions are ranked by edit distance and then by frequency, and only reach two edits away when the
+    maximum distance allows it.
+    """
+    words = collections.Counter({"received": 1, "receive": 5, "recipe": 9})
+    assert spellcheck.SpellChecker(words).suggest("recieve") == ["receive"]
+    assert spellcheck.SpellChecker(words, max_distance=2).suggest("recieve") == [
+        "receive",
+        "recipe",
+        "received",
+    ]
+    assert "receive" not in spellcheck.SpellChecker(words).suggest("receive")
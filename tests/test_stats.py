@@ -0,0 +1,85 @@
+import collections
+import copy
+import random
+
+import pytest
+
+from utils import dereference
+from utils import stats
+
+
+@pytest.fixture(scope="module")
+def statements(input_paths):
+    db = dereference.load_database(input_paths, tables={"statements"})
+    dereference.dereference_concurrently(db, tables={"statements"})
+    return db.statements
+
+
+def test_summary_matches_referenced_tables(data, statements):
+    """
+    Assess if totals, evidence levels, and statements per gene agree with counts taken directly from the referenced
+    tables.
+    """
+    summary = stats.summarize(statements.records)
+    propositions = {record["id"]: record for record in data["propositions"]}
+    biomarkers = {record["id"]: record for record in data["biomarkers"]}
+    genes = {record["id"]: record["name"] for record in data["genes"]}
+    strengths = {record["id"]: record["name"] for record in data["strengths"]}
+
+    gene_counts = collections.Counter()
+    for statement in data["statements"]:
+        proposition = propositions[statement["proposition_id"]]
+        gene_counts.update(
+            {
+                genes[gene_id]
+                for biomarker_id in proposition["biomarkers"]
+                for gene_id in biomarkers[biomarker_id].get("genes", [])
+            }
+        )
+
+    assert summary["totals"]["statements"] == len(data["statements"])
+    assert summary["totals"]["documents"] == len(
+        {document for record in data["statements"] for document in record["reportedIn"]}
+    )
+    assert summary["totals"]["molecular_features"] == len(
+        {
+            biomarker
+            for record in data["statements"]
+            for biomarker in propositions[record["proposition_id"]]["biomarkers"]
+        }
+    )
+    assert summary["evidence_levels"] == dict(
+        sorted(
+            collections.Counter(
+                strengths[record["strength_id"]] for record in data["statements"]
+            ).items()
+        )
+    )
+    assert summary["genes"] == dict(sorted(gene_counts.items()))
+
+
+def test_summary_is_independent_of_order(statements):
+    """
+    Assess if the summary accumulated while statements are dereferenced equals a summary of the statements in any
+    order.
+    """
+    shuffled = list(statements.records)
+    random.Random(0).shuffle(shuffled)
+    assert statements.summary.to_dict() == stats.summarize(statements.records)
+    assert stats.summarize(shuffled) == stats.summarize(statements.records)
+
+
+def test_documents_of_one_agent_count_once(statements):
+    """
+    Assess if a statement citing several documents of the same agent from the same year counts once for that agent
+    and year.
+    """
+    record = copy.deepcopy(statements.records[0])
+    document = record["reportedIn"][0]
+    agent = stats.extension_value(document, "agent")["name"]
+    year = stats.extension_value(document, "publication_date")[:4]
+    record["reportedIn"] = [document, {**document, "id": "doc:copy"}]
+    summary = stats.summarize([record])
+    assert summary["agents"] == {agent: 1}
+    assert summary["agent_year"] == {agent: {year: 1}}
+    assert summary["totals"]["documents"] == 2
@@ -0,0 +1,87 @@
+import json
+import pathlib
+import shutil
+
+import pytest
+
+from utils import dereference
+from utils import read
+from utils.store import ReleaseStore
+
+
+@pytest.fixture(scope="module")
+def releases(tmp_path_factory, input_paths):
+    """
+    Two releases of the referenced files in temporary directories, which differ only in the name of one gene.
+    """
+    directories = {}
+    for release in ["current", "previous"]:
+        directory = tmp_path_factory.mktemp(release)
+        for path in [*input_paths.values(), "referenced/about.json"]:
+            shutil.copyfile(path, directory / pathlib.Path(path).name)
+        directories[release] = str(directory)
+    genes = read.json_records(file=input_paths["genes"])
+    genes[0]["name"] = f"{genes[0]['name']}-previous"
+    with open(pathlib.Path(directories["previous"]) / "genes.json", "w") as fp:
+        json.dump(genes, fp, indent=2)
+    return directories
+
+
+def fresh(directory: str) -> dereference.Database:
+    input_paths = {
+        name: str(pathlib.Path(directory) / f"{name}.json")
+        for name in dereference.TABLE_CLASSES
+    }
+    db = dereference.load_database(input_paths)
+    dereference.dereference_concurrently(db)
+    return db
+
+
+def test_identical_records_are_stored_once(releases):
+    """
+    Assess if two releases with the same content share every record and table object.
+    """
+    store = ReleaseStore()
+    first = store.add_directory("first", releases["current"])
+    second = store.add_directory("second", releases["current"])
+    for name in dereference.TABLE_CLASSES:
+        assert getattr(first, name) is getattr(second, name)
+    counts = store.stats()
+    assert counts["unique_records"] * 2 == counts["records"]
+    assert counts["tables"] == len(dereference.TABLE_CLASSES)
+
+
+def test_removal_keeps_shared_records(releases):
+    """
+    Assess if removing a release keeps the records that the remaining release shares with it, and the remaining
+    release still equals a fresh build of its files.
+    """
+    store = ReleaseStore()
+    store.add_directory("current", releases["current"])
+    previous = store.add_directory("previous", releases["previous"])
+    shared = list(previous.documents.records)
+    assert store.db_at("current").documents.records[0] is shared[0]
+
+    store.remove("current")
+    assert store.releases() == ["previous"]
+    assert "current" not in store
+    remaining = store.db_at("previous")
+    assert all(a is b for a, b in zip(remaining.documents.records, shared))
+    expected = fresh(releases["previous"])
+    for name in dereference.TABLE_CLASSES:
+        assert getattr(remaining, name).records == getattr(expected, name).records
+    counts = store.stats()
+    assert counts["unique_records"] == counts["records"]
+
+
+def test_views_rebuild_statement_indexes(releases):
+    """
+    Assess if the statements of a release view have the summary, therapy index, and rankings of a fresh build.
+    """
+    store = ReleaseStore()
+    statements = store.add_directory("current", releases["current"]).statements
+    expected = fresh(releases["current"]).statements
+    assert statements.summary.to_dict() == expected.summary.to_dict()
+    assert statements.rankings.to_dict() == expected.rankings.to_dict()
+    assert statements.therapy_index.statements == expected.therapy_index.statements
+    assert statements.therapy_index.therapies == expected.therapy_index.therapies
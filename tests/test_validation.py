@@ -0,0 +1,16 @@
+import pytest
+
+from utils import validate
+
+
+@pytest.mark.parametrize("table", validate.TABLES)
+def test_records_match_schema(input_paths, table):
+    """
+    Assess if the records of each referenced file follow the table's JSON schema in schemas/.
+    """
+    pytest.importorskip("fastjsonschema")
+    path = input_paths.get(table, f"referenced/{table}.json")
+    invalid = validate.validate_files({table: path})
+    assert not invalid, f"Records do not match the {table} schema:\n" + "\n".join(
+        invalid[table]
+    )
@@ -0,0 +1,112 @@
+import json
+import pathlib
+import shutil
+
+import pytest
+
+from utils import dereference
+from utils import read
+from utils import watch
+
+OUTPUTS = ["output", "stats_file", "rankings_file", "binary_file"]
+
+
+@pytest.fixture
+def copied_paths(tmp_path, input_paths):
+    paths = {}
+    for name, path in {**input_paths, "about": "referenced/about.json"}.items():
+        paths[name] = str(tmp_path / "referenced" / pathlib.Path(path).name)
+        pathlib.Path(paths[name]).parent.mkdir(exist_ok=True)
+        shutil.copyfile(path, paths[name])
+    return paths
+
+
+def outputs(directory: pathlib.Path) -> dict:
+    directory.mkdir()
+    return {
+        "output": str(directory / "dereferenced.json"),
+        "stats_file": str(directory / "stats.json"),
+        "rankings_file": str(directory / "rankings.json"),
+        "binary_file": str(directory / "dereferenced.msgpack"),
+    }
+
+
+def edit(path: str, index: int, key: str, value) -> None:
+    records = read.json_records(file=path)
+    records[index][key] = value
+    with open(path, "w") as fp:
+        json.dump(records, fp, indent=2)
+
+
+@pytest.mark.parametrize(
+    "name, key",
+    [("therapies", "name"), ("indications", "description")],
+)
+def test_update_matches_full_build(tmp_path, copied_paths, name, key):
+    """
+    Assess if the outputs of an incremental update, and the records it keeps for each table, are identical to those of
+    a full build of the changed files.
+    """
+    incremental = outputs(tmp_path / "incremental")
+    build = watch.IncrementalBuild(
+        input_paths=copied_paths, write_concepts=False, quiet=True, **incremental
+    )
+    build.build()
+
+    edit(copied_paths[name], 0, key, "changed")
+    affected = build.update({copied_paths[name]})
+    assert affected == dereference.dependents({name})
+
+    full = outputs(tmp_path / "full")
+    dereference.main(copied_paths, **full)
+    for output in OUTPUTS:
+        assert (
+            pathlib.Path(incremental[output]).read_bytes()
+            == pathlib.Path(full[output]).read_bytes()
+        ), output
+
+    db = dereference.load_database(copied_paths)
+    dereference.dereference_concurrently(db)
+    for table in dereference.TABLE_CLASSES:
+        assert getattr(build.db, table).records == getattr(db, table).records, table
+
+
+def test_unchanged_content_is_not_rewritten(tmp_path, copied_paths):
+    """
+    Assess if saving a referenced file without changing its content leaves the single-file outputs untouched.
+    """
+    incremental = outputs(tmp_path / "incremental")
+    build = watch.IncrementalBuild(
+        input_paths=copied_paths, write_concepts=False, quiet=True, **incremental
+    )
+    build.build()
+    modified = {
+        output: pathlib.Path(incremental[output]).stat().st_mtime_ns
+        for output in OUTPUTS
+    }
+
+    edit(copied_paths["therapies"], 0, "name", build.db.therapies.records[0]["name"])
+    build.update({copied_paths["therapies"]})
+    assert modified == {
+        output: pathlib.Path(incremental[output]).stat().st_mtime_ns
+        for output in OUTPUTS
+    }
+
+
+def test_invalid_file_keeps_previous_state(tmp_path, copied_paths):
+    """
+    Assess if a referenced file that cannot be parsed raises and leaves the resident database as it was.
+    """
+    build = watch.IncrementalBuild(
+        input_paths=copied_paths,
+        output=str(tmp_path / "dereferenced.json"),
+        write_concepts=False,
+        quiet=True,
+    )
+    build.build()
+    statements = build.db.statements
+
+    pathlib.Path(copied_paths["therapies"]).write_text("[{")
+    with pytest.raises(json.JSONDecodeError):
+        build.update({copied_paths["therapies"]})
+    assert build.db.statements is statements
@@ -0,0 +1,101 @@
+import copy
+import json
+
+import pytest
+
+from utils import dereference
+from utils import where_used
+
+MARKER = "where-used-marker"
+
+
+@pytest.fixture(scope="module")
+def index(data):
+    return where_used.ReverseIndex(data)
+
+
+def dereferenced_with_marker(data: dict, table: str, record_id) -> dict[str, list]:
+    """
+    Adds a marker to a copy of one record, dereferences the statements, and returns the ids of the propositions and
+    statements whose dereferenced records contain the marker.
+    """
+    marked = copy.deepcopy(data)
+    for record in marked[table]:
+        if record["id"] == record_id:
+            record["marker"] = MARKER
+    db = dereference.Database(
+        **{
+            name: table_class(records=marked[name])
+            for name, table_class in dereference.TABLE_CLASSES.items()
+        }
+    )
+    dereference.dereference_concurrently(db, tables={"statements"})
+    return {
+        name: sorted(
+            record["id"]
+            for record in getattr(db, name).records
+            if MARKER in json.dumps(record)
+        )
+        for name in ["propositions", "statements"]
+    }
+
+
+@pytest.mark.parametrize(
+    "table, record_id",
+    [
+        ("genes", 0),
+        ("therapies", 0),
+        ("diseases", 9),
+        ("documents", "doc:fda.verzenio"),
+    ],
+)
+def test_dependents_match_dereferenced_records(data, index, table, record_id):
+    """
+    Assess if the propositions and statements that depend on a record are exactly those whose dereferenced records
+    embed it.
+    """
+    expected = dereferenced_with_marker(data, table, record_id)
+    result = index.where_used(table, record_id, tables=["propositions", "statements"])
+    assert expected["statements"], table
+    for name in ["propositions", "statements"]:
+        assert result.get(name, []) == expected[name], name
+
+
+def test_direct_users(data, index):
+    """
+    Assess if the direct users of a gene are the biomarkers that list it, and are among its transitive dependents.
+    """
+    gene_id = data["genes"][0]["id"]
+    expected = sorted(
+        biomarker["id"]
+        for biomarker in data["biomarkers"]
+        if gene_id in biomarker.get("genes", [])
+    )
+    direct = index.direct("genes", gene_id)
+    assert sorted(user_id for _, user_id in direct) == expected
+    assert {name for name, _ in direct} == {"biomarkers"}
+    assert index.where_used("genes", gene_id)["biomarkers"] == expected
+
+
+def test_ids_are_matched_by_string_form(index):
+    """
+    Assess if integer ids given as strings are resolved, and unknown tables and records raise KeyError.
+    """
+    assert index.resolve("genes", "0") == ("genes", 0)
+    assert index.where_used("genes", "0") == index.where_used("genes", 0)
+    with pytest.raises(KeyError):
+        index.resolve("genes", "not-a-gene")
+    with pytest.raises(KeyError):
+        index.resolve("not-a-table", 0)
+
+
+def test_results_are_in_dependency_order(index):
+    """
+    Assess if dependent tables are listed in dependency order and filtered by `tables`.
+    """
+    result = index.where_used("codings", "oncotree:ALL")
+    order = dereference.topological_order()
+    assert list(result) == sorted(result, key=order.index)
+    assert list(index.where_used("codings", "oncotree:ALL", tables=["statements"])) == [
+        "statements"
+    ]
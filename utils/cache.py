@@ -0,0 +1,178 @@
+import hashlib
+import json
+import os
+import pathlib
+import pickle
+import tempfile
+import typing
+
+
+class BuildCache:
+    """
+    An on-disk, content-addressed cache of parsed and resolved tables for dereference builds.
+
+    Parsed tables are keyed by the SHA-256 of the referenced file's bytes. Resolved tables are keyed by a digest,
+    computed by the caller, of the table's own content and that of its transitive foreign key dependencies, so an
+    entry is only reused when none of its inputs have changed. Entries are evicted least recently used first once
+    the cache grows beyond `max_bytes`.
+
+    Attributes:
+        directory (pathlib.Path): Folder that holds cache entries.
+        max_bytes (int): Upper bound on the total size of cache entries, in bytes.
+        hits (int): Number of entries loaded from the cache.
+        misses (int): Number of entries that were not found in the cache.
+    """
+
+    def __init__(
+        self, directory: str = ".moalmanac-cache", max_bytes: int = 512 * 1024**2
+    ):
+        """
+        Initializes the cache, creating its directory if needed.
+
+        Args:
+            directory (str): Folder that holds cache entries (default: ".moalmanac-cache").
+            max_bytes (int): Upper bound on the total size of cache entries, in bytes (default: 512 MiB).
+        """
+        self.directory = pathlib.Path(directory)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        for subdirectory in ("parsed", "resolved"):
+            (self.directory / subdirectory).mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def digest(*parts: str | bytes) -> str:
+        """
+        Returns the SHA-256 hex digest of the given parts.
+
+        Args:
+            *parts (str | bytes): Values to hash, in order. Strings are UTF-8 encoded.
+
+        Returns:
+            str: The hex digest.
+        """
+        hasher = hashlib.sha256()
+        for part in parts:
+            hasher.update(part.encode() if isinstance(part, str) else part)
+            hasher.update(b"\0")
+        return hasher.hexdigest()
+
+    @staticmethod
+    def file_digest(path: str) -> str:
+        """
+        Returns the SHA-256 hex digest of a file's bytes.
+
+        Args:
+            path (str): Path to the file.
+
+        Returns:
+            str: The hex digest.
+        """
+        with open(path, "rb") as fp:
+            return hashlib.file_digest(fp, "sha256").hexdigest()
+
+    def parsed(self, path: str, digest: str | None = None) -> typing.Any:
+        """
+        Returns the parsed contents of a JSON file, from the cache if the file's content has been parsed before.
+
+        Args:
+            path (str): Path to the JSON file.
+            digest (str | None): The file's digest, if already computed by `file_digest`.
+
+        Returns:
+            Any: The parsed JSON.
+        """
+        with open(path, "rb") as fp:
+            content = fp.read()
+        digest = digest or self.digest(content)
+        entry = self.directory / "parsed" / f"{digest}.pickle"
+        data = self._load(entry)
+        if data is None:
+            try:
+                data = json.loads(content)
+            except json.JSONDecodeError as e:
+                raise json.JSONDecodeError(
+                    f"Invalid JSON in file: {path}", e.doc, e.pos
+                )
+            self._store(entry, data)
+        return data
+
+    def get(self, key: str) -> typing.Any | None:
+        """
+        Returns a resolved table's records from the cache.
+
+        Args:
+            key (str): The digest identifying the resolved table and all of its inputs.
+
+        Returns:
+            Any | None: The cached records, or None if there is no entry for `key`.
+        """
+        return self._load(self.directory / "resolved" / f"{key}.pickle")
+
+    def put(self, key: str, records: typing.Any) -> None:
+        """
+        Stores a resolved table's records in the cache.
+
+        Args:
+            key (str): The digest identifying the resolved table and all of its inputs.
+            records (Any): The resolved records.
+        """
+        self._store(self.directory / "resolved" / f"{key}.pickle", records)
+
+    def evict(self) -> int:
+        """
+        Removes least recently used entries until the cache is no larger than `max_bytes`.
+
+        Returns:
+            int: The number of entries removed.
+        """
+        entries = []
+        for entry in self.directory.glob("*/*.pickle"):
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime_ns, stat.st_size, entry))
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for _, size, entry in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            entry.unlink(missing_ok=True)
+            total -= size
+            removed += 1
+        return removed
+
+    def _load(self, entry: pathlib.Path) -> typing.Any | None:
+        try:
+            with open(entry, "rb") as fp:
+                data = pickle.load(fp)
+        # A truncated entry, or one written by incompatible code, can fail in many ways; each is a miss and the entry
+        # is rebuilt and overwritten
+        except (
+            FileNotFoundError,
+            EOFError,
+            pickle.UnpicklingError,
+            AttributeError,
+            ImportError,
+            IndexError,
+            TypeError,
+            ValueError,
+        ):
+            self.misses += 1
+            return None
+        # Mark the entry as recently used for eviction
+        os.utime(entry)
+        self.hits += 1
+        return data
+
+    def _store(self, entry: pathlib.Path, data: typing.Any) -> None:
+        # Write to a temporary file and rename, so concurrent builds never read a partial entry
+        descriptor, temporary = tempfile.mkstemp(dir=entry.parent, suffix=".tmp")
+        try:
+            with os.fdopen(descriptor, "wb") as fp:
+                pickle.dump(data, fp, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temporary, entry)
+        except BaseException:
+            pathlib.Path(temporary).unlink(missing_ok=True)
+            raise
@@ -0,0 +1,210 @@
+import argparse
+import json
+import typing
+
+import numpy
+
+# Local imports
+from utils import match
+from utils import read
+
+
+class Cohort:
+    """
+    Evaluates which propositions, and so which statements, the samples of a cohort satisfy, as bitsets.
+
+    Each proposition's `biomarkers` and each sample's satisfied biomarkers are encoded as bitsets over the biomarkers
+    table, packed into 64 bit words with NumPy. A sample satisfies a proposition when no required bit is missing from
+    its bitset, `required & ~observed == 0`, which is computed for every pair of a block of samples and all
+    propositions at once. A row of the biomarkers table takes one bit, so even tens of thousands of samples fit in a
+    few megabytes.
+
+    Attributes:
+        biomarker_ids (list[int]): Biomarker ids in bit order.
+        proposition_ids (list[int]): Proposition ids in the order of the columns of `satisfaction`.
+        required (numpy.ndarray): Packed bitset of the biomarkers of each proposition, one row per proposition.
+        statement_ids (list[int]): Statement ids.
+        statement_indptr (numpy.ndarray): Offsets into `statement_indices` of the statements of each proposition.
+        statement_indices (numpy.ndarray): Positions in `statement_ids` of the statements of each proposition.
+    """
+
+    def __init__(self, data: dict[str, list[dict]]):
+        """
+        Encodes the propositions.
+
+        Args:
+            data (dict[str, list[dict]]): Referenced records keyed by table name, with at least `biomarkers`,
+                `propositions`, and `statements`.
+        """
+        self.biomarker_ids = [record["id"] for record in data["biomarkers"]]
+        self._bits = {
+            biomarker_id: i for i, biomarker_id in enumerate(self.biomarker_ids)
+        }
+        self.proposition_ids = [record["id"] for record in data["propositions"]]
+        self.required = self.encode(
+            [record.get("biomarkers") or [] for record in data["propositions"]]
+        )
+        columns = {
+            proposition_id: i for i, proposition_id in enumerate(self.proposition_ids)
+        }
+        self.statement_ids = [record["id"] for record in data["statements"]]
+        statement_propositions = numpy.array(
+            [columns[record["proposition_id"]] for record in data["statements"]],
+            dtype=numpy.int64,
+        )
+        # Statements of each proposition as a CSR adjacency of positions in the statements table
+        self.statement_indptr = numpy.zeros(
+            len(self.proposition_ids) + 1, dtype=numpy.int64
+        )
+        numpy.cumsum(
+            numpy.bincount(statement_propositions, minlength=len(self.proposition_ids)),
+            out=self.statement_indptr[1:],
+        )
+        self.statement_indices = numpy.argsort(statement_propositions, kind="stable")
+
+    @property
+    def words(self) -> int:
+        """
+        Number of 64 bit words in each bitset.
+        """
+        return (len(self.biomarker_ids) + 63) // 64
+
+    def encode(
+        self, biomarker_sets: typing.Iterable[typing.Iterable[int]]
+    ) -> numpy.ndarray:
+        """
+        Encodes sets of biomarker ids as packed bitsets.
+
+        Args:
+            biomarker_sets (Iterable[Iterable[int]]): Biomarker ids of each set.
+
+        Returns:
+            numpy.ndarray: A `(sets, words)` array of unsigned 64 bit words.
+
+        Raises:
+            KeyError: If a biomarker does not exist.
+        """
+        biomarker_sets = list(biomarker_sets)
+        rows = []
+        columns = []
+        for row, biomarker_ids in enumerate(biomarker_sets):
+            for biomarker_id in biomarker_ids:
+                if biomarker_id not in self._bits:
+                    raise KeyError(f"Record not found in biomarkers: {biomarker_id}")
+                rows.append(row)
+                columns.append(self._bits[biomarker_id])
+        dense = numpy.zeros((len(biomarker_sets), self.words * 64), dtype=bool)
+        dense[rows, columns] = True
+        # Bits are packed little endian so that, viewed as 64 bit words, bit i of the set is bit i % 64 of word i // 64
+        packed = numpy.packbits(dense, axis=1, bitorder="little")
+        return packed.view(numpy.dtype("<u8")).reshape(len(dense), self.words)
+
+    def satisfaction(self, observed: numpy.ndarray, block: int = 1024) -> numpy.ndarray:
+        """
+        Computes which propositions each sample satisfies.
+
+        Args:
+            observed (numpy.ndarray): Packed bitsets of the samples' satisfied biomarkers, as returned by `encode`.
+            block (int): Number of samples evaluated at once, which bounds memory to
+                `block * propositions * 8` bytes.
+
+        Returns:
+            numpy.ndarray: A `(samples, propositions)` boolean matrix.
+        """
+        result = numpy.empty((len(observed), len(self.proposition_ids)), dtype=bool)
+        missing = ~observed
+        for start in range(0, len(observed), block):
+            # Required bits missing from each sample, accumulated one word at a time
+            unmet = numpy.zeros(
+                (len(missing[start : start + block]), len(self.proposition_ids)),
+                dtype=numpy.uint64,
+            )
+            for word in range(self.words):
+                unmet |= (
+                    missing[start : start + block, word, None]
+                    & self.required[None, :, word]
+                )
+            numpy.equal(unmet, 0, out=result[start : start + block])
+        return result
+
+    def statements(
+        self, samples: dict[str, typing.Iterable[int]], block: int = 1024
+    ) -> dict[str, list[int]]:
+        """
+        Returns the statements that each sample satisfies.
+
+        Args:
+            samples (dict[str, Iterable[int]]): Satisfied biomarker ids keyed by sample id, such as returned by
+                `utils.match.Matcher.biomarkers`.
+            block (int): Number of samples evaluated at once; see `satisfaction`.
+
+        Returns:
+            dict[str, list[int]]: Ids of satisfied statements keyed by sample id, in the order of the statements table.
+        """
+        sample_ids = list(samples)
+        satisfied = self.satisfaction(self.encode(samples.values()), block=block)
+        statement_ids = numpy.array(self.statement_ids)
+        found = {}
+        for start in range(0, len(sample_ids), block):
+            block_ids = sample_ids[start : start + block]
+            rows, columns = numpy.nonzero(satisfied[start : start + block])
+            # Expand each satisfied proposition to its statements, then order them by sample and statement position
+            starts = self.statement_indptr[columns]
+            lengths = self.statement_indptr[columns + 1] - starts
+            ends = numpy.cumsum(lengths)
+            positions = self.statement_indices[
+                numpy.arange(ends[-1] if len(ends) else 0)
+                - numpy.repeat(ends - lengths - starts, lengths)
+            ]
+            rows = numpy.repeat(rows, lengths)
+            order = numpy.lexsort((positions, rows))
+            values = statement_ids[positions[order]].tolist()
+            counts = numpy.bincount(rows, minlength=len(block_ids))
+            offsets = [0, *numpy.cumsum(counts).tolist()]
+            for i, sample in enumerate(block_ids):
+                found[sample] = values[offsets[i] : offsets[i + 1]]
+        return found
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(
+        prog="cohort",
+        description="lists the moalmanac db statements satisfied by each sample of a cohort.",
+    )
+    arg_parser.add_argument(
+        "alterations",
+        help="json or tab-separated file of sample alterations",
+    )
+    arg_parser.add_argument(
+        "--referenced",
+        help="directory of referenced json files",
+        default="referenced",
+    )
+    arg_parser.add_argument(
+        "--complete",
+        action="store_true",
+        help="treat each sample's alterations as its complete profile, so that wild type and absent biomarkers match",
+    )
+    arg_parser.add_argument(
+        "--block",
+        type=int,
+        help="number of samples evaluated at once. Default: 1024",
+        default=1024,
+    )
+    args = arg_parser.parse_args()
+
+    try:
+        profiles = match.read_alterations(args.alterations)
+    except ValueError as e:
+        arg_parser.exit(1, f"{e}\n")
+    referenced = read.referenced(args.referenced)
+    matcher = match.Matcher(referenced)
+    biomarkers = {
+        sample: matcher.biomarkers(alterations, complete=args.complete)
+        for sample, alterations in profiles.items()
+    }
+    print(
+        json.dumps(
+            Cohort(referenced).statements(biomarkers, block=args.block), indent=2
+        )
+    )
@@ -3,16 +3,27 @@
 from __future__ import annotations
 
 import argparse
+import concurrent.futures
 import dataclasses
+import json
 import os
 import pathlib
+import sys
+import time
+import types
 import typing
 
 # Local imports
-from utils import json_utils
+from utils import pagination
+from utils import ranking
 from utils import read
+from utils import stats
+from utils import therapy_index
 from utils import write
 
+if typing.TYPE_CHECKING:
+    from utils.cache import BuildCache
+
 
 @dataclasses.dataclass
 class FKSingle:
@@ -65,6 +76,16 @@ def strip_keys(*keys: str) -> typing.Callable[[dict], dict]:
     return lambda record: {k: v for k, v in record.items() if k not in keys}
 
 
+class _TableNames:
+    """
+    Stands in for a Database so that `get_table` callables return the name of the table they access, rather
+    than the table itself. This allows table dependencies to be read from `foreign_keys` without loading data.
+    """
+
+    def __getattr__(self, name: str) -> str:
+        return name
+
+
 def extract_url_value(url: dict) -> str:
     """
     Extracts the URL string from a resolved URL record.
@@ -78,6 +99,31 @@ def extract_url_value(url: dict) -> str:
     return url["url"]
 
 
+def get_record_by_id(
+    records_by_id: dict[typing.Any, list[dict]], value: typing.Any
+) -> dict:
+    """
+    Retrieves the single record with a given id from records grouped by id, as `json_utils.get_record_by_key_value`
+    does from a list of records with `strict=True`.
+
+    Args:
+        records_by_id (dict[typing.Any, list[dict]]): Records grouped by id, as in `BaseTable.records_by_id`.
+        value (typing.Any): The id to match.
+
+    Returns:
+        dict: The matching record.
+
+    Raises:
+        ValueError: If the number of records with the id is not exactly 1.
+    """
+    matches = records_by_id.get(value, [])
+    if len(matches) != 1:
+        raise ValueError(
+            f"Warning: Expected 1 result for id == {value}, found {len(matches)}."
+        )
+    return matches[0]
+
+
 class BaseTable:
     """
     A base class for managing and dereferencing records across database tables. This class provides common
@@ -88,9 +134,12 @@ class BaseTable:
         records (list[dict]): list of dictionaries that represent one table within the relational database.
         foreign_keys (list): Class-level list of FKSingle or FKList descriptors declaring this table's
             foreign key relationships. Subclasses override this at the class level to declare their relationships.
+        extra_dependencies (tuple[str, ...]): Class-level tuple of table names that are resolved by custom logic rather
+            than through `foreign_keys`.
     """
 
     foreign_keys: list = []
+    extra_dependencies: tuple[str, ...] = ()
 
     def __init__(self, records: list[dict]):
         """
@@ -101,6 +150,108 @@ class BaseTable:
         """
         self.records = records
         self._resolved = False
+        self._cache_key = None
+        self._from_cache = False
+        self._id_index = None
+        self._records_by_id = None
+
+    @classmethod
+    def dependencies(cls) -> set[str]:
+        """
+        Returns the names of the tables that this table references, directly.
+
+        Returns:
+            set[str]: Database attribute names of tables referenced by `foreign_keys` or `extra_dependencies`.
+        """
+        names = _TableNames()
+        return {fk.get_table(names) for fk in cls.foreign_keys} | set(
+            cls.extra_dependencies
+        )
+
+    @classmethod
+    def references(cls, record: dict) -> list[tuple[str, typing.Any]]:
+        """
+        Returns the records that a referenced (not yet dereferenced) record points to through `foreign_keys`.
+
+        Args:
+            record (dict): A record of this table, as read from its referenced JSON file.
+
+        Returns:
+            list[tuple[str, typing.Any]]: Pairs of referenced table name and referenced record id.
+        """
+        names = _TableNames()
+        references = []
+        for fk in cls.foreign_keys:
+            table = fk.get_table(names)
+            if isinstance(fk, FKSingle):
+                if record.get(fk.src_key) is not None:
+                    references.append((table, record[fk.src_key]))
+            else:
+                references.extend(
+                    (table, value) for value in record.get(fk.src_key) or []
+                )
+        return references
+
+    @property
+    def id_index(self) -> pagination.IdIndex:
+        """
+        The records of this table in stable id order, built on first use.
+        """
+        if self._id_index is None or len(self._id_index) != len(self.records):
+            self._id_index = pagination.IdIndex(record["id"] for record in self.records)
+        return self._id_index
+
+    @property
+    def records_by_id(self) -> dict[typing.Any, list[dict]]:
+        """
+        The records of this table grouped by id, built on first use, so that foreign keys are resolved without
+        scanning the table once per reference.
+        """
+        if self._records_by_id is None or self._records_by_id[0] != len(self.records):
+            index = {}
+            for record in self.records:
+                index.setdefault(record.get("id"), []).append(record)
+            self._records_by_id = (len(self.records), index)
+        return self._records_by_id[1]
+
+    def iter_records(self, cursor: str | None = None) -> typing.Iterator[dict]:
+        """
+        Yields the records of this table in stable id order, without copying them into a new list.
+
+        Args:
+            cursor (str | None): A cursor from `page`, to resume after the record it was issued for, or None to
+                start from the first record.
+
+        Yields:
+            dict: Each record.
+
+        Raises:
+            ValueError: If the cursor is malformed.
+        """
+        for position in self.id_index.iterate(cursor):
+            yield self.records[position]
+
+    def page(
+        self, cursor: str | None = None, limit: int = pagination.DEFAULT_LIMIT
+    ) -> pagination.Page:
+        """
+        Returns one page of the records of this table in stable id order.
+
+        Args:
+            cursor (str | None): The `next_cursor` of the previous page, or None for the first page.
+            limit (int): Maximum number of records in the page.
+
+        Returns:
+            pagination.Page: The page's records and the cursor for the next page.
+
+        Raises:
+            ValueError: If the cursor is malformed or the limit is not positive.
+        """
+        positions, next_cursor = self.id_index.page(cursor, limit=limit)
+        return pagination.Page(
+            items=[self.records[position] for position in positions],
+            next_cursor=next_cursor,
+        )
 
     def dereference(self, db: Database) -> None:
         """
@@ -119,15 +270,16 @@ class BaseTable:
         for fk in self.foreign_keys:
             table = fk.get_table(db)
             table.dereference(db)
+            referenced_records = table.records_by_id
             for record in self.records:
                 if isinstance(fk, FKSingle):
-                    self.dereference_single(record, fk.src_key, table.records)
+                    self.dereference_single(record, fk.src_key, referenced_records)
                     self.replace_key(record, fk.src_key, fk.dest_key)
                     if fk.post is not None:
                         record[fk.dest_key] = fk.post(dict(record[fk.dest_key]))
                 else:
                     self.dereference_list(
-                        record, fk.src_key, table.records, fk.key_always_present
+                        record, fk.src_key, referenced_records, fk.key_always_present
                     )
                     if fk.post is not None and fk.src_key in record:
                         record[fk.src_key] = [
@@ -138,7 +290,9 @@ class BaseTable:
 
     @staticmethod
     def dereference_single(
-        record: dict, referenced_key: str, referenced_records: list[dict]
+        record: dict,
+        referenced_key: str,
+        referenced_records: dict[typing.Any, list[dict]],
     ) -> None:
         """
         Dereferences a key for each record in records, where the key's value references a single record.
@@ -146,20 +300,17 @@ class BaseTable:
         Args:
             record (dict): the dictionary that contains a key to dereference.
             referenced_key (str): name of the key in `records` to dereference.
-            referenced_records (list[dict]): list of dictionaries that the `referenced_key` refers to.
+            referenced_records (dict[typing.Any, list[dict]]): records that the `referenced_key` refers to, grouped
+                by id as in `records_by_id`.
 
         Raises:
             KeyError: If the referenced_key is not found in a record.
+            ValueError: If not exactly one referenced record has the key's value as its id.
         """
         if referenced_key not in record:
             raise KeyError(f"Key '{referenced_key}' not found in {record}.")
 
-        referenced_record = json_utils.get_record_by_key_value(
-            records=referenced_records,
-            key="id",
-            value=record[referenced_key],
-            strict=True,
-        )
+        referenced_record = get_record_by_id(referenced_records, record[referenced_key])
 
         record[referenced_key] = referenced_record
 
@@ -167,7 +318,7 @@ class BaseTable:
     def dereference_list(
         record: dict,
         referenced_key: str,
-        referenced_records: list[dict],
+        referenced_records: dict[typing.Any, list[dict]],
         key_always_present: bool = True,
     ) -> None:
         """
@@ -176,11 +327,13 @@ class BaseTable:
         Args:
             record (dict): the dictionary that contains a key to dereference.
             referenced_key (str): name of the key in `record` to dereference.
-            referenced_records (str): list of dictionaries that the `referenced_key` refers to.
+            referenced_records (dict[typing.Any, list[dict]]): records that the `referenced_key` refers to, grouped
+                by id as in `records_by_id`.
             key_always_present (bool): If True, the `referenced_key` is present in all records.
 
         Raises:
             KeyError: If the `referenced_key` is not found in a record when `key_always_present` is True.
+            ValueError: If not exactly one referenced record has a listed value as its id.
         """
         if key_always_present and (referenced_key not in record):
             raise KeyError(
@@ -192,9 +345,7 @@ class BaseTable:
         else:
             _values = []
             for value in record[referenced_key]:
-                _value = json_utils.get_record_by_key_value(
-                    records=referenced_records, key="id", value=value
-                )
+                _value = get_record_by_id(referenced_records, value)
                 _values.append(_value)
             record[referenced_key] = _values
 
@@ -232,20 +383,37 @@ class BaseTable:
             raise KeyError(f"Key '{key}' not found in {record}")
         record.pop(key)
 
-    def write_records(self, output_dir: str, quiet: bool = False) -> None:
+    def write_records(
+        self, output_dir: str, quiet: bool = False, cache: BuildCache | None = None
+    ) -> None:
         """
         Writes each record in this table to its own JSON file in the given directory.
 
-        Each file is named `{record['id']}.json`.
+        Each file is named `{record['id']}.json`. With a cache, the serialized records are stored alongside the
+        resolved table so that unchanged tables are written without serializing them again.
 
         Args:
             output_dir (str): Directory path to write the individual record files into.
             quiet (bool): Suppress print statements if True.
+            cache (BuildCache | None): An instance of utils.cache.BuildCache, or None to serialize every record.
         """
-        for record in self.records:
-            filename = f"{record['id']}.json"
-            path = os.path.join(output_dir, filename)
-            write.dictionary(data=record, keys_list=[], file=path, quiet=quiet)
+        if cache is None or self._cache_key is None:
+            for record in self.records:
+                filename = f"{record['id']}.json"
+                path = os.path.join(output_dir, filename)
+                write.dictionary(data=record, keys_list=[], file=path, quiet=quiet)
+            return
+
+        key = cache.digest(self._cache_key, "records.json")
+        serialized = cache.get(key)
+        if serialized is None:
+            serialized = [
+                (record["id"], json.dumps(record, indent=2)) for record in self.records
+            ]
+            cache.put(key, serialized)
+        for record_id, content in serialized:
+            path = os.path.join(output_dir, f"{record_id}.json")
+            write.serialized(content=content, file=path, quiet=quiet)
 
 
 class Agents(BaseTable):
@@ -493,6 +661,7 @@ class Propositions(BaseTable):
         FKSingle("conditionQualifier_id", "conditionQualifier", lambda db: db.diseases),
         FKList("biomarkers", "biomarkers", lambda db: db.biomarkers),
     ]
+    extra_dependencies = ("therapies", "therapy_groups")
 
     def dereference(self, db: Database) -> None:
         """
@@ -517,6 +686,25 @@ class Propositions(BaseTable):
             therapies=db.therapies, therapy_groups=db.therapy_groups
         )
 
+    @classmethod
+    def references(cls, record: dict) -> list[tuple[str, typing.Any]]:
+        """
+        Returns the records that a referenced proposition points to, including the therapy or therapy group that is
+        resolved by `dereference_therapeutics`.
+
+        Args:
+            record (dict): A proposition record, as read from referenced/propositions.json.
+
+        Returns:
+            list[tuple[str, typing.Any]]: Pairs of referenced table name and referenced record id.
+        """
+        references = super().references(record)
+        if record.get("therapy_id") is not None:
+            references.append(("therapies", record["therapy_id"]))
+        if record.get("therapy_group_id") is not None:
+            references.append(("therapy_groups", record["therapy_group_id"]))
+        return references
+
     def dereference_therapeutics(
         self, therapies: Therapies, therapy_groups: TherapyGroups
     ) -> None:
@@ -538,7 +726,7 @@ class Propositions(BaseTable):
                 self.dereference_single(
                     record=record,
                     referenced_key="therapy_id",
-                    referenced_records=therapies.records,
+                    referenced_records=therapies.records_by_id,
                 )
                 self.replace_key(
                     record=record,
@@ -550,7 +738,7 @@ class Propositions(BaseTable):
                 self.dereference_single(
                     record=record,
                     referenced_key="therapy_group_id",
-                    referenced_records=therapy_groups.records,
+                    referenced_records=therapy_groups.records_by_id,
                 )
                 self.replace_key(
                     record=record,
@@ -576,8 +764,20 @@ class Statements(BaseTable):
 
     Attributes:
         records (list[dict]): A list of dictionaries representing the statement records.
+        summary (stats.StatementStats | None): Summary statistics of the statements, accumulated while they are
+            dereferenced. None until the table is dereferenced, or if it was loaded already dereferenced.
+        therapy_index (therapy_index.TherapyIndex | None): Index of the statements by therapy and therapy
+            combination, built while they are dereferenced and served by server.py. None until the table is
+            dereferenced, or if it was loaded already dereferenced.
+        rankings (ranking.StatementRanking | None): Sort keys of the statements and their order per gene, disease,
+            and therapy, computed while they are dereferenced. None until the table is dereferenced, or if it was
+            loaded already dereferenced.
     """
 
+    summary: stats.StatementStats | None = None
+    therapy_index: therapy_index.TherapyIndex | None = None
+    rankings: ranking.StatementRanking | None = None
+
     foreign_keys = [
         FKList("contributions", "contributions", lambda db: db.contributions),
         FKList("reportedIn", "reportedIn", lambda db: db.documents),
@@ -591,8 +791,8 @@ class Statements(BaseTable):
         Dereferences all referenced keys within the Statements table.
 
         Resolves foreign keys declared in `foreign_keys` via the base class, then copies the indication
-        description onto each statement record. Each table is resolved at most once; subsequent calls are
-        no-ops.
+        description onto each statement record and builds `summary`, `therapy_index`, and `rankings`. Each table is
+        resolved at most once; subsequent calls are no-ops.
 
         Args:
             db (Database): An instance of the Database class containing all tables.
@@ -606,6 +806,20 @@ class Statements(BaseTable):
                 description = indication.get("description")
                 if description is not None:
                     record["description"] = description
+        self.build_indexes()
+
+    def build_indexes(self) -> None:
+        """
+        Builds `summary`, `therapy_index`, and `rankings` from the records, which must already be dereferenced. Called
+        by `dereference`, and by utils.store for the statements of each release it holds.
+        """
+        self.summary = stats.StatementStats()
+        self.therapy_index = therapy_index.TherapyIndex()
+        self.rankings = ranking.StatementRanking()
+        for record in self.records:
+            self.summary.add(record)
+            self.therapy_index.add(record)
+            self.rankings.add(record)
 
 
 class Strengths(BaseTable):
@@ -674,7 +888,8 @@ class URLs(BaseTable):
 @dataclasses.dataclass
 class Database:
     """
-    A container holding all table instances for the relational database.
+    A container holding all table instances for the relational database. Tables that were not loaded, because no
+    requested output needs them, are None.
 
     Attributes:
         agents (Agents): An instance of the Agents class.
@@ -694,44 +909,446 @@ class Database:
         urls (URLs): An instance of the URLs class.
     """
 
-    agents: Agents
-    biomarkers: Biomarkers
-    codings: Codings
-    contributions: Contributions
-    diseases: Diseases
-    documents: Documents
-    genes: Genes
-    indications: Indications
-    mappings: Mappings
-    propositions: Propositions
-    statements: Statements
-    strengths: Strengths
-    therapies: Therapies
-    therapy_groups: TherapyGroups
-    urls: URLs
+    agents: Agents | None = None
+    biomarkers: Biomarkers | None = None
+    codings: Codings | None = None
+    contributions: Contributions | None = None
+    diseases: Diseases | None = None
+    documents: Documents | None = None
+    genes: Genes | None = None
+    indications: Indications | None = None
+    mappings: Mappings | None = None
+    propositions: Propositions | None = None
+    statements: Statements | None = None
+    strengths: Strengths | None = None
+    therapies: Therapies | None = None
+    therapy_groups: TherapyGroups | None = None
+    urls: URLs | None = None
+
+
+TABLE_CLASSES: dict[str, type[BaseTable]] = {
+    "agents": Agents,
+    "biomarkers": Biomarkers,
+    "codings": Codings,
+    "contributions": Contributions,
+    "diseases": Diseases,
+    "documents": Documents,
+    "genes": Genes,
+    "indications": Indications,
+    "mappings": Mappings,
+    "propositions": Propositions,
+    "statements": Statements,
+    "strengths": Strengths,
+    "therapies": Therapies,
+    "therapy_groups": TherapyGroups,
+    "urls": URLs,
+}
+
+
+def dependency_graph() -> dict[str, set[str]]:
+    """
+    Returns the tables that each table references directly, derived from each table's `foreign_keys`.
+
+    Returns:
+        dict[str, set[str]]: Direct dependencies, keyed by table name.
+    """
+    return {name: table.dependencies() for name, table in TABLE_CLASSES.items()}
+
 
+def required_tables(
+    tables: typing.Iterable[str], graph: dict[str, set[str]] | None = None
+) -> set[str]:
+    """
+    Returns the given tables and every table that they transitively reference, which are the tables that must be
+    loaded to dereference them.
 
-def populate_statement_description(statements: list[dict], indications: list[dict]):
+    Args:
+        tables (Iterable[str]): Names of tables, e.g. tables whose dereferenced records are to be written.
+        graph (dict[str, set[str]] | None): Direct dependencies keyed by table name. Default: `dependency_graph()`.
+
+    Returns:
+        set[str]: The given tables and all tables that they depend on.
+
+    Raises:
+        KeyError: If a table does not exist.
+    """
+    graph = dependency_graph() if graph is None else graph
+    needed = set()
+    pending = list(tables)
+    while pending:
+        name = pending.pop()
+        if name not in needed:
+            needed.add(name)
+            pending.extend(graph[name])
+    return needed
+
+
+def topological_order(graph: dict[str, set[str]] | None = None) -> list[str]:
     """
-    Populates the description field for statements from the description field from the associated indication.
+    Orders tables so that every table comes after the tables it references.
 
     Args:
-        indications (list[dict]): List of dictionaries of database indications.
-        statements (list[dict]): List of dictionaries of database statements.
+        graph (dict[str, set[str]] | None): Direct dependencies keyed by table name. Default: `dependency_graph()`.
 
     Returns:
-        list[dict]: List of dictionaries of database statements, with description value copied from indications for statements associated with an indication.
+        list[str]: Table names in dependency order, ties broken alphabetically.
+
+    Raises:
+        ValueError: If the tables reference each other in a cycle.
+    """
+    graph = dependency_graph() if graph is None else graph
+    remaining = {name: set(references) for name, references in graph.items()}
+    order = []
+    while remaining:
+        ready = sorted(name for name, references in remaining.items() if not references)
+        if not ready:
+            # Follow references among the remaining tables until one repeats, to name the tables in the cycle
+            path = [min(remaining)]
+            while path[-1] not in path[:-1]:
+                path.append(min(remaining[path[-1]]))
+            cycle = path[path.index(path[-1]) :]
+            raise ValueError(f"Cycle detected between tables: {' -> '.join(cycle)}")
+        for name in ready:
+            del remaining[name]
+        for references in remaining.values():
+            references.difference_update(ready)
+        order.extend(ready)
+    return order
+
+
+def dependents(tables: set[str]) -> set[str]:
     """
-    for statement in statements:
-        indication_id = statement.get("indication_id", None)
-        if indication_id:
-            indication_record = json_utils.get_record_by_key_value(
-                records=indications, key="id", value=indication_id
+    Returns the given tables and every table that transitively references any of them.
+
+    Args:
+        tables (set[str]): Names of tables, e.g. tables whose records have changed.
+
+    Returns:
+        set[str]: The given tables and all tables that depend on them.
+    """
+    graph = dependency_graph()
+    affected = set(tables)
+    changed = True
+    while changed:
+        changed = False
+        for name, references in graph.items():
+            if name not in affected and references & affected:
+                affected.add(name)
+                changed = True
+    return affected
+
+
+@dataclasses.dataclass
+class Schedule:
+    """
+    Timings of a scheduled dereference, in seconds since the schedule started.
+
+    Attributes:
+        timings (dict[str, tuple[float, float]]): Start and end time of each table's resolution, in completion order.
+        critical_path (list[str]): The chain of dependent tables with the longest total resolution time, from the
+            first table resolved to the last. No schedule can finish sooner than the sum of their durations.
+        elapsed (float): Time from the start of the schedule until every table was resolved.
+        workers (int): Number of worker threads.
+    """
+
+    timings: dict[str, tuple[float, float]]
+    critical_path: list[str]
+    elapsed: float
+    workers: int
+
+    def report(self) -> str:
+        """
+        Formats the timings as a human-readable table, marking tables on the critical path with `*`.
+
+        Returns:
+            str: One line per table, then the critical path and its total duration.
+        """
+        lines = []
+        for name, (start, end) in sorted(
+            self.timings.items(), key=lambda item: item[1]
+        ):
+            marker = "*" if name in self.critical_path else " "
+            lines.append(
+                f"{marker} {name:<16}{start * 1000:>9.1f} ms{(end - start) * 1000:>9.1f} ms"
             )
-            if indication_record:
-                statement["description"] = indication_record["description"]
-    write.records(data=statements, file=os.path.join("referenced", "statements.json"))
-    return statements
+        critical = sum(
+            self.timings[name][1] - self.timings[name][0] for name in self.critical_path
+        )
+        lines.append(
+            f"critical path: {' -> '.join(self.critical_path)} ({critical * 1000:.1f} ms)"
+        )
+        lines.append(f"elapsed: {self.elapsed * 1000:.1f} ms, workers: {self.workers}")
+        return "\n".join(lines)
+
+
+def critical_path(graph: dict[str, set[str]], durations: dict[str, float]) -> list[str]:
+    """
+    Returns the chain of dependent tables with the longest total duration.
+
+    Args:
+        graph (dict[str, set[str]]): Direct dependencies keyed by table name.
+        durations (dict[str, float]): Duration of each table's resolution.
+
+    Returns:
+        list[str]: Table names, each referenced by the next.
+    """
+    finish = {}
+    previous = {}
+    for name in topological_order(graph):
+        before = max(graph[name], key=lambda d: (finish[d], d), default=None)
+        previous[name] = before
+        finish[name] = durations.get(name, 0.0) + (finish[before] if before else 0.0)
+    name = max(finish, key=lambda n: (finish[n], n))
+    path = []
+    while name is not None:
+        path.append(name)
+        name = previous[name]
+    return path[::-1]
+
+
+def dereference_concurrently(
+    db: Database, workers: int | None = None, tables: set[str] | None = None
+) -> Schedule:
+    """
+    Dereferences tables on a thread pool, resolving each table as soon as every table it references is resolved,
+    so that independent tables, such as documents and genes, are resolved at the same time.
+
+    The dependency graph is derived from `foreign_keys` and checked for cycles before any table is resolved. Tables
+    that are already resolved, e.g. loaded from the build cache, complete immediately.
+
+    Args:
+        db (Database): An instance of the Database class containing all tables.
+        workers (int | None): Number of worker threads. If None, one per CPU.
+        tables (set[str] | None): Tables to resolve, along with the tables they depend on. If None, all tables.
+
+    Returns:
+        Schedule: Per-table timings and the critical path.
+
+    Raises:
+        ValueError: If the tables reference each other in a cycle.
+    """
+    graph = dependency_graph()
+    topological_order(graph)
+    workers = workers or os.cpu_count() or 1
+    if tables is not None:
+        graph = {name: graph[name] for name in required_tables(tables, graph)}
+    remaining = {name: set(references) for name, references in graph.items()}
+    waiting = {name: set() for name in graph}
+    for name, references in graph.items():
+        for reference in references:
+            waiting[reference].add(name)
+
+    origin = time.perf_counter()
+    timings = {}
+
+    def resolve(name):
+        start = time.perf_counter() - origin
+        getattr(db, name).dereference(db)
+        return name, start, time.perf_counter() - origin
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+        running = set()
+
+        def submit_ready():
+            for name in sorted(
+                n for n, references in remaining.items() if not references
+            ):
+                del remaining[name]
+                running.add(executor.submit(resolve, name))
+
+        submit_ready()
+        while running:
+            done, _ = concurrent.futures.wait(
+                running, return_when=concurrent.futures.FIRST_COMPLETED
+            )
+            for future in done:
+                running.discard(future)
+                name, start, end = future.result()
+                timings[name] = (start, end)
+                for dependent in waiting[name]:
+                    remaining[dependent].discard(name)
+            submit_ready()
+
+    durations = {name: end - start for name, (start, end) in timings.items()}
+    return Schedule(
+        timings=timings,
+        critical_path=critical_path(graph, durations),
+        elapsed=time.perf_counter() - origin,
+        workers=workers,
+    )
+
+
+def build_database(records: dict[str, list[dict]]) -> Database:
+    """
+    Constructs a Database of unresolved tables from referenced records.
+
+    Args:
+        records (dict[str, list[dict]]): Referenced records keyed by table name, for every table in `TABLE_CLASSES`.
+
+    Returns:
+        Database: A Database whose tables have not yet been dereferenced.
+    """
+    return Database(
+        **{name: table(records=records[name]) for name, table in TABLE_CLASSES.items()}
+    )
+
+
+def load_database(
+    input_paths: dict,
+    cache: BuildCache | None = None,
+    tables: typing.Iterable[str] | None = None,
+    workers: int | None = None,
+) -> Database:
+    """
+    Reads referenced JSON files into a Database, loading tables from a build cache where possible.
+
+    Only the requested tables and the tables they transitively reference, see `required_tables`, are read; the
+    remaining tables of the Database are None. Files are read and parsed concurrently on a thread pool.
+
+    With a cache, each table is assigned a key from the content of its referenced file and the keys of the tables it
+    depends on, as well as the source of the modules that resolve it, see `table_keys`. Tables with a resolved entry
+    for their key are loaded already dereferenced; other tables are parsed, using the cache's parsed entries where
+    possible.
+
+    Args:
+        input_paths (dict): Dictionary of paths to referenced JSON files.
+        cache (BuildCache | None): An instance of utils.cache.BuildCache, or None to read every file.
+        tables (Iterable[str] | None): Names of the tables to be dereferenced, or None for all tables.
+        workers (int | None): Number of threads to read files on. If None, one per table read.
+
+    Returns:
+        Database: A Database whose tables are resolved if loaded from the cache, and unresolved otherwise.
+
+    Raises:
+        KeyError: If a table does not exist.
+    """
+    graph = dependency_graph()
+    needed = set(TABLE_CLASSES) if tables is None else required_tables(tables, graph)
+    names = [name for name in TABLE_CLASSES if name in needed]
+    workers = workers or len(names) or 1
+
+    if cache is None:
+
+        def load(name):
+            return TABLE_CLASSES[name](
+                records=read.json_records(file=input_paths[name])
+            )
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+            return Database(**dict(zip(names, executor.map(load, names))))
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+        digests = dict(
+            zip(
+                names,
+                executor.map(lambda name: cache.file_digest(input_paths[name]), names),
+            )
+        )
+    keys = table_keys(input_paths, cache, tables=names, digests=digests)
+
+    def load_cached(name):
+        table_class = TABLE_CLASSES[name]
+        resolved = cache.get(keys[name])
+        if resolved is None:
+            table = table_class(
+                records=cache.parsed(input_paths[name], digest=digests[name])
+            )
+        else:
+            table = table_class(records=resolved)
+            table._resolved = True
+            table._from_cache = True
+        table._cache_key = keys[name]
+        return table
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+        return Database(**dict(zip(names, executor.map(load_cached, names))))
+
+
+def source_files() -> list[str]:
+    """
+    Returns the source files of this module and of every module of this package that it imports, directly or
+    through other modules, which together determine the resolved records of each table.
+
+    Returns:
+        list[str]: Paths of the source files, sorted.
+    """
+    seen = {}
+    pending = [sys.modules[__name__]]
+    while pending:
+        module = pending.pop()
+        if module.__file__ in seen:
+            continue
+        seen[module.__file__] = module
+        for value in vars(module).values():
+            if isinstance(value, types.ModuleType) and value.__name__.startswith(
+                f"{__package__}."
+            ):
+                pending.append(value)
+    return sorted(seen)
+
+
+def table_keys(
+    input_paths: dict,
+    cache: BuildCache,
+    tables: typing.Iterable[str],
+    digests: dict[str, str] | None = None,
+) -> dict[str, str]:
+    """
+    Returns the build cache key of each table, a digest of the content of its referenced file and the keys of the
+    tables it depends on, as well as the source of the modules returned by `source_files`.
+
+    Args:
+        input_paths (dict): Dictionary of paths to referenced JSON files.
+        cache (BuildCache): An instance of utils.cache.BuildCache.
+        tables (Iterable[str]): Names of tables; keys are returned for these and every table they depend on.
+        digests (dict[str, str] | None): Digests of referenced files already computed by `cache.file_digest`, keyed by
+            table name.
+
+    Returns:
+        dict[str, str]: Cache keys, keyed by table name.
+    """
+    graph = dependency_graph()
+    digests = dict(digests or {})
+    code_version = cache.digest(*[cache.file_digest(path) for path in source_files()])
+    keys = {}
+
+    def table_key(name):
+        if name not in keys:
+            if name not in digests:
+                digests[name] = cache.file_digest(input_paths[name])
+            dependencies = sorted(graph[name])
+            keys[name] = cache.digest(
+                code_version,
+                name,
+                digests[name],
+                *[f"{d}={table_key(d)}" for d in dependencies],
+            )
+        return keys[name]
+
+    for name in tables:
+        table_key(name)
+    return keys
+
+
+def store_database(db: Database, cache: BuildCache) -> None:
+    """
+    Stores resolved tables that were not loaded from the cache, then evicts least recently used entries.
+
+    Args:
+        db (Database): A Database created by `load_database` with the same cache.
+        cache (BuildCache): An instance of utils.cache.BuildCache.
+    """
+    for name in TABLE_CLASSES:
+        table = getattr(db, name)
+        if (
+            table is not None
+            and table._resolved
+            and not table._from_cache
+            and table._cache_key
+        ):
+            cache.put(table._cache_key, table.records)
+            table._from_cache = True
+    cache.evict()
 
 
 def clear_output_dir(output_dir: str, quiet: bool = False) -> None:
@@ -768,67 +1385,162 @@ _CONCEPT_DIRS = [
 
 
 def write_all_concepts(
-    input_paths: dict, clear: bool = False, quiet: bool = False
+    input_paths: dict,
+    clear: bool = False,
+    quiet: bool = False,
+    cache: BuildCache | None = None,
+    workers: int | None = 1,
+    tables: typing.Iterable[str] | None = None,
 ) -> None:
     """
-    Writes per-concept JSON files for all 14 entity types to their output directories.
+    Writes per-concept JSON files for all 14 entity types, or a subset of them, to their output directories.
 
     Constructs a fresh Database from the raw input files (independent of any already-resolved
-    full-DB tables), dereferences each entity, and writes one JSON file per record to
-    `dereferenced/<entity>/<id>.json`.
+    full-DB tables), reading only the files that the requested entities depend on, dereferences each entity, and
+    writes one JSON file per record to `dereferenced/<entity>/<id>.json`.
 
     Args:
         input_paths (dict): Dictionary of paths to referenced JSON files.
         clear (bool): If True, remove existing JSON files from each output directory first.
         quiet (bool): Suppress print statements if True.
+        cache (BuildCache | None): An instance of utils.cache.BuildCache, or None to build without a cache.
+        workers (int | None): Number of threads to dereference tables on, see `dereference_concurrently`.
+        tables (Iterable[str] | None): Names of the entity types to write, or None for all of them.
+
+    Raises:
+        ValueError: If a table has no concept output directory.
     """
+    concept_dirs = _CONCEPT_DIRS
+    if tables is not None:
+        tables = set(tables)
+        unknown = tables - {attr for attr, _ in _CONCEPT_DIRS}
+        if unknown:
+            raise ValueError(
+                f"No concept output directory for tables: {', '.join(sorted(unknown))}"
+            )
+        concept_dirs = [
+            (attr, output_dir) for attr, output_dir in _CONCEPT_DIRS if attr in tables
+        ]
+
     if clear:
-        for _, output_dir in _CONCEPT_DIRS:
+        for _, output_dir in concept_dirs:
             clear_output_dir(output_dir, quiet=quiet)
 
-    db = Database(
-        agents=Agents(records=read.json_records(file=input_paths["agents"])),
-        biomarkers=Biomarkers(
-            records=read.json_records(file=input_paths["biomarkers"])
-        ),
-        codings=Codings(records=read.json_records(file=input_paths["codings"])),
-        contributions=Contributions(
-            records=read.json_records(file=input_paths["contributions"])
-        ),
-        diseases=Diseases(records=read.json_records(file=input_paths["diseases"])),
-        documents=Documents(records=read.json_records(file=input_paths["documents"])),
-        genes=Genes(records=read.json_records(file=input_paths["genes"])),
-        indications=Indications(
-            records=read.json_records(file=input_paths["indications"])
-        ),
-        mappings=Mappings(records=read.json_records(file=input_paths["mappings"])),
-        propositions=Propositions(
-            records=read.json_records(file=input_paths["propositions"])
-        ),
-        statements=Statements(
-            records=read.json_records(file=input_paths["statements"])
-        ),
-        strengths=Strengths(records=read.json_records(file=input_paths["strengths"])),
-        therapies=Therapies(records=read.json_records(file=input_paths["therapies"])),
-        therapy_groups=TherapyGroups(
-            records=read.json_records(file=input_paths["therapy_groups"])
-        ),
-        urls=URLs(records=read.json_records(file=input_paths["urls"])),
-    )
+    requested = {attr for attr, _ in concept_dirs}
+    db = load_database(input_paths, cache=cache, tables=requested)
+    dereference_concurrently(db, workers=workers, tables=requested)
+
+    for attr, output_dir in concept_dirs:
+        getattr(db, attr).write_records(output_dir, quiet=quiet, cache=cache)
+
+    if cache is not None:
+        store_database(db, cache)
+
 
-    for attr, output_dir in _CONCEPT_DIRS:
-        table = getattr(db, attr)
-        table.dereference(db)
-        table.write_records(output_dir, quiet=quiet)
+def write_outputs(
+    db: Database,
+    about: dict,
+    input_paths: dict,
+    output: str,
+    cache: BuildCache | None = None,
+    stats_file: str | None = None,
+    binary_file: str | None = None,
+    rankings_file: str | None = None,
+    serialized: str | None = None,
+) -> dict:
+    """
+    Writes the single-file outputs of a database whose statements have been dereferenced.
 
+    Args:
+        db (Database): A Database whose statements have been dereferenced.
+        about (dict): Database metadata, from referenced/about.json.
+        input_paths (dict): Dictionary of paths to referenced JSON files.
+        output (str): File path for the dereferenced JSON output.
+        cache (BuildCache | None): An instance of utils.cache.BuildCache, or None to build without a cache.
+        stats_file (str | None): File path to write summary statistics of the statements to, or None to skip.
+        binary_file (str | None): File path to also write the dereferenced database to in the binary format of
+            utils.write.binary, or None to skip.
+        rankings_file (str | None): File path to write the rank order of the statements, overall and per gene,
+            disease, and therapy, to, or None to skip.
+        serialized (str | None): The dereferenced JSON output already serialized with `indent=2`, if available.
 
-def main(input_paths):
+    Returns:
+        dict: Dereferenced database, with keys `about` and `content`.
+    """
+    if stats_file:
+        # Statistics are accumulated while statements are dereferenced, unless they were loaded from the cache
+        if db.statements.summary is not None:
+            summary = db.statements.summary.to_dict()
+        else:
+            summary = stats.summarize(db.statements.records)
+        write.dictionary(data=summary, keys_list=[], file=stats_file)
+
+    if rankings_file:
+        # Sort keys are computed while statements are dereferenced, unless they were loaded from the cache
+        if db.statements.rankings is not None:
+            rankings = db.statements.rankings.to_dict()
+        else:
+            rankings = ranking.rank(db.statements.records)
+        write.dictionary(data=rankings, keys_list=[], file=rankings_file)
+
+    data = {"about": about, "content": db.statements.records}
+    if serialized is not None:
+        write.serialized(content=serialized, file=output)
+    elif cache is None:
+        write.dictionary(data=data, keys_list=["content"], file=output)
+    else:
+        key = cache.digest(
+            db.statements._cache_key,
+            cache.file_digest(input_paths["about"]),
+            "dereferenced.json",
+        )
+        serialized = cache.get(key)
+        if serialized is None:
+            serialized = json.dumps(data, indent=2)
+            cache.put(key, serialized)
+        write.serialized(content=serialized, file=output)
+
+    if binary_file:
+        content = None
+        if cache is not None:
+            key = cache.digest(
+                db.statements._cache_key,
+                cache.file_digest(input_paths["about"]),
+                "dereferenced.msgpack",
+            )
+            content = cache.get(key)
+            if content is None:
+                content = write.encode_binary(data)
+                cache.put(key, content)
+        write.binary(data=data, file=binary_file, content=content)
+    return data
+
+
+def main(
+    input_paths,
+    output: str = "moalmanac-draft.dereferenced.json",
+    cache: BuildCache | None = None,
+    stats_file: str | None = None,
+    workers: int | None = 1,
+    timings: bool = False,
+    binary_file: str | None = None,
+    rankings_file: str | None = None,
+):
     """
     Creates a single JSON file for the Molecular Oncology Almanac (moalmanac) database by dereferencing
     referenced JSON files. By default, these are located in the referenced/ folder of this repository.
 
     Args:
         input_paths (dict): Dictionary of paths to referenced JSON files.
+        output (str): File path for the dereferenced JSON output.
+        cache (BuildCache | None): An instance of utils.cache.BuildCache, or None to build without a cache.
+        stats_file (str | None): File path to write summary statistics of the statements to, or None to skip.
+        workers (int | None): Number of threads to dereference tables on, see `dereference_concurrently`.
+        timings (bool): If True, print the time taken to dereference each table and the critical path.
+        binary_file (str | None): File path to also write the dereferenced database to in the binary format of
+            utils.write.binary, or None to skip.
+        rankings_file (str | None): File path to write the rank order of the statements, overall and per gene,
+            disease, and therapy, to, or None to skip.
 
     Returns:
         dict: Dereferenced database, with keys:
@@ -836,70 +1548,29 @@ def main(input_paths):
             - content (list[dict]): List of dictionaries containing the dereferenced database.
     """
 
-    # Step 1: Read JSON files
+    # Step 1: Read the JSON files that statements depend on and generate table objects, reusing cached tables where
+    # inputs are unchanged
     about = read.json_records(file=input_paths["about"])
-    agents = read.json_records(file=input_paths["agents"])
-    biomarkers = read.json_records(file=input_paths["biomarkers"])
-    codings = read.json_records(file=input_paths["codings"])
-    contributions = read.json_records(file=input_paths["contributions"])
-    diseases = read.json_records(file=input_paths["diseases"])
-    documents = read.json_records(file=input_paths["documents"])
-    genes = read.json_records(file=input_paths["genes"])
-    indications = read.json_records(file=input_paths["indications"])
-    mappings = read.json_records(file=input_paths["mappings"])
-    propositions = read.json_records(file=input_paths["propositions"])
-    statements = read.json_records(file=input_paths["statements"])
-    strengths = read.json_records(file=input_paths["strengths"])
-    therapies = read.json_records(file=input_paths["therapies"])
-    therapy_groups = read.json_records(file=input_paths["therapy_groups"])
-    urls = read.json_records(file=input_paths["urls"])
-
-    statements = populate_statement_description(
-        indications=indications,
-        statements=statements,
+    db = load_database(input_paths, cache=cache, tables={"statements"})
+
+    # Step 2: Dereference the database and generate statements, resolving independent tables concurrently
+    schedule = dereference_concurrently(db, workers=workers, tables={"statements"})
+    if timings:
+        print(schedule.report())
+    if cache is not None:
+        store_database(db, cache)
+
+    return write_outputs(
+        db,
+        about=about,
+        input_paths=input_paths,
+        output=output,
+        cache=cache,
+        stats_file=stats_file,
+        binary_file=binary_file,
+        rankings_file=rankings_file,
     )
 
-    # Step 2: Generate table objects
-    agents = Agents(records=agents)
-    biomarkers = Biomarkers(records=biomarkers)
-    codings = Codings(records=codings)
-    contributions = Contributions(records=contributions)
-    diseases = Diseases(records=diseases)
-    documents = Documents(records=documents)
-    genes = Genes(records=genes)
-    indications = Indications(records=indications)
-    mappings = Mappings(records=mappings)
-    propositions = Propositions(records=propositions)
-    statements = Statements(records=statements)
-    strengths = Strengths(records=strengths)
-    therapies = Therapies(records=therapies)
-    therapy_groups = TherapyGroups(records=therapy_groups)
-    urls = URLs(records=urls)
-
-    # Step 3: Dereference the database and generate statements
-    db = Database(
-        agents=agents,
-        biomarkers=biomarkers,
-        codings=codings,
-        contributions=contributions,
-        diseases=diseases,
-        documents=documents,
-        genes=genes,
-        indications=indications,
-        mappings=mappings,
-        propositions=propositions,
-        statements=statements,
-        strengths=strengths,
-        therapies=therapies,
-        therapy_groups=therapy_groups,
-        urls=urls,
-    )
-    statements.dereference(db)
-
-    data = {"about": about, "content": statements.records}
-    write.dictionary(data=data, keys_list=["content"], file=args.output)
-    return data
-
 
 if __name__ == "__main__":
     arg_parser = argparse.ArgumentParser(
@@ -1002,11 +1673,99 @@ if __name__ == "__main__":
         action="store_true",
         help="Remove existing JSON files from all concept output directories before writing.",
     )
+    arg_parser.add_argument(
+        "--only",
+        nargs="+",
+        choices=[attr for attr, _ in _CONCEPT_DIRS],
+        metavar="TABLE",
+        help="Only write per-concept JSON files for these tables, reading only the referenced files they depend on, "
+        "and skip the single-file outputs.",
+    )
     arg_parser.add_argument(
         "--quiet",
         action="store_true",
         help="Suppress print messages when writing individual entities",
     )
+    arg_parser.add_argument(
+        "--stats",
+        help="Output json file for summary statistics of the statements. Use --stats '' to skip. Default: stats.json",
+        default="stats.json",
+    )
+    arg_parser.add_argument(
+        "--binary",
+        help="Output file for the dereferenced database in a compact binary format, see utils.read.binary_records. Use --binary '' to skip. Default: moalmanac-draft.dereferenced.msgpack",
+        default="moalmanac-draft.dereferenced.msgpack",
+    )
+    arg_parser.add_argument(
+        "--rankings",
+        help="Output json file for the rank order of statements, overall and per gene, disease, and therapy. Default: not written",
+        default=None,
+    )
+    arg_parser.add_argument(
+        "--shards",
+        help="Directory to write per-gene, per-disease, and per-therapy statement bundles into. Default: not written",
+        default=None,
+    )
+    arg_parser.add_argument(
+        "--search-index",
+        help="File to write a full-text search index of statements, indications, and documents to. Default: not written",
+        default=None,
+    )
+    arg_parser.add_argument(
+        "--sync-descriptions",
+        action="store_true",
+        help="Before building, copy indication descriptions onto referenced statements and write the statements file if any changed.",
+    )
+    arg_parser.add_argument(
+        "--cache",
+        action=argparse.BooleanOptionalAction,
+        default=True,
+        help="Reuse parsed and dereferenced tables from the build cache when their inputs are unchanged. Use --no-cache to rebuild everything.",
+    )
+    arg_parser.add_argument(
+        "--cache-dir",
+        help="Directory for the build cache. Default: .moalmanac-cache",
+        default=".moalmanac-cache",
+    )
+    arg_parser.add_argument(
+        "--cache-max-mb",
+        type=int,
+        default=512,
+        help="Maximum size of the build cache in megabytes. Default: 512",
+    )
+    arg_parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="Keep running and rebuild affected outputs whenever a referenced file changes.",
+    )
+    arg_parser.add_argument(
+        "--poll",
+        action="store_true",
+        help="With --watch, poll for file changes instead of using inotify.",
+    )
+    arg_parser.add_argument(
+        "--poll-interval",
+        type=float,
+        default=0.2,
+        help="With --watch, seconds between polls for file changes. Default: 0.2",
+    )
+    arg_parser.add_argument(
+        "--validate",
+        action=argparse.BooleanOptionalAction,
+        default=True,
+        help="Validate referenced files against their JSON schemas in schemas/ before building, and stop if any are invalid. Use --no-validate to skip.",
+    )
+    arg_parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Number of threads to dereference independent tables on concurrently. Use 0 for one per CPU. Default: 1",
+    )
+    arg_parser.add_argument(
+        "--timings",
+        action="store_true",
+        help="Print the time taken to dereference each table and the critical path through the table dependencies.",
+    )
     args = arg_parser.parse_args()
 
     input_data = {
@@ -1028,11 +1787,107 @@ if __name__ == "__main__":
         "urls": args.urls,
     }
 
-    dereferenced = main(input_paths=input_data)
+    if args.only and args.watch:
+        arg_parser.error("--only cannot be used with --watch")
+    if args.watch and (args.shards or args.search_index):
+        arg_parser.error("--shards and --search-index cannot be used with --watch")
+
+    if args.sync_descriptions:
+        from utils import populate_statement_description_from_indication
+
+        populate_statement_description_from_indication.main(
+            statements=read.json_records(file=args.statements),
+            indications=read.json_records(file=args.indications),
+            file=args.statements,
+        )
+
+    build_cache = None
+    if args.cache:
+        from utils.cache import BuildCache
+
+        build_cache = BuildCache(
+            directory=args.cache_dir, max_bytes=args.cache_max_mb * 1024**2
+        )
+
+    if args.validate:
+        from utils import validate
+
+        if args.only:
+            # Only the files that the requested tables depend on are read, so only those are validated
+            validated = {
+                name: input_data[name] for name in sorted(required_tables(args.only))
+            }
+        else:
+            validated = input_data
+        invalid = validate.validate_files(validated, cache=build_cache)
+        if invalid:
+            validate.report(invalid, limit=20, file=sys.stderr)
+            raise SystemExit(
+                f"Referenced files do not match their schemas: {', '.join(invalid)}"
+            )
+
+    if args.watch:
+        from utils import watch
+
+        if args.clear and args.write_concepts:
+            for _, output_dir in _CONCEPT_DIRS:
+                clear_output_dir(output_dir, quiet=args.quiet)
+        watch.run(
+            input_paths=input_data,
+            output=args.output,
+            write_concepts=args.write_concepts,
+            quiet=args.quiet,
+            interval=args.poll_interval,
+            polling=args.poll,
+            cache=build_cache,
+            check_schemas=args.validate,
+            stats_file=args.stats,
+            binary_file=args.binary,
+            rankings_file=args.rankings,
+        )
+        raise SystemExit(0)
+
+    if args.only:
+        write_all_concepts(
+            input_paths=input_data,
+            clear=args.clear,
+            quiet=args.quiet,
+            cache=build_cache,
+            workers=args.workers,
+            tables=args.only,
+        )
+        raise SystemExit(0)
+
+    dereferenced = main(
+        input_paths=input_data,
+        output=args.output,
+        cache=build_cache,
+        stats_file=args.stats,
+        workers=args.workers,
+        timings=args.timings,
+        binary_file=args.binary,
+        rankings_file=args.rankings,
+    )
+
+    if args.shards:
+        from utils import shards
+
+        shards.write_shards(
+            dereferenced["content"], output_dir=args.shards, quiet=args.quiet
+        )
+
+    if args.search_index:
+        from utils import search
+
+        search.SearchIndex.build(dereferenced["content"]).save(
+            args.search_index, quiet=args.quiet
+        )
 
     if args.write_concepts:
         write_all_concepts(
             input_paths=input_data,
             clear=args.clear,
             quiet=args.quiet,
+            cache=build_cache,
+            workers=args.workers,
         )
@@ -0,0 +1,336 @@
+import argparse
+import dataclasses
+import hashlib
+import json
+import os
+import subprocess
+import typing
+
+# Local imports
+from utils import dereference
+from utils import read
+
+
+@dataclasses.dataclass
+class TableDiff:
+    """
+    Differences between two versions of one table.
+
+    Attributes:
+        added (list): Ids of records only present in the new version.
+        removed (list): Ids of records only present in the old version.
+        modified (dict): Field level changes for records present in both versions with different content, keyed
+            by record id. Each change is a dictionary with keys `path`, `old`, and `new`.
+        dependency_changed (dict): Records that changed only because a record they depend on changed, keyed by
+            record id. For referenced trees, values are the changed `[table, id]` pairs that the record references
+            directly or transitively. For dereferenced outputs, values are the embedded fields that changed.
+    """
+
+    added: list = dataclasses.field(default_factory=list)
+    removed: list = dataclasses.field(default_factory=list)
+    modified: dict = dataclasses.field(default_factory=dict)
+    dependency_changed: dict = dataclasses.field(default_factory=dict)
+
+    def __bool__(self) -> bool:
+        return bool(
+            self.added or self.removed or self.modified or self.dependency_changed
+        )
+
+
+@dataclasses.dataclass
+class Source:
+    """
+    One version of the database to compare.
+
+    Attributes:
+        about (dict | None): Database metadata, if available.
+        tables (dict[str, list[dict]]): Records keyed by table name.
+        referenced (bool): True if the tables are referenced records, False if they are dereferenced statements.
+    """
+
+    about: dict | None
+    tables: dict[str, list[dict]]
+    referenced: bool
+
+
+def _git_json(revision: str, path: str) -> typing.Any:
+    result = subprocess.run(
+        ["git", "show", f"{revision}:{path}"],
+        capture_output=True,
+        check=True,
+        text=True,
+    )
+    return json.loads(result.stdout)
+
+
+def load_source(location: str) -> Source:
+    """
+    Loads a version of the database to compare.
+
+    Args:
+        location (str): One of
+            - a directory of referenced JSON files, such as `referenced`,
+            - a dereferenced JSON file, such as `moalmanac-draft.dereferenced.json`, or
+            - `git:<revision>`, to read referenced JSON files at a git revision, such as `git:main`.
+
+    Returns:
+        Source: The loaded tables.
+    """
+    if location.startswith("git:") and not os.path.exists(location):
+        revision = location[len("git:") :]
+        tables = {
+            table: _git_json(revision, f"referenced/{table}.json")
+            for table in read.REFERENCED_TABLES
+        }
+        return Source(
+            about=_git_json(revision, "referenced/about.json"),
+            tables=tables,
+            referenced=True,
+        )
+    if os.path.isdir(location):
+        about_path = os.path.join(location, "about.json")
+        about = (
+            read.json_records(file=about_path) if os.path.exists(about_path) else None
+        )
+        tables = {
+            table: read.json_records(file=os.path.join(location, f"{table}.json"))
+            for table in read.REFERENCED_TABLES
+            if os.path.exists(os.path.join(location, f"{table}.json"))
+        }
+        return Source(about=about, tables=tables, referenced=True)
+    data = read.json_records(file=location)
+    return Source(
+        about=data.get("about"),
+        tables={"statements": data["content"]},
+        referenced=False,
+    )
+
+
+def record_digest(record: typing.Any) -> bytes:
+    """
+    Returns a digest of a record's content that is independent of key order.
+
+    Args:
+        record (Any): A JSON serializable record.
+
+    Returns:
+        bytes: The SHA-256 digest of the record's canonical serialization.
+    """
+    canonical = json.dumps(record, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode()).digest()
+
+
+def changed_fields(old: typing.Any, new: typing.Any, path: str = "") -> list[dict]:
+    """
+    Lists the leaf values that differ between two JSON values.
+
+    Args:
+        old (Any): The old value.
+        new (Any): The new value.
+        path (str): Path of the values within their record, used as a prefix for reported paths.
+
+    Returns:
+        list[dict]: Changes, each a dictionary with keys `path`, `old`, and `new`. Dictionary keys are joined with
+            `.` and list indexes are written as `[i]`.
+    """
+    if isinstance(old, dict) and isinstance(new, dict):
+        changes = []
+        for key in list(old) + [key for key in new if key not in old]:
+            prefix = f"{path}.{key}" if path else str(key)
+            changes.extend(changed_fields(old.get(key), new.get(key), prefix))
+        return changes
+    if isinstance(old, list) and isinstance(new, list):
+        changes = []
+        for i in range(max(len(old), len(new))):
+            changes.extend(
+                changed_fields(
+                    old[i] if i < len(old) else None,
+                    new[i] if i < len(new) else None,
+                    f"{path}[{i}]",
+                )
+            )
+        return changes
+    if old == new and type(old) is type(new):
+        return []
+    return [{"path": path, "old": old, "new": new}]
+
+
+def diff_table(old: list[dict], new: list[dict]) -> TableDiff:
+    """
+    Compares two versions of a table by record id, hashing each record once.
+
+    Args:
+        old (list[dict]): Records of the old version.
+        new (list[dict]): Records of the new version.
+
+    Returns:
+        TableDiff: Added, removed, and modified records. `dependency_changed` is left empty.
+    """
+    old_records = {record["id"]: record for record in old}
+    new_records = {record["id"]: record for record in new}
+    result = TableDiff()
+    for record_id, record in new_records.items():
+        if record_id not in old_records:
+            result.added.append(record_id)
+        elif record_digest(record) != record_digest(old_records[record_id]):
+            result.modified[record_id] = changed_fields(old_records[record_id], record)
+    result.removed = [i for i in old_records if i not in new_records]
+    return result
+
+
+def diff(old: Source, new: Source) -> dict:
+    """
+    Compares two versions of the database.
+
+    For referenced trees, records that reference a changed record, directly or transitively, are reported under
+    `dependency_changed`. For dereferenced outputs, statements whose only changes are within embedded records, such
+    as `proposition` or `indication`, are reported under `dependency_changed` instead of `modified`.
+
+    Args:
+        old (Source): The old version.
+        new (Source): The new version.
+
+    Returns:
+        dict: Dictionary with keys `about`, a list of field changes to the database metadata, and `tables`, a
+            TableDiff for each table present in either version.
+
+    Raises:
+        ValueError: If one version is a referenced tree and the other is a dereferenced output.
+    """
+    if old.referenced != new.referenced:
+        raise ValueError(
+            "Cannot compare a referenced tree with a dereferenced output; compare like with like."
+        )
+
+    tables = {}
+    for name in sorted(set(old.tables) | set(new.tables)):
+        tables[name] = diff_table(old.tables.get(name, []), new.tables.get(name, []))
+
+    if new.referenced:
+        _propagate_dependencies(tables, new.tables)
+    else:
+        _split_embedded_changes(tables.get("statements", TableDiff()))
+
+    return {
+        "about": changed_fields(old.about, new.about) if old.about or new.about else [],
+        "tables": tables,
+    }
+
+
+def _propagate_dependencies(
+    tables: dict[str, TableDiff], records: dict[str, list[dict]]
+) -> None:
+    """
+    Marks records that transitively reference changed records, visiting tables in dependency order so that each
+    record is visited once.
+    """
+    changed = {}
+    for name, table in tables.items():
+        for record_id in table.added + table.removed + list(table.modified):
+            changed[(name, record_id)] = {(name, record_id)}
+
+    for name in dereference.topological_order():
+        table_class = dereference.TABLE_CLASSES[name]
+        for record in records.get(name, []):
+            key = (name, record["id"])
+            causes = set()
+            for reference in table_class.references(record):
+                causes |= changed.get(reference, set())
+            if not causes:
+                continue
+            if key not in changed:
+                tables[name].dependency_changed[record["id"]] = sorted(
+                    [list(cause) for cause in causes], key=str
+                )
+                changed[key] = causes
+            else:
+                changed[key] = changed[key] | causes
+
+
+def _split_embedded_changes(statements: TableDiff) -> None:
+    """
+    Moves statements of a dereferenced output whose changes are all within embedded records to `dependency_changed`.
+    """
+    embedded = {fk.dest_key for fk in dereference.Statements.foreign_keys}
+    for record_id, changes in list(statements.modified.items()):
+        roots = {change["path"].split(".")[0].split("[")[0] for change in changes}
+        if roots and roots <= embedded:
+            statements.dependency_changed[record_id] = sorted(roots)
+            del statements.modified[record_id]
+
+
+def to_dict(result: dict) -> dict:
+    """
+    Converts the result of `diff` to JSON serializable types.
+
+    Args:
+        result (dict): The result of `diff`.
+
+    Returns:
+        dict: The same result, with each TableDiff converted to a dictionary.
+    """
+    return {
+        "about": result["about"],
+        "tables": {
+            name: dataclasses.asdict(table)
+            for name, table in result["tables"].items()
+            if table
+        },
+    }
+
+
+def summarize(result: dict) -> str:
+    """
+    Formats the result of `diff` as a human-readable summary.
+
+    Args:
+        result (dict): The result of `diff`.
+
+    Returns:
+        str: One section per changed table, listing added (+), removed (-), modified (~), and dependency
+            changed (^) records.
+    """
+    lines = []
+    for change in result["about"]:
+        lines.append(f"about: {change['path']}: {change['old']!r} -> {change['new']!r}")
+    for name, table in result["tables"].items():
+        if not table:
+            continue
+        lines.append(
+            f"{name}: {len(table.added)} added, {len(table.removed)} removed, "
+            f"{len(table.modified)} modified, {len(table.dependency_changed)} changed through dependencies"
+        )
+        lines.extend(f"  + {record_id}" for record_id in table.added)
+        lines.extend(f"  - {record_id}" for record_id in table.removed)
+        for record_id, changes in table.modified.items():
+            lines.append(f"  ~ {record_id}: {', '.join(c['path'] for c in changes)}")
+        for record_id, causes in table.dependency_changed.items():
+            lines.append(f"  ^ {record_id}: {', '.join(map(str, causes))}")
+    return "\n".join(lines) if lines else "No differences."
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(
+        prog="diff",
+        description="compares two versions of moalmanac db by record, reporting added, removed, and modified records.",
+    )
+    arg_parser.add_argument(
+        "old",
+        help="old version: a referenced directory, a dereferenced json file, or git:<revision>",
+    )
+    arg_parser.add_argument(
+        "new",
+        help="new version: a referenced directory, a dereferenced json file, or git:<revision>",
+    )
+    arg_parser.add_argument(
+        "--json",
+        action="store_true",
+        help="print the full diff, including field level changes, as json",
+    )
+    args = arg_parser.parse_args()
+
+    differences = diff(load_source(args.old), load_source(args.new))
+    if args.json:
+        print(json.dumps(to_dict(differences), indent=2, default=str))
+    else:
+        print(summarize(differences))
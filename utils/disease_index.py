@@ -0,0 +1,314 @@
+import argparse
+import csv
+import json
+import os
+
+# Local imports
+from utils import read
+
+
+def read_hierarchy(file: str) -> dict[str, set[str]]:
+    """
+    Reads a disease ontology hierarchy from a local file as a mapping of each code to its parent codes.
+
+    Two formats are supported:
+    - JSON, either a list of records with `code` and `parent` keys (as returned by the OncoTree `tumorTypes` API)
+      or a dictionary of code to parent code(s).
+    - Tab-separated values with two columns, child code and parent code, one edge per row. A header row of
+      `code` and `parent` is optional.
+
+    Args:
+        file (str): Path to the hierarchy file.
+
+    Returns:
+        dict[str, set[str]]: Parent codes for each code. Root codes map to an empty set.
+
+    Raises:
+        ValueError: If the JSON file is neither a list of records nor a dictionary.
+    """
+    parents = {}
+
+    def add(code, parent):
+        parents.setdefault(code, set())
+        for value in parent if isinstance(parent, list) else [parent]:
+            if value not in (None, ""):
+                parents[code].add(value)
+                parents.setdefault(value, set())
+
+    if os.path.splitext(file)[1].lower() == ".json":
+        data = read.json_records(file=file)
+        if isinstance(data, list):
+            for record in data:
+                add(record["code"], record.get("parent"))
+        elif isinstance(data, dict):
+            for code, parent in data.items():
+                add(code, parent)
+        else:
+            raise ValueError(f"Unsupported hierarchy format in {file}")
+    else:
+        with open(file, newline="") as fp:
+            for row in csv.reader(fp, delimiter="\t"):
+                if not row or row[0].startswith("#") or row[:2] == ["code", "parent"]:
+                    continue
+                add(row[0].strip(), row[1].strip() if len(row) > 1 else None)
+    return parents
+
+
+def descendant_closure(parents: dict[str, set[str]]) -> dict[str, frozenset[str]]:
+    """
+    Computes the reflexive transitive closure of descendants for every code in a hierarchy.
+
+    Args:
+        parents (dict[str, set[str]]): Parent codes for each code, as returned by `read_hierarchy`.
+
+    Returns:
+        dict[str, frozenset[str]]: Every code that descends from each code, including the code itself.
+
+    Raises:
+        ValueError: If the hierarchy contains a cycle.
+    """
+    children = {code: set() for code in parents}
+    for code, code_parents in parents.items():
+        for parent in code_parents:
+            children.setdefault(parent, set()).add(code)
+
+    closure = {}
+    for root, root_children in children.items():
+        if root in closure:
+            continue
+        # Iterative post-order traversal so deep hierarchies do not hit the recursion limit
+        stack = [(root, iter(root_children))]
+        path = {root}
+        while stack:
+            code, remaining = stack[-1]
+            child = next(remaining, None)
+            if child is None:
+                stack.pop()
+                path.discard(code)
+                descendants = {code}
+                for value in children[code]:
+                    descendants |= closure[value]
+                closure[code] = frozenset(descendants)
+            elif child in path:
+                raise ValueError(f"Cycle detected in disease hierarchy at {child}")
+            elif child not in closure:
+                stack.append((child, iter(children[child])))
+                path.add(child)
+    return closure
+
+
+class DiseaseIndex:
+    """
+    Precomputed index of statements by disease that is aware of ontology hierarchies. Querying a parent tumor type,
+    such as NSCLC, returns statements on any of its descendant codes with a single dictionary access. Statements are
+    also indexed by the `solid_tumor` extension of their disease.
+
+    Without a hierarchy, each coding only matches itself, equivalent to an exact `conditionQualifier` match.
+    """
+
+    def __init__(
+        self,
+        codings: list[dict],
+        mappings: list[dict],
+        diseases: list[dict],
+        propositions: list[dict],
+        statements: list[dict],
+        hierarchies: dict[str, dict[str, set[str]]] | None = None,
+    ):
+        """
+        Builds the index from referenced records and optional ontology hierarchies.
+
+        Args:
+            codings (list[dict]): Records from referenced/codings.json.
+            mappings (list[dict]): Records from referenced/mappings.json.
+            diseases (list[dict]): Records from referenced/diseases.json.
+            propositions (list[dict]): Records from referenced/propositions.json.
+            statements (list[dict]): Records from referenced/statements.json.
+            hierarchies (dict[str, dict[str, set[str]]] | None): Hierarchies keyed by coding system prefix, such as
+                `oncotree` or `ncit`, as returned by `read_hierarchy`.
+        """
+        hierarchies = hierarchies or {}
+
+        # coding id -> disease ids, through both primary codings and mappings
+        mapping_codings = {mapping["id"]: mapping["coding_id"] for mapping in mappings}
+        diseases_by_coding = {}
+        self.diseases_by_solid_tumor = {True: set(), False: set()}
+        for disease in diseases:
+            disease_codings = [disease["primary_coding_id"]]
+            disease_codings += [mapping_codings[m] for m in disease.get("mappings", [])]
+            for coding_id in disease_codings:
+                diseases_by_coding.setdefault(coding_id, set()).add(disease["id"])
+            for extension in disease.get("extensions", []):
+                if extension["name"] == "solid_tumor":
+                    self.diseases_by_solid_tumor[bool(extension["value"])].add(
+                        disease["id"]
+                    )
+
+        # disease id -> statement ids
+        disease_by_proposition = {
+            proposition["id"]: proposition["conditionQualifier_id"]
+            for proposition in propositions
+        }
+        statements_by_disease = {}
+        for statement in statements:
+            disease_id = disease_by_proposition[statement["proposition_id"]]
+            statements_by_disease.setdefault(disease_id, set()).add(statement["id"])
+
+        # coding id -> descendant coding ids, including itself
+        descendants = {coding["id"]: frozenset([coding["id"]]) for coding in codings}
+        for system, parents in hierarchies.items():
+            for code, codes in descendant_closure(parents).items():
+                descendants[f"{system}:{code}"] = frozenset(
+                    f"{system}:{value}" for value in codes
+                )
+
+        # Materialize the closure for every coding so each query is a single lookup
+        self.diseases_by_coding = {}
+        self.statements_by_coding = {}
+        for coding_id, codes in descendants.items():
+            matched_diseases = set()
+            for code in codes:
+                matched_diseases |= diseases_by_coding.get(code, set())
+            matched_statements = set()
+            for disease_id in matched_diseases:
+                matched_statements |= statements_by_disease.get(disease_id, set())
+            self.diseases_by_coding[coding_id] = frozenset(matched_diseases)
+            self.statements_by_coding[coding_id] = frozenset(matched_statements)
+
+        self.statements_by_solid_tumor = {
+            value: frozenset(
+                statement_id
+                for disease_id in disease_ids
+                for statement_id in statements_by_disease.get(disease_id, set())
+            )
+            for value, disease_ids in self.diseases_by_solid_tumor.items()
+        }
+
+        # normalized coding id, code, or name -> coding ids
+        self._keys = {}
+        for coding_id in descendants:
+            self._keys.setdefault(coding_id.casefold(), set()).add(coding_id)
+            self._keys.setdefault(coding_id.split(":", 1)[-1].casefold(), set()).add(
+                coding_id
+            )
+        for coding in codings:
+            if coding.get("name"):
+                self._keys.setdefault(coding["name"].casefold(), set()).add(
+                    coding["id"]
+                )
+
+    @classmethod
+    def from_tables(
+        cls,
+        data: dict[str, list[dict]],
+        hierarchies: dict[str, dict[str, set[str]]] | None = None,
+    ) -> "DiseaseIndex":
+        """
+        Builds the index from a dictionary of referenced records keyed by table name.
+
+        Args:
+            data (dict[str, list[dict]]): Referenced records, as returned by `read.referenced`.
+            hierarchies (dict[str, dict[str, set[str]]] | None): Hierarchies keyed by coding system prefix.
+
+        Returns:
+            DiseaseIndex: The constructed index.
+        """
+        return cls(
+            codings=data["codings"],
+            mappings=data["mappings"],
+            diseases=data["diseases"],
+            propositions=data["propositions"],
+            statements=data["statements"],
+            hierarchies=hierarchies,
+        )
+
+    def coding_ids(self, term: str) -> set[str]:
+        """
+        Returns coding ids that match a coding id, code, or coding name, case-insensitively.
+
+        Args:
+            term (str): A coding id (`oncotree:NSCLC`), code (`NSCLC`), or coding name.
+
+        Returns:
+            set[str]: Matching coding ids.
+        """
+        return self._keys.get(term.strip().casefold(), set())
+
+    def diseases(self, term: str) -> frozenset[int]:
+        """
+        Returns ids of diseases coded by the term or any of its descendants.
+
+        Args:
+            term (str): A coding id, code, or coding name.
+
+        Returns:
+            frozenset[int]: Matching disease ids.
+        """
+        matches = [self.diseases_by_coding[c] for c in self.coding_ids(term)]
+        return frozenset().union(*matches)
+
+    def statements(self, term: str, solid_tumor: bool | None = None) -> frozenset[int]:
+        """
+        Returns ids of statements on diseases coded by the term or any of its descendants.
+
+        Args:
+            term (str): A coding id, code, or coding name.
+            solid_tumor (bool | None): If provided, restrict to statements whose disease has this `solid_tumor` value.
+
+        Returns:
+            frozenset[int]: Matching statement ids.
+        """
+        matches = [self.statements_by_coding[c] for c in self.coding_ids(term)]
+        result = frozenset().union(*matches)
+        if solid_tumor is not None:
+            result &= self.statements_by_solid_tumor[solid_tumor]
+        return result
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(
+        prog="disease_index",
+        description="lists moalmanac db statements for a disease and its descendants within an ontology hierarchy.",
+    )
+    arg_parser.add_argument(
+        "terms",
+        nargs="+",
+        help="coding ids, codes, or names of diseases to query",
+    )
+    arg_parser.add_argument(
+        "--hierarchy",
+        action="append",
+        default=[],
+        metavar="SYSTEM=FILE",
+        help="local hierarchy file for a coding system prefix, e.g. oncotree=tumor_types.json. May be repeated.",
+    )
+    arg_parser.add_argument(
+        "--solid-tumor",
+        action=argparse.BooleanOptionalAction,
+        default=None,
+        help="restrict results to statements on solid tumors, or with --no-solid-tumor to non-solid tumors.",
+    )
+    arg_parser.add_argument(
+        "--referenced",
+        help="directory containing referenced json files",
+        default="referenced",
+    )
+    args = arg_parser.parse_args()
+
+    hierarchies = {}
+    for value in args.hierarchy:
+        system, path = value.split("=", 1)
+        hierarchies[system] = read_hierarchy(file=path)
+
+    index = DiseaseIndex.from_tables(
+        read.referenced(
+            directory=args.referenced,
+            tables=["codings", "mappings", "diseases", "propositions", "statements"],
+        ),
+        hierarchies=hierarchies,
+    )
+    results = {
+        term: sorted(index.statements(term, solid_tumor=args.solid_tumor))
+        for term in args.terms
+    }
+    print(json.dumps(results, indent=2))
@@ -0,0 +1,378 @@
+import argparse
+import dataclasses
+import functools
+
+import numpy
+
+# Local imports
+from utils import dereference
+from utils import read
+
+# Foreign keys that Propositions resolves in `dereference_therapeutics` rather than through `foreign_keys`
+CUSTOM_RELATIONS = {
+    "propositions": [
+        ("therapy_id", "therapies"),
+        ("therapy_group_id", "therapy_groups"),
+    ],
+}
+
+
+def relation_keys() -> list[tuple[str, str, str]]:
+    """
+    Returns every foreign key relation between tables, from each table's `foreign_keys` and `CUSTOM_RELATIONS`.
+
+    Returns:
+        list[tuple[str, str, str]]: Triples of source table, source key, and target table, such as
+            `("statements", "proposition_id", "propositions")`.
+    """
+    names = dereference._TableNames()
+    relations = []
+    for table, table_class in dereference.TABLE_CLASSES.items():
+        for fk in table_class.foreign_keys:
+            relations.append((table, fk.src_key, fk.get_table(names)))
+        for key, target in CUSTOM_RELATIONS.get(table, []):
+            relations.append((table, key, target))
+    return relations
+
+
+@dataclasses.dataclass
+class Relation:
+    """
+    A foreign key relation stored as a compressed sparse row (CSR) adjacency: the targets of source record `i` are
+    `indices[indptr[i]:indptr[i + 1]]`, in the order they are listed in the source record.
+
+    Attributes:
+        source (str): Name of the table that holds the foreign key.
+        target (str): Name of the referenced table.
+        indptr (numpy.ndarray): Offsets into `indices`, one more than the number of source records.
+        indices (numpy.ndarray): Dense ids of target records.
+    """
+
+    source: str
+    target: str
+    indptr: numpy.ndarray
+    indices: numpy.ndarray
+
+    @functools.cached_property
+    def rows(self) -> numpy.ndarray:
+        """
+        The dense id of the source record of each edge, in the order of `indices`.
+        """
+        return numpy.repeat(
+            numpy.arange(len(self.indptr) - 1, dtype=self.indices.dtype),
+            numpy.diff(self.indptr),
+        )
+
+    def neighbors(self, i: int) -> numpy.ndarray:
+        """
+        Returns the dense ids of the target records of source record `i`.
+        """
+        return self.indices[self.indptr[i] : self.indptr[i + 1]]
+
+    def follow(self, mask: numpy.ndarray, size: int) -> numpy.ndarray:
+        """
+        Returns the target records of a set of source records.
+
+        Args:
+            mask (numpy.ndarray): Boolean mask over source records.
+            size (int): Number of target records.
+
+        Returns:
+            numpy.ndarray: Boolean mask over target records.
+        """
+        result = numpy.zeros(size, dtype=bool)
+        result[self.indices[mask[self.rows]]] = True
+        return result
+
+    def transpose(self, size: int) -> "Relation":
+        """
+        Returns the reverse relation, from each target record to the source records that reference it.
+
+        Args:
+            size (int): Number of target records.
+
+        Returns:
+            Relation: The reverse relation, with `source` and `target` swapped.
+        """
+        order = numpy.argsort(self.indices, kind="stable")
+        indptr = numpy.zeros(size + 1, dtype=numpy.int64)
+        numpy.cumsum(numpy.bincount(self.indices, minlength=size), out=indptr[1:])
+        return Relation(self.target, self.source, indptr, self.rows[order])
+
+
+class Graph:
+    """
+    The referenced tables as a graph: every record has a dense integer id, its position within its table, and every
+    foreign key relation is a CSR adjacency of dense ids. Traversals, such as from genes to the statements that
+    involve them, run on NumPy arrays, and the graph is saved to and loaded from a `.npz` file without JSON parsing.
+
+    Attributes:
+        ids (dict[str, list]): Original record ids of each table, in dense id order.
+        relations (dict[str, Relation]): Relations keyed by `<source table>.<source key>`, such as
+            `statements.proposition_id`.
+    """
+
+    def __init__(self, ids: dict[str, list], relations: dict[str, Relation]):
+        self.ids = ids
+        self.relations = relations
+        self._dense = {}
+        self._reverse = {}
+
+    @classmethod
+    def from_tables(cls, data: dict[str, list[dict]]) -> "Graph":
+        """
+        Builds the graph from referenced records.
+
+        Args:
+            data (dict[str, list[dict]]): Referenced records keyed by table name.
+
+        Returns:
+            Graph: The graph.
+
+        Raises:
+            ValueError: If a record references a record that does not exist.
+        """
+        ids = {
+            name: [record["id"] for record in data[name]]
+            for name in dereference.TABLE_CLASSES
+        }
+        graph = cls(ids, {})
+        for source, key, target in relation_keys():
+            dense = graph.dense_ids(target)
+            lengths = []
+            indices = []
+            for record in data[source]:
+                value = record.get(key)
+                values = (
+                    []
+                    if value is None
+                    else value
+                    if isinstance(value, list)
+                    else [value]
+                )
+                for target_id in values:
+                    if target_id not in dense:
+                        raise ValueError(
+                            f"{source} {record['id']} references missing {target} {target_id}"
+                        )
+                    indices.append(dense[target_id])
+                lengths.append(len(values))
+            indptr = numpy.zeros(len(lengths) + 1, dtype=numpy.int64)
+            numpy.cumsum(lengths, out=indptr[1:])
+            graph.relations[f"{source}.{key}"] = Relation(
+                source, target, indptr, numpy.array(indices, dtype=numpy.int64)
+            )
+        return graph
+
+    def dense_ids(self, table: str) -> dict:
+        """
+        Returns the dense id of each record of a table, keyed by its original id.
+        """
+        if table not in self._dense:
+            self._dense[table] = {
+                record_id: i for i, record_id in enumerate(self.ids[table])
+            }
+        return self._dense[table]
+
+    def mask(self, table: str, record_ids: list) -> numpy.ndarray:
+        """
+        Returns a boolean mask over a table's records that selects the given original ids.
+
+        Args:
+            table (str): Name of the table.
+            record_ids (list): Original ids of records.
+
+        Returns:
+            numpy.ndarray: The mask.
+
+        Raises:
+            KeyError: If a record does not exist.
+        """
+        dense = self.dense_ids(table)
+        mask = numpy.zeros(len(self.ids[table]), dtype=bool)
+        for record_id in record_ids:
+            if record_id not in dense:
+                raise KeyError(f"Record not found in {table}: {record_id}")
+            mask[dense[record_id]] = True
+        return mask
+
+    def original_ids(self, table: str, mask: numpy.ndarray) -> list:
+        """
+        Returns the original ids of the records selected by a mask, in dense id order.
+        """
+        return [self.ids[table][i] for i in numpy.flatnonzero(mask)]
+
+    def reverse(self, name: str) -> Relation:
+        """
+        Returns the reverse of a relation, from referenced records to the records that reference them.
+        """
+        if name not in self._reverse:
+            relation = self.relations[name]
+            self._reverse[name] = relation.transpose(len(self.ids[relation.target]))
+        return self._reverse[name]
+
+    def walk(self, table: str, record_ids: list, steps: list[str]) -> list:
+        """
+        Follows a path of relations from a set of records.
+
+        Args:
+            table (str): Name of the starting table.
+            record_ids (list): Original ids of the starting records.
+            steps (list[str]): Relation names to follow in order. A name prefixed with `~` is followed in reverse,
+                from referenced records to the records that reference them. For example, genes to statements is
+                `["~biomarkers.genes", "~propositions.biomarkers", "~statements.proposition_id"]`.
+
+        Returns:
+            list: Original ids of the records reached, in the table of the last step.
+
+        Raises:
+            ValueError: If a step does not start from the table reached by the previous step.
+        """
+        mask = self.mask(table, record_ids)
+        for step in steps:
+            relation = (
+                self.reverse(step[1:]) if step.startswith("~") else self.relations[step]
+            )
+            if relation.source != table:
+                raise ValueError(
+                    f"Relation {step} starts from {relation.source}, not {table}"
+                )
+            table = relation.target
+            mask = relation.follow(mask, len(self.ids[table]))
+        return self.original_ids(table, mask)
+
+    def reach(
+        self, table: str, mask: numpy.ndarray, reverse: bool = False
+    ) -> dict[str, numpy.ndarray]:
+        """
+        Returns every record reachable from a set of records by following relations transitively.
+
+        Args:
+            table (str): Name of the starting table.
+            mask (numpy.ndarray): Boolean mask over the starting table's records.
+            reverse (bool): If True, follow relations from referenced records to the records that reference them,
+                such as from a gene to its biomarkers, propositions, and statements.
+
+        Returns:
+            dict[str, numpy.ndarray]: Masks of reached records keyed by table name, including the starting records.
+        """
+        order = dereference.topological_order()
+        if not reverse:
+            order = order[::-1]
+        reached = {table: mask}
+        # Relations always point down the dependency order, so one pass in (reverse) topological order suffices
+        for name in order[order.index(table) :]:
+            if name not in reached:
+                continue
+            for key, relation in self.relations.items():
+                if reverse and relation.target == name:
+                    step, target = self.reverse(key), relation.source
+                elif not reverse and relation.source == name:
+                    step, target = relation, relation.target
+                else:
+                    continue
+                found = step.follow(reached[name], len(self.ids[target]))
+                reached[target] = (
+                    reached[target] | found if target in reached else found
+                )
+        return reached
+
+    def related(self, table: str, record_ids: list, target: str) -> list:
+        """
+        Returns the records of a table that share a statement with the given records, such as the diseases that a
+        therapy is indicated for. Statements that reference the records, directly or transitively, are found first,
+        then every record those statements reference.
+
+        Args:
+            table (str): Name of the starting table.
+            record_ids (list): Original ids of the starting records.
+            target (str): Name of the table to return records of.
+
+        Returns:
+            list: Original ids of related records of `target`.
+        """
+        statements = self.reach(table, self.mask(table, record_ids), reverse=True).get(
+            "statements"
+        )
+        if statements is None:
+            return []
+        if target == "statements":
+            return self.original_ids(target, statements)
+        reached = self.reach("statements", statements).get(target)
+        return [] if reached is None else self.original_ids(target, reached)
+
+    def save(self, file: str) -> None:
+        """
+        Writes the graph to a compressed `.npz` file. Original ids are stored as strings, with a flag for integer ids.
+
+        Args:
+            file (str): The output file path.
+        """
+        arrays = {}
+        for table, ids in self.ids.items():
+            arrays[f"ids/{table}"] = numpy.array(
+                [str(record_id) for record_id in ids], dtype=str
+            )
+            arrays[f"int_ids/{table}"] = numpy.array(
+                [isinstance(record_id, int) for record_id in ids], dtype=bool
+            )
+        for name, relation in self.relations.items():
+            arrays[f"indptr/{name}"] = relation.indptr
+            arrays[f"indices/{name}"] = relation.indices
+            arrays[f"tables/{name}"] = numpy.array([relation.source, relation.target])
+        numpy.savez_compressed(file, **arrays)
+        print(f"Graph successfully written to {file}")
+
+    @classmethod
+    def load(cls, file: str) -> "Graph":
+        """
+        Reads a graph written by `save`.
+
+        Args:
+            file (str): Path to the `.npz` file.
+
+        Returns:
+            Graph: The graph.
+        """
+        ids = {}
+        relations = {}
+        with numpy.load(file, allow_pickle=False) as arrays:
+            for key in arrays.files:
+                kind, _, name = key.partition("/")
+                if kind == "ids":
+                    flags = arrays[f"int_ids/{name}"]
+                    ids[name] = [
+                        int(record_id) if is_int else str(record_id)
+                        for record_id, is_int in zip(
+                            arrays[key].tolist(), flags.tolist()
+                        )
+                    ]
+                elif kind == "tables":
+                    source, target = arrays[key].tolist()
+                    relations[name] = Relation(
+                        source,
+                        target,
+                        arrays[f"indptr/{name}"],
+                        arrays[f"indices/{name}"],
+                    )
+        return cls(ids, relations)
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(
+        prog="graph",
+        description="exports moalmanac db as dense integer ids and csr adjacency arrays in a numpy .npz file.",
+    )
+    arg_parser.add_argument(
+        "--referenced",
+        help="directory of referenced json files",
+        default="referenced",
+    )
+    arg_parser.add_argument(
+        "--output",
+        help="npz file to write the graph to",
+        default="moalmanac-draft.graph.npz",
+    )
+    args = arg_parser.parse_args()
+
+    Graph.from_tables(read.referenced(args.referenced)).save(args.output)
@@ -0,0 +1,203 @@
+import argparse
+import dataclasses
+import json
+
+# Local imports
+from utils import read
+
+
+@dataclasses.dataclass
+class Resolution:
+    """
+    The result of resolving a single identifier against the database.
+
+    Attributes:
+        query (str): The identifier as provided by the caller.
+        coding_ids (list[str]): Codings whose id, code, or name matched the query.
+        primary_coding_ids (list[str]): Canonical primary codings that the matched codings map to.
+        genes (list[int]): Ids of genes whose primary coding is one of `primary_coding_ids`.
+        diseases (list[int]): Ids of diseases whose primary coding is one of `primary_coding_ids`.
+        therapies (list[int]): Ids of therapies whose primary coding is one of `primary_coding_ids`.
+    """
+
+    query: str
+    coding_ids: list[str] = dataclasses.field(default_factory=list)
+    primary_coding_ids: list[str] = dataclasses.field(default_factory=list)
+    genes: list[int] = dataclasses.field(default_factory=list)
+    diseases: list[int] = dataclasses.field(default_factory=list)
+    therapies: list[int] = dataclasses.field(default_factory=list)
+
+
+class IdentifierIndex:
+    """
+    Precomputed index that resolves gene symbols, coding ids, codes, and names to the canonical primary coding
+    of the genes, diseases, and therapies that use them. All matching is case-insensitive.
+
+    The index is built once from the Codings, Mappings, Genes, Diseases, and Therapies tables; each lookup is
+    a single dictionary access.
+
+    Attributes:
+        entity_tables (tuple[str, ...]): Tables whose records carry a `primary_coding_id` and `mappings`.
+    """
+
+    entity_tables = ("genes", "diseases", "therapies")
+
+    def __init__(
+        self,
+        codings: list[dict],
+        mappings: list[dict],
+        genes: list[dict],
+        diseases: list[dict],
+        therapies: list[dict],
+    ):
+        """
+        Builds the index from referenced records.
+
+        Args:
+            codings (list[dict]): Records from referenced/codings.json.
+            mappings (list[dict]): Records from referenced/mappings.json.
+            genes (list[dict]): Records from referenced/genes.json.
+            diseases (list[dict]): Records from referenced/diseases.json.
+            therapies (list[dict]): Records from referenced/therapies.json.
+        """
+        entities = {"genes": genes, "diseases": diseases, "therapies": therapies}
+
+        # primary coding id -> {table: [entity ids]}
+        users = {}
+        for table, records in entities.items():
+            for record in records:
+                primary = record["primary_coding_id"]
+                users.setdefault(primary, {t: [] for t in self.entity_tables})
+                users[primary][table].append(record["id"])
+
+        # coding id -> canonical primary coding ids
+        canonical = {primary: {primary} for primary in users}
+        for mapping in mappings:
+            canonical.setdefault(mapping["coding_id"], set()).add(
+                mapping["primary_coding_id"]
+            )
+
+        # normalized identifier -> coding ids
+        keys = {}
+        for coding in codings:
+            for value in (coding["id"], coding.get("code"), coding.get("name")):
+                if value is not None:
+                    keys.setdefault(self.normalize(value), set()).add(coding["id"])
+        for records in entities.values():
+            for record in records:
+                keys.setdefault(self.normalize(record["name"]), set()).add(
+                    record["primary_coding_id"]
+                )
+
+        self._index = {}
+        for key, coding_ids in keys.items():
+            primaries = set()
+            for coding_id in coding_ids:
+                primaries |= canonical.get(coding_id, {coding_id})
+            resolution = Resolution(
+                query=key,
+                coding_ids=sorted(coding_ids),
+                primary_coding_ids=sorted(primaries),
+            )
+            for primary in resolution.primary_coding_ids:
+                for table, ids in users.get(primary, {}).items():
+                    getattr(resolution, table).extend(ids)
+            for table in self.entity_tables:
+                setattr(resolution, table, sorted(set(getattr(resolution, table))))
+            self._index[key] = resolution
+
+    @classmethod
+    def from_tables(cls, data: dict[str, list[dict]]) -> "IdentifierIndex":
+        """
+        Builds the index from a dictionary of referenced records keyed by table name.
+
+        Args:
+            data (dict[str, list[dict]]): Referenced records, as returned by `read.referenced`.
+
+        Returns:
+            IdentifierIndex: The constructed index.
+        """
+        return cls(
+            codings=data["codings"],
+            mappings=data["mappings"],
+            genes=data["genes"],
+            diseases=data["diseases"],
+            therapies=data["therapies"],
+        )
+
+    @staticmethod
+    def normalize(value: str | int) -> str:
+        """
+        Normalizes an identifier for case-insensitive matching.
+
+        Args:
+            value (str | int): The identifier to normalize.
+
+        Returns:
+            str: The identifier, stripped of surrounding whitespace and case-folded.
+        """
+        return str(value).strip().casefold()
+
+    def resolve(self, identifier: str | int) -> Resolution | None:
+        """
+        Resolves a single identifier.
+
+        Args:
+            identifier (str | int): A gene symbol, coding id, code, or name.
+
+        Returns:
+            Resolution | None: The resolution for the identifier, or None if it is not known to the database.
+        """
+        resolution = self._index.get(self.normalize(identifier))
+        if resolution is None:
+            return None
+        return dataclasses.replace(resolution, query=str(identifier))
+
+    def resolve_many(
+        self, identifiers: list[str | int]
+    ) -> dict[str, Resolution | None]:
+        """
+        Resolves a batch of identifiers.
+
+        Args:
+            identifiers (list[str | int]): Gene symbols, coding ids, codes, or names.
+
+        Returns:
+            dict[str, Resolution | None]: Resolution for each identifier, keyed by the identifier as provided.
+        """
+        return {str(identifier): self.resolve(identifier) for identifier in identifiers}
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(
+        prog="identifiers",
+        description="resolves gene symbols, coding ids, codes, and names to moalmanac db genes, diseases, and therapies.",
+    )
+    arg_parser.add_argument(
+        "identifiers",
+        nargs="+",
+        help="identifiers to resolve",
+    )
+    arg_parser.add_argument(
+        "--referenced",
+        help="directory containing referenced json files",
+        default="referenced",
+    )
+    args = arg_parser.parse_args()
+
+    index = IdentifierIndex.from_tables(
+        read.referenced(
+            directory=args.referenced,
+            tables=["codings", "mappings", "genes", "diseases", "therapies"],
+        )
+    )
+    results = index.resolve_many(args.identifiers)
+    print(
+        json.dumps(
+            {
+                key: dataclasses.asdict(value) if value else None
+                for key, value in results.items()
+            },
+            indent=2,
+        )
+    )
@@ -0,0 +1,182 @@
+import argparse
+import http.client
+import json
+import random
+import statistics
+import threading
+import time
+import urllib.parse
+
+
+def default_paths(host: str, port: int) -> list[str]:
+    """
+    Builds a mix of request paths from the tables and records that a running server reports.
+
+    Args:
+        host (str): Address of the server.
+        port (int): Port of the server.
+
+    Returns:
+        list[str]: Paths for individual records of every table, filtered statement lists, and the about metadata.
+    """
+    connection = http.client.HTTPConnection(host, port)
+
+    def get(path):
+        connection.request("GET", path)
+        return json.loads(connection.getresponse().read())
+
+    tables = get("/")["tables"]
+    paths = ["/about"]
+    for table in tables:
+        records = get(f"/{table}")
+        paths.extend(f"/{table}/{record['id']}" for record in records[:50])
+    for gene in get("/genes")[:20]:
+        paths.append(f"/statements?gene={urllib.parse.quote(gene['name'])}")
+    for disease in get("/diseases")[:20]:
+        paths.append(f"/statements?disease={urllib.parse.quote(disease['name'])}")
+    connection.close()
+    return paths
+
+
+def worker(
+    host: str,
+    port: int,
+    paths: list[str],
+    deadline: float,
+    headers: dict[str, str],
+    latencies: list[float],
+    errors: list[int],
+    seed: int,
+) -> None:
+    """
+    Sends requests over one keep-alive connection until the deadline, recording the latency of each.
+    """
+    generator = random.Random(seed)
+    connection = http.client.HTTPConnection(host, port)
+    while time.perf_counter() < deadline:
+        path = generator.choice(paths)
+        start = time.perf_counter()
+        try:
+            connection.request("GET", path, headers=headers)
+            response = connection.getresponse()
+            response.read()
+        except (ConnectionError, http.client.HTTPException):
+            errors.append(0)
+            connection.close()
+            connection = http.client.HTTPConnection(host, port)
+            continue
+        latencies.append(time.perf_counter() - start)
+        if response.status >= 400:
+            errors.append(response.status)
+    connection.close()
+
+
+def run(
+    host: str = "127.0.0.1",
+    port: int = 8000,
+    paths: list[str] | None = None,
+    concurrency: int = 8,
+    duration: float = 10.0,
+    gzip: bool = False,
+    seed: int = 0,
+) -> dict:
+    """
+    Sends requests from several concurrent clients to a running server for a fixed time.
+
+    Args:
+        host (str): Address of the server.
+        port (int): Port of the server.
+        paths (list[str] | None): Paths to request, chosen at random. If None, see `default_paths`.
+        concurrency (int): Number of concurrent clients, each with its own keep-alive connection.
+        duration (float): Seconds to send requests for.
+        gzip (bool): If True, request gzip compressed responses.
+        seed (int): Seed for the random choice of paths.
+
+    Returns:
+        dict: Dictionary with keys `requests`, `errors`, `seconds`, `requests_per_second`, and latency percentiles
+            `p50_ms`, `p95_ms`, and `p99_ms`.
+    """
+    if paths is None:
+        paths = default_paths(host, port)
+    headers = {"Accept-Encoding": "gzip"} if gzip else {}
+    latencies = []
+    errors = []
+    start = time.perf_counter()
+    deadline = start + duration
+    threads = [
+        threading.Thread(
+            target=worker,
+            args=(host, port, paths, deadline, headers, latencies, errors, seed + i),
+        )
+        for i in range(concurrency)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    percentiles = (
+        statistics.quantiles(latencies, n=100) if len(latencies) > 1 else [0.0] * 99
+    )
+    return {
+        "requests": len(latencies),
+        "errors": len(errors),
+        "seconds": round(elapsed, 2),
+        "requests_per_second": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(percentiles[49] * 1000, 2),
+        "p95_ms": round(percentiles[94] * 1000, 2),
+        "p99_ms": round(percentiles[98] * 1000, 2),
+    }
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(
+        prog="load_test",
+        description="measures the throughput and latency of a running utils.server.",
+    )
+    arg_parser.add_argument(
+        "--host",
+        help="address of the server",
+        default="127.0.0.1",
+    )
+    arg_parser.add_argument(
+        "--port",
+        type=int,
+        help="port of the server",
+        default=8000,
+    )
+    arg_parser.add_argument(
+        "--concurrency",
+        type=int,
+        help="number of concurrent clients",
+        default=8,
+    )
+    arg_parser.add_argument(
+        "--duration",
+        type=float,
+        help="seconds to send requests for",
+        default=10.0,
+    )
+    arg_parser.add_argument(
+        "--gzip",
+        action="store_true",
+        help="request gzip compressed responses",
+    )
+    arg_parser.add_argument(
+        "--path",
+        action="append",
+        dest="paths",
+        help="path to request; repeat for several. Default: a mix of records and filtered lists from the server",
+    )
+    args = arg_parser.parse_args()
+
+    results = run(
+        host=args.host,
+        port=args.port,
+        paths=args.paths,
+        concurrency=args.concurrency,
+        duration=args.duration,
+        gzip=args.gzip,
+    )
+    print(json.dumps(results, indent=2))
@@ -0,0 +1,616 @@
+import argparse
+import bisect
+import collections
+import csv
+import dataclasses
+import json
+import os
+import re
+
+# Local imports
+from utils import read
+
+SOMATIC_VARIANT = "somatic_variant"
+GERMLINE_VARIANT = "germline_variant"
+COPY_NUMBER = "copy_number"
+REARRANGEMENT = "rearrangement"
+MICROSATELLITE_STABILITY = "microsatellite_stability"
+MISMATCH_REPAIR = "mismatch_repair"
+HOMOLOGOUS_RECOMBINATION = "homologous_recombination"
+TUMOR_MUTATIONAL_BURDEN = "tumor_mutational_burden"
+PROTEIN_EXPRESSION = "protein_expression"
+MUTATIONAL_SIGNATURE = "mutational_signature"
+
+ALTERATION_TYPES = [
+    SOMATIC_VARIANT,
+    GERMLINE_VARIANT,
+    COPY_NUMBER,
+    REARRANGEMENT,
+    MICROSATELLITE_STABILITY,
+    MISMATCH_REPAIR,
+    HOMOLOGOUS_RECOMBINATION,
+    TUMOR_MUTATIONAL_BURDEN,
+    PROTEIN_EXPRESSION,
+    MUTATIONAL_SIGNATURE,
+]
+
+# Biomarker types whose `status` extension is matched against the `status` of an alteration
+STATUS_TYPES = {
+    "Microsatellite Stability": MICROSATELLITE_STABILITY,
+    "Mismatch Repair": MISMATCH_REPAIR,
+    "Homologous Recombination": HOMOLOGOUS_RECOMBINATION,
+}
+
+# Comparison of a sample's value to a biomarker's threshold, and whether matching thresholds are a prefix of the
+# thresholds sorted in ascending order
+THRESHOLD_OPERATORS = {
+    ">=": (bisect.bisect_right, True),
+    ">": (bisect.bisect_left, True),
+    "<=": (bisect.bisect_left, False),
+    "<": (bisect.bisect_right, False),
+}
+
+
+def _key(value) -> str | None:
+    """
+    Returns the form of a name or code that alterations are matched on: stripped and case folded.
+    """
+    if value is None:
+        return None
+    value = str(value).strip().casefold()
+    return value or None
+
+
+def _aliases(name: str) -> list[str]:
+    """
+    Returns the keys of a name and of its parenthetical abbreviation, if any, such that both
+    `Estrogen receptor (ER)` and `ER` match it.
+    """
+    aliases = [_key(name)]
+    found = re.search(r"\(([^()]+)\)\s*$", name)
+    if found:
+        aliases.append(_key(found.group(1)))
+    return aliases
+
+
+def _protein_change(value) -> str | None:
+    key = _key(value)
+    return key[2:] if key and key.startswith("p.") else key
+
+
+def _chromosome(value) -> str | None:
+    key = _key(value)
+    return key[3:] if key and key.startswith("chr") else key
+
+
+def _number(value) -> float | None:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+@dataclasses.dataclass(frozen=True)
+class Alteration:
+    """
+    A molecular feature observed in a sample. Only the fields relevant to its type need to be set.
+
+    Attributes:
+        type (str): One of `ALTERATION_TYPES`.
+        gene (str | None): Gene symbol of a variant, a gene level copy number event, or a rearrangement.
+        partner (str | None): Gene symbol of the other partner of a rearrangement.
+        protein_change (str | None): Protein change of a variant, such as `p.V600E`.
+        chromosome (str | None): Chromosome of a variant or of an arm level copy number event.
+        start_position (int | None): Genomic start position of a variant.
+        reference_allele (str | None): Reference allele of a variant.
+        alternate_allele (str | None): Alternate allele of a variant.
+        variant_annotation (str | None): Variant classification, such as `Missense` or `Deletion`.
+        exon (str | None): Exon of a variant.
+        oncogenic (bool): Whether a somatic variant is oncogenic.
+        pathogenic (bool): Whether a germline variant is pathogenic.
+        direction (str | None): `Amplification` or `Deletion`, for copy number events.
+        arm (str | None): Chromosome arm, `p` or `q`, of an arm level copy number event.
+        cytoband (str | None): Cytoband of a copy number event.
+        rearrangement_type (str | None): Type of a rearrangement, such as `Fusion` or `Translocation`.
+        status (str | None): Status of microsatellite stability (such as `MSI-H`), mismatch repair (such as
+            `Deficient`), or homologous recombination, or the classification of tumor mutational burden.
+        marker (str | None): Protein of an expression result, such as `HER2` or `PD-L1`, or the name of a mutational
+            signature, such as `SBS3`.
+        unit (str | None): Unit of an expression result, such as `Tumor Proportion Score (TPS)`. Default: `status`.
+        value (float | str | None): Result of an expression test, such as `Positive` or `0.6`, or tumor mutational
+            burden in mutations per megabase.
+        mutations (int | None): Tumor mutational burden as a count of mutations.
+    """
+
+    type: str
+    gene: str | None = None
+    partner: str | None = None
+    protein_change: str | None = None
+    chromosome: str | None = None
+    start_position: int | None = None
+    reference_allele: str | None = None
+    alternate_allele: str | None = None
+    variant_annotation: str | None = None
+    exon: str | None = None
+    oncogenic: bool = False
+    pathogenic: bool = False
+    direction: str | None = None
+    arm: str | None = None
+    cytoband: str | None = None
+    rearrangement_type: str | None = None
+    status: str | None = None
+    marker: str | None = None
+    unit: str | None = None
+    value: float | str | None = None
+    mutations: int | None = None
+
+    def __post_init__(self):
+        if self.type not in ALTERATION_TYPES:
+            raise ValueError(f"Unknown alteration type: {self.type}")
+
+    @classmethod
+    def from_dict(cls, record: dict) -> "Alteration":
+        """
+        Creates an alteration from a dictionary, such as a JSON object or a row of a tab-separated file. Empty
+        strings are treated as missing, and text values of numeric and boolean fields are converted.
+
+        Args:
+            record (dict): Fields of the alteration, keyed by attribute name.
+
+        Returns:
+            Alteration: The alteration.
+
+        Raises:
+            ValueError: If a field is unknown or the type is missing or unknown.
+        """
+        fields = {field.name for field in dataclasses.fields(cls)}
+        values = {}
+        for name, value in record.items():
+            if name not in fields:
+                raise ValueError(f"Unknown alteration field: {name}")
+            if value == "":
+                continue
+            if name in ("oncogenic", "pathogenic") and isinstance(value, str):
+                value = value.strip().casefold() in ("1", "true", "yes")
+            elif name in ("start_position", "mutations") and isinstance(value, str):
+                value = int(value)
+            elif name == "value" and _number(value) is not None:
+                value = float(value)
+            values[name] = value
+        if "type" not in values:
+            raise ValueError(f"Alteration without a type: {record}")
+        return cls(**values)
+
+
+@dataclasses.dataclass
+class Match:
+    """
+    The almanac records that a sample's alterations match.
+
+    Attributes:
+        biomarkers (list[int]): Ids of matched biomarkers.
+        propositions (list[int]): Ids of propositions whose biomarkers are all matched.
+        statements (list[int]): Ids of statements of those propositions.
+    """
+
+    biomarkers: list[int]
+    propositions: list[int]
+    statements: list[int]
+
+
+class Matcher:
+    """
+    Matches sample alterations to biomarkers, and biomarkers to the propositions and statements they satisfy.
+
+    Indexes are built once from the `extensions` of each biomarker, by biomarker type: variants by gene and protein
+    change or genomic position, with a short list of gene level criteria (such as `requires_oncogenic` or an exon and
+    variant annotation) per gene; copy number events by gene or chromosome arm and direction; rearrangements by gene;
+    statuses by their name and abbreviation; and numeric biomarkers, tumor mutational burden and protein expression,
+    as thresholds sorted per marker, unit, and comparison, so that the biomarkers met by a value are a slice found by
+    bisection. Each alteration is matched with a few dictionary lookups, whatever the size of the almanac.
+
+    Biomarkers that describe an absence, those with `_present` set to False and wild type genes, only match when the
+    alterations are declared to be the complete profile of the sample. Rearrangements without genes, such as
+    `t(15;17)`, cannot be matched, and the almanac has no mutational signature biomarkers yet, so signature
+    alterations are accepted but match nothing.
+    """
+
+    def __init__(self, data: dict[str, list[dict]]):
+        """
+        Builds the indexes.
+
+        Args:
+            data (dict[str, list[dict]]): Referenced records keyed by table name, with at least `biomarkers`,
+                `genes`, `propositions`, and `statements`.
+        """
+        genes = {record["id"]: _key(record["name"]) for record in data["genes"]}
+
+        self.absent = set()
+        self.wild_type = collections.defaultdict(list)
+        self.variants = collections.defaultdict(list)
+        self.variant_positions = collections.defaultdict(list)
+        self.variant_criteria = collections.defaultdict(list)
+        self.copy_number = collections.defaultdict(list)
+        self.rearrangements = collections.defaultdict(list)
+        self.statuses = collections.defaultdict(list)
+        self.expression = collections.defaultdict(list)
+        thresholds = collections.defaultdict(list)
+
+        for record in data["biomarkers"]:
+            biomarker_id = record["id"]
+            ext = {
+                extension["name"]: extension["value"]
+                for extension in record.get("extensions", [])
+            }
+            names = [genes[gene_id] for gene_id in record.get("genes") or []]
+            biomarker_type = ext.get("biomarker_type")
+            if ext.get("_present") is False:
+                self.absent.add(biomarker_id)
+
+            if biomarker_type in ("Somatic Variant", "Germline Variant") and names:
+                kind = (
+                    SOMATIC_VARIANT
+                    if biomarker_type == "Somatic Variant"
+                    else GERMLINE_VARIANT
+                )
+                if ext.get("protein_change"):
+                    self.variants[
+                        (kind, names[0], _protein_change(ext["protein_change"]))
+                    ].append(biomarker_id)
+                    if ext.get("start_position") is not None:
+                        position = (
+                            kind,
+                            _chromosome(ext.get("chromosome")),
+                            int(ext["start_position"]),
+                            _key(ext.get("reference_allele")),
+                            _key(ext.get("alternate_allele")),
+                        )
+                        self.variant_positions[position].append(biomarker_id)
+                else:
+                    criteria = (
+                        None if ext.get("exon") is None else str(ext["exon"]),
+                        _key(ext.get("variant_annotation")),
+                        bool(ext.get("requires_oncogenic")),
+                        bool(ext.get("requires_pathogenic")),
+                    )
+                    self.variant_criteria[(kind, names[0])].append(
+                        (biomarker_id, criteria)
+                    )
+            elif biomarker_type == "Copy Number" and names:
+                self.copy_number[(names[0], _key(ext.get("direction")))].append(
+                    (biomarker_id, _key(ext.get("cytoband")))
+                )
+            elif biomarker_type == "Copy Number (arm level)":
+                arm = (
+                    _chromosome(ext.get("chromosome")),
+                    _key(ext.get("arm")),
+                    _key(ext.get("direction")),
+                )
+                self.copy_number[arm].append((biomarker_id, None))
+            elif biomarker_type == "Rearrangement" and names:
+                entry = (
+                    biomarker_id,
+                    frozenset(names),
+                    _key(ext.get("rearrangement_type")),
+                )
+                for name in names:
+                    self.rearrangements[name].append(entry)
+            elif biomarker_type in STATUS_TYPES and ext.get("status"):
+                for alias in _aliases(ext["status"]):
+                    self.statuses[(STATUS_TYPES[biomarker_type], alias)].append(
+                        biomarker_id
+                    )
+            elif biomarker_type == "Tumor mutational burden":
+                if ext.get("classification"):
+                    self.statuses[
+                        (TUMOR_MUTATIONAL_BURDEN, _key(ext["classification"]))
+                    ].append(biomarker_id)
+                if ext.get("minimum_mutations_per_megabase") is not None:
+                    key = (TUMOR_MUTATIONAL_BURDEN, "per megabase", ">=")
+                    thresholds[key].append(
+                        (float(ext["minimum_mutations_per_megabase"]), biomarker_id)
+                    )
+                if ext.get("minimum_mutations") is not None:
+                    key = (TUMOR_MUTATIONAL_BURDEN, "mutations", ">=")
+                    thresholds[key].append(
+                        (float(ext["minimum_mutations"]), biomarker_id)
+                    )
+            elif biomarker_type == "Protein expression" and ext.get("marker"):
+                unit = _key(ext.get("unit")) or "status"
+                threshold = _number(ext.get("value"))
+                for alias in _aliases(ext["marker"]):
+                    if (
+                        ext.get("equality") in THRESHOLD_OPERATORS
+                        and threshold is not None
+                    ):
+                        thresholds[(alias, unit, ext["equality"])].append(
+                            (threshold, biomarker_id)
+                        )
+                    else:
+                        self.expression[(alias, unit, _key(ext.get("value")))].append(
+                            biomarker_id
+                        )
+            elif biomarker_type == "Wild type":
+                for name in names:
+                    self.wild_type[name].append(biomarker_id)
+
+        self.thresholds = {}
+        for key, entries in thresholds.items():
+            entries.sort()
+            self.thresholds[key] = (
+                [value for value, _ in entries],
+                [biomarker_id for _, biomarker_id in entries],
+            )
+
+        self.propositions = {
+            record["id"]: frozenset(record.get("biomarkers") or [])
+            for record in data["propositions"]
+        }
+        self.propositions_of = collections.defaultdict(list)
+        for proposition_id, biomarkers in self.propositions.items():
+            for biomarker_id in biomarkers:
+                self.propositions_of[biomarker_id].append(proposition_id)
+        self.statements_of = collections.defaultdict(list)
+        for record in data["statements"]:
+            self.statements_of[record["proposition_id"]].append(record["id"])
+
+    def _threshold(self, key: tuple, value: float) -> list[int]:
+        found = []
+        for operator, (search, prefix) in THRESHOLD_OPERATORS.items():
+            if (*key, operator) not in self.thresholds:
+                continue
+            values, ids = self.thresholds[(*key, operator)]
+            index = search(values, value)
+            found.extend(ids[:index] if prefix else ids[index:])
+        return found
+
+    def _match_variant(self, alteration: Alteration, gene: str) -> list[int]:
+        kind = alteration.type
+        found = list(
+            self.variants.get(
+                (kind, gene, _protein_change(alteration.protein_change)), []
+            )
+        )
+        if alteration.start_position is not None:
+            position = (
+                kind,
+                _chromosome(alteration.chromosome),
+                int(alteration.start_position),
+                _key(alteration.reference_allele),
+                _key(alteration.alternate_allele),
+            )
+            found.extend(self.variant_positions.get(position, []))
+        exon = None if alteration.exon is None else str(alteration.exon)
+        annotation = _key(alteration.variant_annotation)
+        for biomarker_id, (
+            required_exon,
+            required_annotation,
+            oncogenic,
+            pathogenic,
+        ) in self.variant_criteria.get((kind, gene), []):
+            if required_exon is not None and required_exon != exon:
+                continue
+            if required_annotation is not None and required_annotation != annotation:
+                continue
+            if (oncogenic and not alteration.oncogenic) or (
+                pathogenic and not alteration.pathogenic
+            ):
+                continue
+            found.append(biomarker_id)
+        return found
+
+    def match_alteration(self, alteration: Alteration) -> list[int]:
+        """
+        Returns the ids of biomarkers that an alteration matches, regardless of whether they describe presence or
+        absence.
+
+        Args:
+            alteration (Alteration): The alteration.
+
+        Returns:
+            list[int]: Ids of matched biomarkers, possibly repeated.
+        """
+        kind = alteration.type
+        gene = _key(alteration.gene)
+        if kind in (SOMATIC_VARIANT, GERMLINE_VARIANT):
+            return self._match_variant(alteration, gene) if gene else []
+        if kind == COPY_NUMBER:
+            direction = _key(alteration.direction)
+            if gene:
+                key = (gene, direction)
+            else:
+                key = (
+                    _chromosome(alteration.chromosome),
+                    _key(alteration.arm),
+                    direction,
+                )
+            cytoband = _key(alteration.cytoband)
+            return [
+                biomarker_id
+                for biomarker_id, required in self.copy_number.get(key, [])
+                if required is None or required == cytoband
+            ]
+        if kind == REARRANGEMENT:
+            partners = {name for name in (gene, _key(alteration.partner)) if name}
+            rearrangement_type = _key(alteration.rearrangement_type)
+            return [
+                biomarker_id
+                for name in partners
+                for biomarker_id, required, required_type in self.rearrangements.get(
+                    name, []
+                )
+                if required <= partners
+                and (
+                    required_type is None
+                    or rearrangement_type is None
+                    or required_type == rearrangement_type
+                )
+            ]
+        if kind in STATUS_TYPES.values():
+            return list(self.statuses.get((kind, _key(alteration.status)), []))
+        if kind == TUMOR_MUTATIONAL_BURDEN:
+            found = list(self.statuses.get((kind, _key(alteration.status)), []))
+            if _number(alteration.value) is not None:
+                found.extend(
+                    self._threshold((kind, "per megabase"), float(alteration.value))
+                )
+            if alteration.mutations is not None:
+                found.extend(
+                    self._threshold((kind, "mutations"), float(alteration.mutations))
+                )
+            return found
+        if kind == PROTEIN_EXPRESSION:
+            marker = _key(alteration.marker)
+            unit = _key(alteration.unit) or "status"
+            if _number(alteration.value) is not None:
+                return self._threshold((marker, unit), float(alteration.value))
+            return list(self.expression.get((marker, unit, _key(alteration.value)), []))
+        return []
+
+    def biomarkers(
+        self, alterations: list[Alteration], complete: bool = False
+    ) -> set[int]:
+        """
+        Returns the biomarkers that a sample's alterations satisfy.
+
+        Args:
+            alterations (list[Alteration]): The sample's alterations.
+            complete (bool): If True, the alterations are the sample's complete profile, so biomarkers that describe
+                an absence are satisfied when no alteration matches them, and wild type genes when the sample has no
+                somatic variant, copy number event, or rearrangement of the gene.
+
+        Returns:
+            set[int]: Ids of satisfied biomarkers.
+        """
+        found = set()
+        altered = set()
+        for alteration in alterations:
+            found.update(self.match_alteration(alteration))
+            if alteration.type in (SOMATIC_VARIANT, COPY_NUMBER, REARRANGEMENT):
+                altered.update(
+                    _key(gene) for gene in (alteration.gene, alteration.partner) if gene
+                )
+
+        satisfied = found - self.absent
+        if complete:
+            satisfied |= self.absent - found
+            for gene, biomarker_ids in self.wild_type.items():
+                if gene not in altered:
+                    satisfied.update(biomarker_ids)
+        return satisfied
+
+    def match(self, alterations: list[Alteration], complete: bool = False) -> Match:
+        """
+        Matches a sample's alterations to biomarkers, propositions, and statements.
+
+        Args:
+            alterations (list[Alteration]): The sample's alterations.
+            complete (bool): If True, the alterations are the sample's complete profile; see `biomarkers`.
+
+        Returns:
+            Match: Ids of satisfied biomarkers, of propositions whose biomarkers are all satisfied, and of their
+                statements.
+        """
+        biomarkers = self.biomarkers(alterations, complete=complete)
+        propositions = {
+            proposition_id
+            for biomarker_id in biomarkers
+            for proposition_id in self.propositions_of.get(biomarker_id, [])
+            if self.propositions[proposition_id] <= biomarkers
+        }
+        statements = [
+            statement_id
+            for proposition_id in propositions
+            for statement_id in self.statements_of.get(proposition_id, [])
+        ]
+        return Match(sorted(biomarkers), sorted(propositions), sorted(statements))
+
+    def match_samples(
+        self, samples: dict[str, list[Alteration]], complete: bool = False
+    ) -> dict[str, Match]:
+        """
+        Matches the alterations of several samples.
+
+        Args:
+            samples (dict[str, list[Alteration]]): Alterations keyed by sample id.
+            complete (bool): If True, each sample's alterations are its complete profile; see `biomarkers`.
+
+        Returns:
+            dict[str, Match]: Matches keyed by sample id.
+        """
+        return {
+            sample: self.match(alterations, complete=complete)
+            for sample, alterations in samples.items()
+        }
+
+
+def read_alterations(file: str) -> dict[str, list[Alteration]]:
+    """
+    Reads sample alterations from a local file.
+
+    Two formats are supported:
+    - JSON, either a list of alterations of one sample or a dictionary of sample id to list of alterations, each
+      alteration an object keyed by `Alteration` attribute names.
+    - Tab-separated values with a header row of `Alteration` attribute names and an optional `sample` column.
+
+    Args:
+        file (str): Path to the alterations file.
+
+    Returns:
+        dict[str, list[Alteration]]: Alterations keyed by sample id. Alterations without a sample are keyed by
+            the file name.
+
+    Raises:
+        ValueError: If the JSON file is neither a list nor a dictionary, or an alteration is invalid.
+    """
+    default = os.path.splitext(os.path.basename(file))[0]
+    samples = {}
+    if os.path.splitext(file)[1].lower() == ".json":
+        data = read.json_records(file=file)
+        if isinstance(data, list):
+            data = {default: data}
+        if not isinstance(data, dict):
+            raise ValueError(f"Unsupported alterations format in {file}")
+        for sample, records in data.items():
+            samples[sample] = [Alteration.from_dict(record) for record in records]
+    else:
+        with open(file, newline="") as fp:
+            for row in csv.DictReader(fp, delimiter="\t"):
+                sample = row.pop("sample", None) or default
+                samples.setdefault(sample, []).append(Alteration.from_dict(row))
+    return samples
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(
+        prog="match",
+        description="matches sample alterations to moalmanac db biomarkers and the statements they satisfy.",
+    )
+    arg_parser.add_argument(
+        "alterations",
+        help="json or tab-separated file of sample alterations",
+    )
+    arg_parser.add_argument(
+        "--referenced",
+        help="directory of referenced json files",
+        default="referenced",
+    )
+    arg_parser.add_argument(
+        "--complete",
+        action="store_true",
+        help="treat each sample's alterations as its complete profile, so that wild type and absent biomarkers match",
+    )
+    args = arg_parser.parse_args()
+
+    try:
+        profiles = read_alterations(args.alterations)
+    except ValueError as e:
+        arg_parser.exit(1, f"{e}\n")
+    matcher = Matcher(read.referenced(args.referenced))
+    matches = matcher.match_samples(profiles, complete=args.complete)
+    print(
+        json.dumps(
+            {sample: dataclasses.asdict(match) for sample, match in matches.items()},
+            indent=2,
+        )
+    )
@@ -0,0 +1,456 @@
+import argparse
+import collections
+import dataclasses
+import os
+
+# Local imports
+from utils import read
+
+
+class Automaton:
+    """
+    An Aho–Corasick automaton that finds every occurrence of many patterns in one pass over a text.
+
+    Patterns are matched only as whole words, so `ALK` is found in `ALK-positive` but not in `alkylating`, and case
+    insensitively unless added as case sensitive, so that the gene `MET` is not found in "have met". Each pattern
+    carries a value, such as the entity it names, that is returned with its matches.
+
+    Attributes:
+        patterns (int): Number of patterns added.
+    """
+
+    def __init__(self):
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [[]]
+        self._built = False
+        self.patterns = 0
+
+    def add(self, pattern: str, value, case_sensitive: bool = False) -> None:
+        """
+        Adds a pattern. Patterns cannot be added once the automaton has been built.
+
+        Args:
+            pattern (str): Text to find.
+            value: Returned with each match of the pattern.
+            case_sensitive (bool): If True, only match text with the same case as `pattern`.
+        """
+        if self._built:
+            raise RuntimeError(
+                "Cannot add patterns after the automaton has been built."
+            )
+        if not pattern:
+            return
+        state = 0
+        for character in pattern.casefold():
+            if character not in self._goto[state]:
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+                self._goto[state][character] = len(self._goto) - 1
+            state = self._goto[state][character]
+        exact = pattern if case_sensitive else None
+        self._output[state].append((len(pattern.casefold()), exact, value))
+        self.patterns += 1
+
+    def build(self) -> None:
+        """
+        Computes failure links breadth first, so that each state also reports the patterns that end at its longest
+        proper suffix.
+        """
+        queue = collections.deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for character, child in self._goto[state].items():
+                queue.append(child)
+                fallback = self._fail[state]
+                while fallback and character not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[child] = self._goto[fallback].get(character, 0)
+                if self._fail[child] == child:
+                    self._fail[child] = 0
+                self._output[child] = (
+                    self._output[child] + self._output[self._fail[child]]
+                )
+        self._built = True
+
+    def find(self, text: str):
+        """
+        Yields every whole word match of every pattern in a text.
+
+        Args:
+            text (str): The text to scan.
+
+        Yields:
+            tuple[int, int, object]: Start and end offsets of the match within `text`, and the pattern's value.
+        """
+        if not self._built:
+            self.build()
+        folded = text.casefold()
+        # Offsets are only meaningful if casefolding kept the text's length
+        length_preserved = len(folded) == len(text)
+        state = 0
+        for end, character in enumerate(folded, start=1):
+            while state and character not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(character, 0)
+            for length, exact, value in self._output[state]:
+                start = end - length
+                if start > 0 and folded[start - 1].isalnum():
+                    continue
+                if end < len(folded) and folded[end].isalnum():
+                    continue
+                if exact is not None and (
+                    not length_preserved or text[start:end] != exact
+                ):
+                    continue
+                if length_preserved:
+                    yield start, end, value
+                else:
+                    yield -1, -1, value
+
+
+@dataclasses.dataclass
+class Finding:
+    """
+    A lint finding about the entities mentioned by a curated text.
+
+    Attributes:
+        table (str): Table of the record, `indications` or `statements`.
+        record_id: Id of the record.
+        field (str): Field of the record that was scanned.
+        kind (str): One of `missing_drug`, `missing_gene`, `unexpected_drug`, and `unexpected_gene`.
+        names (list[str]): For missing mentions, the names of which none were found. For unexpected mentions, the
+            names that were found but are not linked to the record.
+    """
+
+    table: str
+    record_id: object
+    field: str
+    kind: str
+    names: list[str]
+
+
+KINDS = ("missing_drug", "missing_gene", "unexpected_drug", "unexpected_gene")
+
+# Accepted findings, so that the lint only fails on findings introduced since they were reviewed
+BASELINE = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "mentions",
+    "baseline.tsv",
+)
+
+
+def build_automaton(data: dict[str, list[dict]]) -> Automaton:
+    """
+    Builds one automaton of the drug and gene names in the database: gene names, therapy names, and the brand and
+    generic drug names of documents. Gene names are matched case sensitively.
+
+    Args:
+        data (dict[str, list[dict]]): Referenced records keyed by table name.
+
+    Returns:
+        Automaton: Automaton whose values are pairs of `drug` or `gene` and the casefolded name.
+    """
+    automaton = Automaton()
+    names = set()
+    for gene in data["genes"]:
+        names.add(("gene", gene["name"]))
+    for therapy in data["therapies"]:
+        names.add(("drug", therapy["name"]))
+    for document in data["documents"]:
+        for key in ("drug_name_brand", "drug_name_generic"):
+            if document.get(key):
+                names.add(("drug", document[key]))
+    for kind, name in sorted(names):
+        automaton.add(name, (kind, name.casefold()), case_sensitive=kind == "gene")
+    automaton.build()
+    return automaton
+
+
+class Linker:
+    """
+    Resolves the drug and gene names that indications and statements are linked to through their documents and
+    propositions.
+    """
+
+    def __init__(self, data: dict[str, list[dict]]):
+        """
+        Indexes the referenced tables by id.
+
+        Args:
+            data (dict[str, list[dict]]): Referenced records keyed by table name.
+        """
+        self.documents = {record["id"]: record for record in data["documents"]}
+        self.propositions = {record["id"]: record for record in data["propositions"]}
+        self.biomarkers = {record["id"]: record for record in data["biomarkers"]}
+        self.genes = {record["id"]: record for record in data["genes"]}
+        self.therapies = {record["id"]: record for record in data["therapies"]}
+        self.therapy_groups = {
+            record["id"]: record for record in data["therapy_groups"]
+        }
+        self.statements_by_indication = collections.defaultdict(list)
+        for statement in data["statements"]:
+            if statement.get("indication_id"):
+                self.statements_by_indication[statement["indication_id"]].append(
+                    statement
+                )
+
+    def document_drugs(self, document_ids: list[str]) -> set[str]:
+        """
+        Returns the casefolded brand and generic drug names of documents.
+        """
+        names = set()
+        for document_id in document_ids:
+            document = self.documents.get(document_id, {})
+            for key in ("drug_name_brand", "drug_name_generic"):
+                if document.get(key):
+                    names.add(document[key].casefold())
+        return names
+
+    def proposition_entities(self, proposition_ids: list) -> tuple[set[str], set[str]]:
+        """
+        Returns the casefolded therapy names and gene names of propositions.
+        """
+        therapies = set()
+        genes = set()
+        for proposition_id in proposition_ids:
+            proposition = self.propositions.get(proposition_id)
+            if proposition is None:
+                continue
+            therapy_ids = []
+            if proposition.get("therapy_id") is not None:
+                therapy_ids.append(proposition["therapy_id"])
+            if proposition.get("therapy_group_id") is not None:
+                therapy_ids.extend(
+                    self.therapy_groups[proposition["therapy_group_id"]]["therapies"]
+                )
+            therapies.update(self.therapies[i]["name"].casefold() for i in therapy_ids)
+            for biomarker_id in proposition.get("biomarkers", []):
+                for gene_id in self.biomarkers[biomarker_id].get("genes", []):
+                    genes.add(self.genes[gene_id]["name"].casefold())
+        return therapies, genes
+
+
+def lint(
+    data: dict[str, list[dict]], automaton: Automaton | None = None
+) -> list[Finding]:
+    """
+    Checks that each indication's `indication` and each statement's `description` mention a drug name of their
+    document and the genes of their propositions' biomarkers, and mention no genes or drugs they are not linked to.
+
+    Every text is scanned once, for all drug and gene names at the same time.
+
+    Args:
+        data (dict[str, list[dict]]): Referenced records keyed by table name.
+        automaton (Automaton | None): Automaton returned by `build_automaton`, or None to build one.
+
+    Returns:
+        list[Finding]: Findings, ordered by table and record.
+    """
+    if automaton is None:
+        automaton = build_automaton(data)
+    linker = Linker(data)
+
+    texts = []
+    for indication in data["indications"]:
+        statements = linker.statements_by_indication.get(indication["id"], [])
+        texts.append(
+            (
+                "indications",
+                indication,
+                "indication",
+                [indication["document_id"]],
+                [statement["proposition_id"] for statement in statements],
+            )
+        )
+    for statement in data["statements"]:
+        texts.append(
+            (
+                "statements",
+                statement,
+                "description",
+                statement.get("reportedIn") or [],
+                [statement["proposition_id"]],
+            )
+        )
+
+    findings = []
+    for table, record, field, document_ids, proposition_ids in texts:
+        text = record.get(field) or ""
+        mentioned = {"drug": set(), "gene": set()}
+        for _, _, (kind, name) in automaton.find(text):
+            mentioned[kind].add(name)
+
+        document_drugs = linker.document_drugs(document_ids)
+        therapies, genes = linker.proposition_entities(proposition_ids)
+
+        missing_drug = set()
+        if document_drugs and not document_drugs & mentioned["drug"]:
+            missing_drug = document_drugs
+        checks = [
+            ("missing_drug", missing_drug),
+            ("missing_gene", genes - mentioned["gene"]),
+            ("unexpected_drug", mentioned["drug"] - document_drugs - therapies),
+            ("unexpected_gene", mentioned["gene"] - genes),
+        ]
+        for kind, names in checks:
+            if names:
+                findings.append(
+                    Finding(table, record["id"], field, kind, sorted(names))
+                )
+    return findings
+
+
+def baseline_keys(findings: list[Finding]) -> set[tuple[str, str, str, str, str]]:
+    """
+    Returns the keys of findings as stored in a baseline: table, record id, field, kind, and name, one per name.
+
+    Args:
+        findings (list[Finding]): Findings returned by `lint`.
+
+    Returns:
+        set[tuple[str, str, str, str, str]]: The keys, with record ids as strings.
+    """
+    return {
+        (finding.table, str(finding.record_id), finding.field, finding.kind, name)
+        for finding in findings
+        for name in finding.names
+    }
+
+
+def read_baseline(path: str) -> set[tuple[str, str, str, str, str]]:
+    """
+    Reads a baseline of accepted findings, one tab-separated key per line as written by `write_baseline`. Blank lines
+    and lines starting with `#` are skipped.
+
+    Args:
+        path (str): Path to the baseline.
+
+    Returns:
+        set[tuple[str, str, str, str, str]]: Keys of the accepted findings.
+
+    Raises:
+        ValueError: If a line does not have five fields.
+    """
+    keys = set()
+    with open(path) as fp:
+        for number, line in enumerate(fp, start=1):
+            line = line.rstrip("\n")
+            if not line.strip() or line.startswith("#"):
+                continue
+            fields = tuple(line.split("\t"))
+            if len(fields) != 5:
+                raise ValueError(
+                    f"Expected 5 tab-separated fields on line {number} of {path}: {line}"
+                )
+            keys.add(fields)
+    return keys
+
+
+def write_baseline(findings: list[Finding], path: str) -> None:
+    """
+    Writes findings as a baseline of accepted findings, sorted so that changes to it are easy to review.
+
+    Args:
+        findings (list[Finding]): Findings returned by `lint`.
+        path (str): Path to the baseline.
+    """
+    with open(path, "w") as fp:
+        fp.write("# table\trecord_id\tfield\tkind\tname\n")
+        fp.writelines("\t".join(key) + "\n" for key in sorted(baseline_keys(findings)))
+
+
+def new_findings(
+    findings: list[Finding], baseline: set[tuple[str, str, str, str, str]]
+) -> list[Finding]:
+    """
+    Returns the findings that are not in a baseline, keeping only the names of each finding that are new.
+
+    Args:
+        findings (list[Finding]): Findings returned by `lint`.
+        baseline (set[tuple[str, str, str, str, str]]): Keys returned by `read_baseline`.
+
+    Returns:
+        list[Finding]: New findings, in their original order.
+    """
+    found = []
+    for finding in findings:
+        key = (finding.table, str(finding.record_id), finding.field, finding.kind)
+        names = [name for name in finding.names if (*key, name) not in baseline]
+        if names:
+            found.append(dataclasses.replace(finding, names=names))
+    return found
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(
+        prog="mentions",
+        description="checks that indications and statements mention the drugs and genes they are linked to.",
+    )
+    arg_parser.add_argument(
+        "--referenced",
+        help="directory of referenced json files",
+        default="referenced",
+    )
+    arg_parser.add_argument(
+        "--kind",
+        action="append",
+        choices=KINDS,
+        help="kind of finding to report; repeat for several. Default: all kinds",
+    )
+    arg_parser.add_argument(
+        "--baseline",
+        help="tab-separated file of accepted findings, which are not reported. Default: mentions/baseline.tsv",
+        default=BASELINE,
+    )
+    baseline_mode = arg_parser.add_mutually_exclusive_group()
+    baseline_mode.add_argument(
+        "--all",
+        action="store_true",
+        help="report every finding, including those in the baseline",
+    )
+    baseline_mode.add_argument(
+        "--update-baseline",
+        action="store_true",
+        help="accept every current finding by writing them to the baseline",
+    )
+    args = arg_parser.parse_args()
+
+    tables = [
+        "biomarkers",
+        "documents",
+        "genes",
+        "indications",
+        "propositions",
+        "statements",
+        "therapies",
+        "therapy_groups",
+    ]
+    found = lint(read.referenced(args.referenced, tables=tables))
+    if args.update_baseline:
+        write_baseline(found, args.baseline)
+        print(f"{len(baseline_keys(found))} findings written to {args.baseline}")
+        raise SystemExit(0)
+    if not args.all and os.path.exists(args.baseline):
+        accepted = read_baseline(args.baseline)
+        resolved = accepted - baseline_keys(found)
+        found = new_findings(found, accepted)
+        if resolved:
+            print(
+                f"{len(resolved)} findings of the baseline are resolved; remove them with --update-baseline."
+            )
+    if args.kind:
+        found = [finding for finding in found if finding.kind in args.kind]
+    for finding in found:
+        print(
+            f"{finding.table}:{finding.record_id}:{finding.field}: {finding.kind}: {', '.join(finding.names)}"
+        )
+    counts = collections.Counter(finding.kind for finding in found)
+    print(
+        ", ".join(
+            f"{counts[kind]} {kind}" for kind in KINDS if kind in (args.kind or KINDS)
+        )
+    )
+    if found:
+        raise SystemExit(1)
@@ -0,0 +1,182 @@
+import base64
+import binascii
+import bisect
+import dataclasses
+import json
+import typing
+
+# Version of the cursor format, so that cursors from an incompatible release are rejected rather than misread
+CURSOR_VERSION = 1
+
+# Number of records per page when no limit is given
+DEFAULT_LIMIT = 100
+
+
+def id_key(record_id) -> tuple:
+    """
+    Returns the key that record ids are ordered by: integer ids in numeric order, then string ids in lexical order,
+    so that tables with either kind of id have one stable order.
+    """
+    if isinstance(record_id, int) and not isinstance(record_id, bool):
+        return 0, record_id, ""
+    return 1, 0, str(record_id)
+
+
+def encode_cursor(record_id) -> str:
+    """
+    Returns an opaque cursor that resumes listing after a record.
+
+    Args:
+        record_id: Id of the last record returned.
+
+    Returns:
+        str: A URL safe cursor.
+    """
+    payload = json.dumps([CURSOR_VERSION, record_id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(payload).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: str):
+    """
+    Returns the record id that a cursor resumes after.
+
+    Args:
+        cursor (str): A cursor returned by `encode_cursor`.
+
+    Returns:
+        The id of the last record returned before the cursor.
+
+    Raises:
+        ValueError: If the cursor is malformed or of another version.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        version, record_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (binascii.Error, UnicodeDecodeError, TypeError, ValueError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+    if version != CURSOR_VERSION or not isinstance(record_id, (int, str)):
+        raise ValueError(f"Invalid cursor: {cursor}")
+    return record_id
+
+
+@dataclasses.dataclass
+class Page:
+    """
+    One page of a listing.
+
+    Attributes:
+        items (list): Records of the page, in id order.
+        next_cursor (str | None): Cursor for the next page, or None if this is the last page.
+    """
+
+    items: list
+    next_cursor: str | None = None
+
+
+class IdIndex:
+    """
+    The records of a table in stable id order, for keyset pagination. A cursor holds the id of the last record
+    returned, so each page is found by bisection rather than by counting an offset, and a listing resumes correctly
+    even if records are added or removed between pages.
+
+    Attributes:
+        ids (list): Record ids, in table order.
+        order (list[int]): Table positions of the records, in id order.
+        keys (list[tuple]): `id_key` of each record, in id order.
+        ranks (list[int]): Position in id order of each record, in table order.
+    """
+
+    def __init__(self, ids: typing.Iterable):
+        """
+        Sorts record ids.
+
+        Args:
+            ids (Iterable): Record ids, in table order.
+        """
+        self.ids = list(ids)
+        self.order = sorted(
+            range(len(self.ids)), key=lambda position: id_key(self.ids[position])
+        )
+        self.keys = [id_key(self.ids[position]) for position in self.order]
+        self.ranks = [0] * len(self.ids)
+        for rank, position in enumerate(self.order):
+            self.ranks[position] = rank
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def start(self, cursor: str | None = None) -> int:
+        """
+        Returns the rank, in id order, of the first record after a cursor.
+
+        Args:
+            cursor (str | None): A cursor, or None to start from the first record.
+
+        Returns:
+            int: The rank.
+
+        Raises:
+            ValueError: If the cursor is malformed.
+        """
+        if cursor is None:
+            return 0
+        return bisect.bisect_right(self.keys, id_key(decode_cursor(cursor)))
+
+    def iterate(self, cursor: str | None = None) -> typing.Iterator[int]:
+        """
+        Yields the table positions of records in id order, starting after a cursor.
+
+        Args:
+            cursor (str | None): A cursor, or None to start from the first record.
+
+        Yields:
+            int: Table position of each record.
+        """
+        for rank in range(self.start(cursor), len(self.order)):
+            yield self.order[rank]
+
+    def ranks_of(self, positions: typing.Iterable[int]) -> list[int]:
+        """
+        Returns the ranks in id order of records, sorted, so that pages of those records can be found by bisection.
+
+        Args:
+            positions (Iterable[int]): Table positions of the records, such as those that match a filter.
+
+        Returns:
+            list[int]: Sorted ranks of the records.
+        """
+        return sorted(self.ranks[position] for position in positions)
+
+    def page(
+        self,
+        cursor: str | None = None,
+        limit: int = DEFAULT_LIMIT,
+        ranks: typing.Sequence[int] | None = None,
+    ) -> tuple[list[int], str | None]:
+        """
+        Returns one page of records in id order.
+
+        Args:
+            cursor (str | None): A cursor, or None for the first page.
+            limit (int): Maximum number of records in the page.
+            ranks (Sequence[int] | None): Sorted ranks of the records to page through, as returned by `ranks_of`,
+                or None for every record. Callers that page through the same records repeatedly should keep them.
+
+        Returns:
+            tuple[list[int], str | None]: Table positions of the page's records, and the cursor for the next page, or
+                None if there are no more records.
+
+        Raises:
+            ValueError: If the cursor is malformed or the limit is not positive.
+        """
+        if limit < 1:
+            raise ValueError(f"Limit must be positive: {limit}")
+        start = self.start(cursor)
+        if ranks is None:
+            ranks = range(start, min(start + limit + 1, len(self.order)))
+        else:
+            first = bisect.bisect_left(ranks, start)
+            ranks = ranks[first : first + limit + 1]
+        page = [self.order[rank] for rank in ranks[:limit]]
+        next_cursor = encode_cursor(self.ids[page[-1]]) if len(ranks) > limit else None
+        return page, next_cursor
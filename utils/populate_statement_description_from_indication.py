@@ -1,46 +1,112 @@
 import argparse
 
-from utils import json_utils
 from utils import read
 from utils import write
 
-def main(statements, indications):
+
+def sync_descriptions(statements: list[dict], indications: list[dict]) -> list[dict]:
     """
-    For each statement, retrieves indication if it exists and copies the description value.
+    For each statement associated with an indication, copies the indication's description onto the statement if it
+    differs. Statements whose indication does not exist are skipped. Indications are indexed by id once, so each
+    statement is a single lookup. Running this again on its own output changes nothing.
 
     Args:
+        statements (list[dict]): List of dictionaries of database statements, modified in place.
         indications (list[dict]): List of dictionaries of database indications.
-        statements (list[dict]): List of dictionaries of database statements.
 
     Returns:
-        list[dict]: List of dictionaries of database statements, with description value copied from indications for statements associated with an indication.
+        list[dict]: One dictionary per changed statement, with keys `id`, `indication_id`, `old`, and `new`.
     """
+    descriptions = {
+        indication["id"]: indication["description"] for indication in indications
+    }
+    changes = []
     for statement in statements:
-        indication_id = statement.get('indication_id', None)
-        if indication_id:
-            indication_record = json_utils.get_record_by_key_value(records=indications, key='id', value=indication_id)
-            if indication_record:
-                statement['description'] = indication_record['description']
-    write.records(data=statements, file="referenced/statements.json")
+        indication_id = statement.get("indication_id", None)
+        if not indication_id or indication_id not in descriptions:
+            continue
+        description = descriptions[indication_id]
+        if statement.get("description") != description:
+            changes.append(
+                {
+                    "id": statement["id"],
+                    "indication_id": indication_id,
+                    "old": statement.get("description"),
+                    "new": description,
+                }
+            )
+            statement["description"] = description
+    return changes
+
+
+def report(changes: list[dict]) -> None:
+    """
+    Prints the description changes returned by `sync_descriptions`.
+
+    Args:
+        changes (list[dict]): Changes returned by `sync_descriptions`.
+    """
+    if not changes:
+        print("Statement descriptions are in sync with indications.")
+        return
+    for change in changes:
+        print(f"Statement {change['id']} (indication {change['indication_id']}):")
+        print(f"  - {change['old']}")
+        print(f"  + {change['new']}")
+    print(f"{len(changes)} statement description(s) changed.")
+
+
+def main(statements, indications, file="referenced/statements.json", check=False):
+    """
+    For each statement, retrieves indication if it exists and copies the description value. The statements file is
+    only written if at least one description changed.
+
+    Args:
+        statements (list[dict]): List of dictionaries of database statements.
+        indications (list[dict]): List of dictionaries of database indications.
+        file (str): Path to write statements to, if any description changed.
+        check (bool): If True, report changes without writing them.
+
+    Returns:
+        list[dict]: Changes returned by `sync_descriptions`.
+    """
+    changes = sync_descriptions(statements=statements, indications=indications)
+    report(changes)
+    if changes and not check:
+        write.records(data=statements, file=file)
+    return changes
+
 
 if __name__ == "__main__":
     arg_parser = argparse.ArgumentParser(
-        prog='populate_statement_description_from_indication',
-        description='Statements with an associated indication will adopt the description value from the indication.'
+        prog="populate_statement_description_from_indication",
+        description="Statements with an associated indication will adopt the description value from the indication.",
     )
     arg_parser.add_argument(
-        '--indications',
-        help='json detailing db indications',
-        default='referenced/indications.json'
+        "--indications",
+        help="json detailing db indications",
+        default="referenced/indications.json",
     )
     arg_parser.add_argument(
-        '--statements',
-        help='json detailing db statements',
-        default='referenced/statements.json'
+        "--statements",
+        help="json detailing db statements",
+        default="referenced/statements.json",
+    )
+    arg_parser.add_argument(
+        "--check",
+        action="store_true",
+        help="report out of sync descriptions without writing, and exit with status 1 if any are found",
     )
     args = arg_parser.parse_args()
 
     indications = read.json_records(file=args.indications)
     statements = read.json_records(file=args.statements)
 
-    main(statements=statements, indications=indications)
+    changes = main(
+        statements=statements,
+        indications=indications,
+        file=args.statements,
+        check=args.check,
+    )
+    if args.check and changes:
+        raise SystemExit(1)
@@ -0,0 +1,219 @@
+import argparse
+import datetime
+import math
+
+# Local imports
+from utils import read
+from utils import shards
+from utils import stats
+from utils import write
+
+# Predicates in the order their statements are listed; statements with other predicates follow
+PREDICATES = ["predictSensitivityTo", "predictResistanceTo"]
+
+# Entities that sorted statement lists are kept for, as returned by `shards.statement_entities`
+ENTITIES = ["genes", "diseases", "therapies"]
+
+
+def approval_date(statement: dict) -> str | None:
+    """
+    Returns the date that a dereferenced statement was approved or published: the initial approval date of its
+    indication, or else the latest publication date of the documents it is reported in.
+
+    Args:
+        statement (dict): A dereferenced statement record.
+
+    Returns:
+        str | None: An ISO 8601 date, or None if neither is known.
+    """
+    indication = statement.get("indication")
+    if isinstance(indication, dict) and indication.get("initial_approval_date"):
+        return indication["initial_approval_date"]
+    dates = [
+        stats.extension_value(document, "publication_date")
+        for document in statement.get("reportedIn") or []
+    ]
+    return max((date for date in dates if date), default=None)
+
+
+def sort_key(statement: dict, agents: list[str] | None = None) -> tuple:
+    """
+    Returns the composite key that statements are ordered by:
+    - evidence strength, in the order of the strengths table, with statements without a strength last,
+    - the agent that published the first document the statement is reported in, those listed in `agents` first and
+      in that order, then by name,
+    - approval date, most recent first, with undated statements last,
+    - predicate, in the order of `PREDICATES`,
+    - and statement id, so that no two statements compare equal.
+
+    Args:
+        statement (dict): A dereferenced statement record.
+        agents (list[str] | None): Ids of agents to list first, such as `["fda", "ema"]`.
+
+    Returns:
+        tuple: The key. Keys of statements with integer ids are comparable to each other.
+    """
+    agents = agents or []
+    strength = (statement.get("strength") or {}).get("id")
+    documents = statement.get("reportedIn") or []
+    agent = (stats.extension_value(documents[0], "agent") if documents else None) or {}
+    agent_rank = agents.index(agent["id"]) if agent.get("id") in agents else len(agents)
+    date = approval_date(statement)
+    # Dates are negated so that the most recent sorts first; undated statements get 1, after every negated date
+    day = -datetime.date.fromisoformat(date).toordinal() if date else 1
+    predicate = statement["proposition"].get("predicate")
+    predicate_rank = (
+        PREDICATES.index(predicate) if predicate in PREDICATES else len(PREDICATES)
+    )
+    return (
+        math.inf if strength is None else strength,
+        agent_rank,
+        agent.get("name") or "",
+        day,
+        predicate_rank,
+        predicate or "",
+        statement["id"],
+    )
+
+
+class StatementRanking:
+    """
+    Accumulates the sort key of each dereferenced statement, one statement at a time, so that it can be computed in
+    the same loop that resolves the Statements table, and the genes, diseases, and therapies each statement is about.
+    Statements are sorted once, in `order`; the statements of each entity are then listed in rank order, so the top
+    statements of a gene are a slice rather than a sort.
+
+    Attributes:
+        agents (list[str]): Ids of agents whose statements are listed first, in that order.
+        keys (dict[int, tuple]): Sort key of each statement, as returned by `sort_key`, by statement id.
+        entities (dict[int, dict[str, list[str]]]): Primary coding ids of the genes, diseases, and therapies of each
+            statement, by statement id.
+    """
+
+    def __init__(self, agents: list[str] | None = None):
+        self.agents = list(agents or [])
+        self.keys = {}
+        self.entities = {}
+        self._order = None
+        self._lists = None
+
+    def add(self, statement: dict) -> None:
+        """
+        Adds one dereferenced statement to the ranking.
+
+        Args:
+            statement (dict): A dereferenced statement record.
+        """
+        self.keys[statement["id"]] = sort_key(statement, agents=self.agents)
+        self.entities[statement["id"]] = {
+            kind: list(ids)
+            for kind, ids in shards.statement_entities(statement).items()
+        }
+        self._order = None
+        self._lists = None
+
+    def order(self) -> list[int]:
+        """
+        Returns every statement id in rank order.
+        """
+        if self._order is None:
+            self._order = sorted(self.keys, key=self.keys.__getitem__)
+        return self._order
+
+    def ranks(self) -> dict[int, int]:
+        """
+        Returns the rank of each statement, from 0, by statement id.
+        """
+        return {statement_id: rank for rank, statement_id in enumerate(self.order())}
+
+    def sorted_lists(self) -> dict[str, dict[str, list[int]]]:
+        """
+        Returns the statements of each gene, disease, and therapy in rank order. Lists are built in one pass over
+        the statements in rank order, so no list is sorted on its own.
+
+        Returns:
+            dict[str, dict[str, list[int]]]: For each of `ENTITIES`, statement ids keyed by primary coding id.
+        """
+        if self._lists is None:
+            lists = {kind: {} for kind in ENTITIES}
+            for statement_id in self.order():
+                for kind in ENTITIES:
+                    for entity in self.entities[statement_id][kind]:
+                        lists[kind].setdefault(entity, []).append(statement_id)
+            self._lists = {
+                kind: dict(sorted(entities.items())) for kind, entities in lists.items()
+            }
+        return self._lists
+
+    def top(self, kind: str, entity: str, k: int | None = None) -> list[int]:
+        """
+        Returns the highest ranked statements of a gene, disease, or therapy.
+
+        Args:
+            kind (str): One of `ENTITIES`.
+            entity (str): Primary coding id of the entity, such as `hgnc:1097`.
+            k (int | None): Number of statements to return, or None for all.
+
+        Returns:
+            list[int]: Statement ids in rank order.
+        """
+        return self.sorted_lists()[kind].get(entity, [])[:k]
+
+    def to_dict(self) -> dict:
+        """
+        Returns the ranking as a JSON serializable dictionary.
+
+        Returns:
+            dict: Dictionary with keys `order`, every statement id in rank order, and `genes`, `diseases`, and
+                `therapies`, the statement ids of each entity in rank order, keyed by primary coding id.
+        """
+        return {"order": self.order(), **self.sorted_lists()}
+
+
+def rank(statements: list[dict], agents: list[str] | None = None) -> dict:
+    """
+    Ranks dereferenced statements.
+
+    Args:
+        statements (list[dict]): Dereferenced statement records.
+        agents (list[str] | None): Ids of agents whose statements are listed first, in that order.
+
+    Returns:
+        dict: The ranking, as returned by `StatementRanking.to_dict`.
+    """
+    ranking = StatementRanking(agents=agents)
+    for statement in statements:
+        ranking.add(statement)
+    return ranking.to_dict()
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(
+        prog="ranking",
+        description="ranks dereferenced moalmanac db statements and lists them in rank order per gene, disease, and "
+        "therapy.",
+    )
+    arg_parser.add_argument(
+        "--input",
+        help="dereferenced json file, as written by utils.dereference",
+        default="moalmanac-draft.dereferenced.json",
+    )
+    arg_parser.add_argument(
+        "--output",
+        help="json file to write the ranking to",
+        default="rankings.json",
+    )
+    arg_parser.add_argument(
+        "--agent",
+        action="append",
+        dest="agents",
+        help="id of an agent whose statements are listed first; repeat for several, in order",
+    )
+    args = arg_parser.parse_args()
+
+    dereferenced = read.json_records(file=args.input)
+    write.dictionary(
+        data=rank(dereferenced["content"], agents=args.agents),
+        keys_list=[],
+        file=args.output,
+    )
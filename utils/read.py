@@ -1,4 +1,20 @@
 import json
+import os
+import typing
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+# Identifies files written by utils.write.binary
+BINARY_FORMAT = "moalmanac-binary"
+BINARY_VERSION = 1
+
+# Kinds of values in nodes of the binary format
+BINARY_LITERAL = 0
+BINARY_STRING = 1
+BINARY_NODE = 2
 
 def json_records(file: str) -> list[dict]:
     """
@@ -22,3 +38,210 @@ def json_records(file: str) -> list[dict]:
         raise FileNotFoundError(f"File not found: {file}") from e
     except json.JSONDecodeError as e:
         raise json.JSONDecodeError(f"Invalid JSON in file: {file}", e.doc, e.pos)
+
+
+def iter_json_records(file: str, chunk_size: int = 1 << 16) -> typing.Iterator:
+    """
+    Yields the elements of a JSON file whose top level value is a list, one at a time, reading the file in chunks so
+    that memory use does not grow with the size of the file.
+
+    Args:
+        file (str): Path to the JSON file.
+        chunk_size (int): Number of characters to read at a time.
+
+    Yields:
+        Each element of the list, such as a record.
+
+    Raises:
+        FileNotFoundError: If the file does not exist.
+        json.JSONDecodeError: If the file contains invalid JSON or its top level value is not a list.
+    """
+    if not os.path.isfile(file):
+        raise FileNotFoundError(f"File not found: {file}")
+    with open(file, "r") as fp:
+        yield from _json_list_elements(fp, file, chunk_size)
+
+
+def _json_list_elements(fp: typing.TextIO, file: str, chunk_size: int) -> typing.Iterator:
+    decoder = json.JSONDecoder()
+    buffer = ""
+    position = 0
+    eof = False
+    # The next structural character: "[" to open the list, "," or "]" after an element, None before an element
+    expected = "["
+    first = True
+
+    def fill():
+        nonlocal buffer, position, eof
+        chunk = fp.read(chunk_size)
+        eof = not chunk
+        buffer = buffer[position:] + chunk
+        position = 0
+
+    def invalid():
+        return json.JSONDecodeError(f"Invalid JSON in file: {file}", buffer, position)
+
+    while True:
+        while position < len(buffer) and buffer[position].isspace():
+            position += 1
+        if position == len(buffer):
+            if eof:
+                raise invalid()
+            fill()
+            continue
+        character = buffer[position]
+        if expected == "[":
+            if character != "[":
+                raise invalid()
+            position += 1
+            expected = None
+            continue
+        if character == "]" and (expected == "," or first):
+            return
+        if expected == ",":
+            if character != ",":
+                raise invalid()
+            position += 1
+            expected = None
+            continue
+        try:
+            value, end = decoder.raw_decode(buffer, position)
+        except json.JSONDecodeError:
+            end = None
+        # A value that is cut off, or reaches the end of the buffer like a number might, may continue in the next chunk
+        if end is None or (end == len(buffer) and not eof):
+            if eof:
+                raise invalid()
+            fill()
+            continue
+        yield value
+        position = end
+        expected = ","
+        first = False
+        # Drop consumed text once it dominates the buffer, so that the buffer stays about one chunk long
+        if position > chunk_size:
+            buffer = buffer[position:]
+            position = 0
+
+
+REFERENCED_TABLES = [
+    "agents",
+    "biomarkers",
+    "codings",
+    "contributions",
+    "diseases",
+    "documents",
+    "genes",
+    "indications",
+    "mappings",
+    "propositions",
+    "statements",
+    "strengths",
+    "therapies",
+    "therapy_groups",
+    "urls",
+]
+
+
+def referenced(
+    directory: str = "referenced", tables: list[str] | None = None
+) -> dict[str, list[dict]]:
+    """
+    Loads referenced JSON files from a directory, keyed by table name.
+
+    Args:
+        directory (str): Path to the folder containing referenced JSON files (default: "referenced").
+        tables (list[str] | None): Table names to load. If None, all tables in `REFERENCED_TABLES` are loaded.
+
+    Returns:
+        dict[str, list[dict]]: Parsed records for each requested table, keyed by table name.
+    """
+    if tables is None:
+        tables = REFERENCED_TABLES
+    return {
+        table: json_records(file=os.path.join(directory, f"{table}.json"))
+        for table in tables
+    }
+
+
+def decode_binary(content: bytes):
+    """
+    Decodes data encoded by utils.write.encode_binary.
+
+    The encoding is a MessagePack array of a string table and a node table: every distinct string, and every distinct
+    object or array, is stored once, each node after the nodes it contains. Decoding builds each distinct object
+    once, so identical objects within the result, such as a gene embedded in many statements, are shared and should
+    not be modified.
+
+    Args:
+        content (bytes): The encoded data.
+
+    Returns:
+        The decoded data, equal to the JSON data that was encoded.
+
+    Raises:
+        ImportError: If msgpack is not installed.
+        ValueError: If the content is not in the binary format, or is of an unsupported version.
+    """
+    if msgpack is None:
+        raise ImportError("Reading binary files requires the msgpack package; install it with pip install msgpack.")
+    document = msgpack.unpackb(content)
+    if not isinstance(document, list) or len(document) != 6 or document[0] != BINARY_FORMAT:
+        raise ValueError("Not a moalmanac binary file.")
+    _, version, strings, nodes, root_kind, root = document
+    if version != BINARY_VERSION:
+        raise ValueError(f"Unsupported moalmanac binary version: {version}")
+
+    decoded = []
+    append = decoded.append
+    for node in nodes:
+        if len(node) == 2:
+            kinds, values = node
+            append(
+                [
+                    value if kind == BINARY_LITERAL else strings[value] if kind == BINARY_STRING else decoded[value]
+                    for kind, value in zip(kinds, values)
+                ]
+            )
+        else:
+            kinds, keys, values = node
+            append(
+                {
+                    strings[key]: (
+                        value if kind == BINARY_LITERAL else strings[value] if kind == BINARY_STRING else decoded[value]
+                    )
+                    for key, kind, value in zip(keys, kinds, values)
+                }
+            )
+    if root_kind == BINARY_STRING:
+        return strings[root]
+    if root_kind == BINARY_NODE:
+        return decoded[root]
+    return root
+
+
+def binary_records(file: str):
+    """
+    Loads a file written by utils.write.binary, such as moalmanac-draft.dereferenced.msgpack. This is several times
+    faster than parsing the equivalent JSON file.
+
+    Args:
+        file (str): Path to the binary file.
+
+    Returns:
+        The decoded data, equal to the JSON data that was written. Identical objects are shared and should not be
+            modified.
+
+    Raises:
+        FileNotFoundError: If the file does not exist.
+        ValueError: If the file is not in the binary format.
+    """
+    try:
+        with open(file, "rb") as fp:
+            content = fp.read()
+    except FileNotFoundError as e:
+        raise FileNotFoundError(f"File not found: {file}") from e
+    try:
+        return decode_binary(content)
+    except ValueError as e:
+        raise ValueError(f"{e} File: {file}") from e
@@ -0,0 +1,357 @@
+import argparse
+import concurrent.futures
+import gzip
+import hashlib
+import json
+import os
+import zlib
+
+# Local imports
+from utils import dereference
+from utils import read
+from utils import write
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+MANIFEST = "manifest.json"
+EXTENSIONS = {"gzip": ".gz", "zstd": ".zst"}
+DECOMPRESSION_ERRORS = (zstandard.ZstdError,) if zstandard is not None else ()
+
+
+def sha256(content: bytes) -> str:
+    """
+    Returns the SHA-256 hex digest of bytes.
+
+    Args:
+        content (bytes): The content to hash.
+
+    Returns:
+        str: The hex digest.
+    """
+    return hashlib.sha256(content).hexdigest()
+
+
+def concept_table(directory: str) -> bytes:
+    """
+    Combines the per-record JSON files of one concept directory, such as dereferenced/genes/, into a single JSON list
+    of records ordered by id.
+
+    Args:
+        directory (str): Folder containing one `<id>.json` file per record.
+
+    Returns:
+        bytes: The records, serialized as a compact JSON list.
+    """
+    records = [
+        read.json_records(file=os.path.join(directory, filename))
+        for filename in os.listdir(directory)
+        if filename.endswith(".json")
+    ]
+    records.sort(key=lambda record: record["id"])
+    return json.dumps(records, separators=(",", ":")).encode()
+
+
+def compress(content: bytes, encoding: str, level: int) -> bytes:
+    """
+    Compresses content with gzip or Zstandard. Output is deterministic, so identical inputs produce identical bundles.
+
+    Args:
+        content (bytes): The content to compress.
+        encoding (str): `gzip` or `zstd`.
+        level (int): Compression level.
+
+    Returns:
+        bytes: The compressed content.
+    """
+    if encoding == "gzip":
+        return gzip.compress(content, compresslevel=level, mtime=0)
+    if encoding == "zstd":
+        return zstandard.ZstdCompressor(level=level).compress(content)
+    raise ValueError(f"Unsupported encoding: {encoding}")
+
+
+def decompress(content: bytes, encoding: str) -> bytes:
+    """
+    Decompresses content written by `compress`.
+
+    Args:
+        content (bytes): The compressed content.
+        encoding (str): `gzip` or `zstd`.
+
+    Returns:
+        bytes: The original content.
+    """
+    if encoding == "gzip":
+        return gzip.decompress(content)
+    if encoding == "zstd":
+        return zstandard.ZstdDecompressor().decompress(content)
+    raise ValueError(f"Unsupported encoding: {encoding}")
+
+
+def available_encodings() -> list[str]:
+    """
+    Returns the compression encodings that can be written in this environment. Zstandard requires the optional
+    `zstandard` package.
+
+    Returns:
+        list[str]: Encodings, from `gzip` and `zstd`.
+    """
+    return ["gzip", "zstd"] if zstandard is not None else ["gzip"]
+
+
+def _write_variant(
+    output_dir: str, name: str, content: bytes, encoding: str, level: int
+) -> tuple[str, dict]:
+    compressed = compress(content, encoding, level)
+    filename = name + EXTENSIONS[encoding]
+    with open(os.path.join(output_dir, filename), "wb") as fp:
+        fp.write(compressed)
+    return filename, {
+        "bytes": len(compressed),
+        "sha256": sha256(compressed),
+        "encoding": encoding,
+        "source": name,
+    }
+
+
+def build_bundle(
+    output_dir: str,
+    blobs: list[str],
+    concepts: list[tuple[str, str]] | None = None,
+    about: dict | None = None,
+    encodings: list[str] | None = None,
+    gzip_level: int = 9,
+    zstd_level: int = 19,
+    workers: int | None = None,
+    quiet: bool = False,
+) -> dict:
+    """
+    Writes a release bundle: each blob and concept table uncompressed, a compressed variant of each for every
+    encoding, and a manifest of every file's size and SHA-256 checksum.
+
+    Compression runs on a thread pool; zlib and Zstandard release the GIL while compressing, so files are compressed
+    in parallel.
+
+    Args:
+        output_dir (str): Directory to write the bundle into.
+        blobs (list[str]): Paths of single-file outputs to include as-is, such as molecular-oncology-almanac.json.
+        concepts (list[tuple[str, str]] | None): Pairs of table name and per-record directory to include as one
+            `<table>.json` file each. If None, the concept directories written by utils.dereference.
+        about (dict | None): Database metadata to record in the manifest.
+        encodings (list[str] | None): Encodings to write, from `gzip` and `zstd`. If None, every available encoding.
+        gzip_level (int): gzip compression level, 1 to 9.
+        zstd_level (int): Zstandard compression level, 1 to 22.
+        workers (int | None): Number of compression threads. If None, one per CPU.
+        quiet (bool): Suppress print statements if True.
+
+    Returns:
+        dict: The manifest that was written to `manifest.json`.
+
+    Raises:
+        ValueError: If an encoding is not available.
+    """
+    if concepts is None:
+        concepts = [
+            (name, directory)
+            for name, directory in dereference._CONCEPT_DIRS
+            if os.path.isdir(directory)
+        ]
+    if encodings is None:
+        encodings = available_encodings()
+    for encoding in encodings:
+        if encoding not in available_encodings():
+            raise ValueError(
+                f"Encoding {encoding} is not available; install the zstandard package to write .zst files."
+            )
+    levels = {"gzip": gzip_level, "zstd": zstd_level}
+    os.makedirs(output_dir, exist_ok=True)
+
+    files = {}
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = []
+        sources = [(os.path.basename(path), path, None) for path in blobs]
+        sources += [(f"{name}.json", None, directory) for name, directory in concepts]
+        for name, path, directory in sources:
+            if path is not None:
+                with open(path, "rb") as fp:
+                    content = fp.read()
+            else:
+                content = concept_table(directory)
+            with open(os.path.join(output_dir, name), "wb") as fp:
+                fp.write(content)
+            files[name] = {"bytes": len(content), "sha256": sha256(content)}
+            for encoding in encodings:
+                futures.append(
+                    executor.submit(
+                        _write_variant,
+                        output_dir,
+                        name,
+                        content,
+                        encoding,
+                        levels[encoding],
+                    )
+                )
+        for future in concurrent.futures.as_completed(futures):
+            filename, entry = future.result()
+            files[filename] = entry
+            if not quiet:
+                source = files.get(entry["source"], {}).get("bytes", 0)
+                print(
+                    f"{filename}: {entry['bytes']:,} bytes, {source / max(entry['bytes'], 1):.1f}x"
+                )
+
+    manifest = {
+        "about": about,
+        "files": dict(sorted(files.items())),
+    }
+    write.dictionary(
+        data=manifest,
+        keys_list=[],
+        file=os.path.join(output_dir, MANIFEST),
+        quiet=quiet,
+    )
+    return manifest
+
+
+def verify_bundle(output_dir: str, workers: int | None = None) -> list[str]:
+    """
+    Checks every file listed in a bundle's manifest against its recorded size and checksum, and checks that each
+    compressed variant decompresses to its source.
+
+    Args:
+        output_dir (str): Directory containing the bundle.
+        workers (int | None): Number of verification threads. If None, one per CPU.
+
+    Returns:
+        list[str]: A description of each problem found; empty if the bundle is intact.
+    """
+    manifest = read.json_records(file=os.path.join(output_dir, MANIFEST))
+    files = manifest["files"]
+
+    def check(filename):
+        entry = files[filename]
+        path = os.path.join(output_dir, filename)
+        try:
+            with open(path, "rb") as fp:
+                content = fp.read()
+        except FileNotFoundError:
+            return [f"{filename}: missing"]
+        if len(content) != entry["bytes"]:
+            return [
+                f"{filename}: expected {entry['bytes']} bytes, found {len(content)}"
+            ]
+        if sha256(content) != entry["sha256"]:
+            return [f"{filename}: checksum mismatch"]
+        if "encoding" not in entry:
+            return []
+        source = files.get(entry.get("source"))
+        if source is None:
+            return [f"{filename}: source {entry.get('source')} is not in the manifest"]
+        if entry["encoding"] == "zstd" and zstandard is None:
+            return [f"{filename}: cannot decompress without the zstandard package"]
+        try:
+            original = decompress(content, entry["encoding"])
+        except (OSError, EOFError, zlib.error, *DECOMPRESSION_ERRORS) as e:
+            return [f"{filename}: failed to decompress: {e}"]
+        if sha256(original) != source["sha256"]:
+            return [f"{filename}: does not decompress to {entry['source']}"]
+        return []
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+        results = executor.map(check, sorted(files))
+    return [problem for problems in results for problem in problems]
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(
+        prog="release",
+        description="writes compressed, checksummed release bundles of moalmanac db, or verifies an existing bundle.",
+    )
+    arg_parser.add_argument(
+        "--output",
+        help="directory to write the bundle into, or to verify",
+        default="release",
+    )
+    arg_parser.add_argument(
+        "--blob",
+        action="append",
+        dest="blobs",
+        help="single-file output to include; repeat for several. Default: molecular-oncology-almanac.json and "
+        "moalmanac-draft.dereferenced.json, if present",
+    )
+    arg_parser.add_argument(
+        "--about",
+        help="json detailing db metadata, recorded in the manifest",
+        default=os.path.join("referenced", "about.json"),
+    )
+    arg_parser.add_argument(
+        "--encoding",
+        action="append",
+        dest="encodings",
+        choices=["gzip", "zstd"],
+        help="compression to write; repeat for several. Default: gzip, and zstd if the zstandard package is installed",
+    )
+    arg_parser.add_argument(
+        "--gzip-level",
+        type=int,
+        default=9,
+        help="gzip compression level. Default: 9",
+    )
+    arg_parser.add_argument(
+        "--zstd-level",
+        type=int,
+        default=19,
+        help="Zstandard compression level. Default: 19",
+    )
+    arg_parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="number of compression threads. Default: one per CPU",
+    )
+    arg_parser.add_argument(
+        "--verify",
+        action="store_true",
+        help="verify the bundle in --output against its manifest instead of writing one",
+    )
+    arg_parser.add_argument(
+        "--quiet",
+        action="store_true",
+        help="suppress print messages",
+    )
+    args = arg_parser.parse_args()
+
+    if args.verify:
+        problems = verify_bundle(args.output, workers=args.workers)
+        for problem in problems:
+            print(problem)
+        if problems:
+            raise SystemExit(1)
+        print(f"Bundle in {args.output} matches its manifest.")
+        raise SystemExit(0)
+
+    blobs = args.blobs
+    if blobs is None:
+        blobs = [
+            path
+            for path in [
+                "molecular-oncology-almanac.json",
+                "moalmanac-draft.dereferenced.json",
+            ]
+            if os.path.exists(path)
+        ]
+    build_bundle(
+        output_dir=args.output,
+        blobs=blobs,
+        about=read.json_records(file=args.about)
+        if os.path.exists(args.about)
+        else None,
+        encodings=args.encodings,
+        gzip_level=args.gzip_level,
+        zstd_level=args.zstd_level,
+        workers=args.workers,
+        quiet=args.quiet,
+    )
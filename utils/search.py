@@ -0,0 +1,377 @@
+import argparse
+import array
+import collections
+import dataclasses
+import json
+import math
+import re
+import struct
+import sys
+
+# Local imports
+from utils import read
+
+MAGIC = b"MOASRCH1"
+TOKEN = re.compile(r"[0-9a-z]+")
+QUERY = re.compile(r'"([^"]*)"|(\S+)')
+
+# Fields of dereferenced statements that are indexed, and how to reach their text and source id
+FIELDS = ("indication", "statement", "document")
+
+
+def tokenize(text: str) -> list[str]:
+    """
+    Splits text into lowercase alphanumeric tokens. Punctuation, including hyphens, separates tokens, so
+    `castration-sensitive` becomes `castration` and `sensitive` at adjacent positions.
+
+    Args:
+        text (str): The text to tokenize.
+
+    Returns:
+        list[str]: The tokens, in order.
+    """
+    return TOKEN.findall(text.casefold())
+
+
+def statement_texts(statement: dict) -> list[tuple[str, str, str]]:
+    """
+    Returns the indexed texts of a dereferenced statement.
+
+    Args:
+        statement (dict): A dereferenced statement record.
+
+    Returns:
+        list[tuple[str, str, str]]: Triples of field, source record id, and text, for the statement's description,
+            its indication's `indication`, and each cited document's `description`.
+    """
+    texts = []
+    if statement.get("description"):
+        texts.append(("statement", str(statement["id"]), statement["description"]))
+    indication = statement.get("indication")
+    if isinstance(indication, dict) and indication.get("indication"):
+        texts.append(("indication", str(indication["id"]), indication["indication"]))
+    for document in statement.get("reportedIn") or []:
+        if isinstance(document, dict) and document.get("description"):
+            texts.append(("document", str(document["id"]), document["description"]))
+    return texts
+
+
+@dataclasses.dataclass
+class SearchResult:
+    """
+    A statement that matches a query.
+
+    Attributes:
+        statement_id (int | str): Id of the matching statement.
+        score (float): BM25 score of the statement, summed over its indexed texts.
+        fields (list[str]): Fields in which the statement matched.
+    """
+
+    statement_id: int | str
+    score: float
+    fields: list[str]
+
+
+class SearchIndex:
+    """
+    A positional inverted index with BM25 scoring over the free text of statements: statement descriptions,
+    indications, and document citations.
+
+    Each distinct text is indexed once and mapped to the statements that include it, so an indication shared by
+    several statements is scored once. Postings are stored as a flat array of unsigned 32-bit integers; for each
+    term, a run of `text, term frequency, positions...` per text containing it. The persisted format is the same
+    array preceded by a JSON header, so loading is one JSON parse and one zero-copy view of the postings.
+
+    Attributes:
+        texts (list[tuple[str, str]]): Field and source record id of each indexed text.
+        lengths (list[int]): Number of tokens of each text.
+        statements (list[list]): Statement ids that include each text.
+        terms (dict[str, tuple[int, int, int]]): For each term, the offset and length of its postings in
+            `postings`, and the number of texts that contain it.
+        postings (memoryview | array.array): The postings of every term.
+    """
+
+    k1 = 1.2
+    b = 0.75
+
+    def __init__(self, texts, lengths, statements, terms, postings):
+        self.texts = texts
+        self.lengths = lengths
+        self.statements = statements
+        self.terms = terms
+        self.postings = postings
+        self.average_length = sum(lengths) / len(lengths) if lengths else 0.0
+
+    @classmethod
+    def build(cls, statements: list[dict]) -> "SearchIndex":
+        """
+        Indexes the free text of dereferenced statements.
+
+        Args:
+            statements (list[dict]): Dereferenced statement records.
+
+        Returns:
+            SearchIndex: The index.
+        """
+        positions = {}
+        keys = {}
+        texts = []
+        lengths = []
+        owners = []
+        for statement in statements:
+            for field, source_id, text in statement_texts(statement):
+                key = (field, source_id)
+                if key not in keys:
+                    keys[key] = len(texts)
+                    texts.append(key)
+                    owners.append([])
+                    tokens = tokenize(text)
+                    lengths.append(len(tokens))
+                    for position, token in enumerate(tokens):
+                        positions.setdefault(token, {}).setdefault(
+                            keys[key], []
+                        ).append(position)
+                number = keys[key]
+                if not owners[number] or owners[number][-1] != statement["id"]:
+                    owners[number].append(statement["id"])
+
+        postings = array.array("I")
+        terms = {}
+        for term in sorted(positions):
+            offset = len(postings)
+            for number, term_positions in positions[term].items():
+                postings.append(number)
+                postings.append(len(term_positions))
+                postings.extend(term_positions)
+            terms[term] = (offset, len(postings) - offset, len(positions[term]))
+        return cls(texts, lengths, owners, terms, postings)
+
+    def save(self, file: str, quiet: bool = False) -> None:
+        """
+        Writes the index to a file.
+
+        Args:
+            file (str): The output file path.
+            quiet (bool): Suppress print statement if True
+        """
+        header = json.dumps(
+            {
+                "texts": self.texts,
+                "lengths": self.lengths,
+                "statements": self.statements,
+                "terms": self.terms,
+            },
+            separators=(",", ":"),
+        ).encode()
+        postings = array.array("I", self.postings)
+        if sys.byteorder != "little":
+            postings.byteswap()
+        with open(file, "wb") as fp:
+            fp.write(MAGIC)
+            fp.write(struct.pack("<Q", len(header)))
+            fp.write(header)
+            fp.write(postings.tobytes())
+        if not quiet:
+            print(f"Search index successfully written to {file}")
+
+    @classmethod
+    def load(cls, file: str) -> "SearchIndex":
+        """
+        Reads an index written by `save`.
+
+        Args:
+            file (str): Path to the index file.
+
+        Returns:
+            SearchIndex: The index.
+
+        Raises:
+            ValueError: If the file is not a search index.
+        """
+        with open(file, "rb") as fp:
+            content = fp.read()
+        if content[: len(MAGIC)] != MAGIC:
+            raise ValueError(f"Not a search index: {file}")
+        start = len(MAGIC) + 8
+        (size,) = struct.unpack("<Q", content[len(MAGIC) : start])
+        header = json.loads(content[start : start + size])
+        data = memoryview(content)[start + size :]
+        if sys.byteorder == "little":
+            postings = data.cast("I")
+        else:
+            postings = array.array("I", data.tobytes())
+            postings.byteswap()
+        return cls(
+            texts=[tuple(text) for text in header["texts"]],
+            lengths=header["lengths"],
+            statements=header["statements"],
+            terms={term: tuple(entry) for term, entry in header["terms"].items()},
+            postings=postings,
+        )
+
+    def _positions(self, term: str) -> dict[int, list[int]]:
+        """
+        Returns the positions of a term in each text that contains it.
+        """
+        entry = self.terms.get(term)
+        if entry is None:
+            return {}
+        offset, length, _ = entry
+        postings = self.postings[offset : offset + length]
+        result = {}
+        i = 0
+        while i < len(postings):
+            number, frequency = postings[i], postings[i + 1]
+            result[number] = list(postings[i + 2 : i + 2 + frequency])
+            i += 2 + frequency
+        return result
+
+    def _phrase(self, tokens: list[str]) -> dict[int, int]:
+        """
+        Returns the number of occurrences of consecutive tokens in each text that contains them.
+        """
+        if not tokens:
+            return {}
+        # Intersect starting from the rarest token
+        postings = [self._positions(token) for token in tokens]
+        candidates = set(min(postings, key=len))
+        for term_postings in postings:
+            candidates &= term_postings.keys()
+        frequencies = {}
+        for number in candidates:
+            starts = set(postings[0][number])
+            for i, term_postings in enumerate(postings[1:], start=1):
+                starts &= {position - i for position in term_postings[number]}
+                if not starts:
+                    break
+            if starts:
+                frequencies[number] = len(starts)
+        return frequencies
+
+    def _bm25(self, frequencies: dict[int, int]) -> dict[int, float]:
+        """
+        Scores texts by BM25, given the frequency of a term or phrase in each text that contains it.
+        """
+        count = len(self.lengths)
+        idf = math.log(1 + (count - len(frequencies) + 0.5) / (len(frequencies) + 0.5))
+        scores = {}
+        for number, frequency in frequencies.items():
+            norm = 1 - self.b + self.b * self.lengths[number] / self.average_length
+            scores[number] = (
+                idf * frequency * (self.k1 + 1) / (frequency + self.k1 * norm)
+            )
+        return scores
+
+    def search(
+        self, query: str, limit: int | None = 10, fields: list[str] | None = None
+    ) -> list[SearchResult]:
+        """
+        Finds statements whose texts, together, match every clause of a query, ranked by BM25.
+
+        Each whitespace separated word is a clause, as is each double quoted phrase. A clause of several tokens,
+        such as `"breast cancer"` or `castration-sensitive`, matches only where its tokens are consecutive.
+
+        Args:
+            query (str): The query, such as `BRCA2 castration-sensitive`.
+            limit (int | None): Maximum number of results, or None for all.
+            fields (list[str] | None): Fields to search, from `FIELDS`. If None, all fields.
+
+        Returns:
+            list[SearchResult]: Matching statements, highest score first, then by statement id.
+        """
+        clauses = []
+        for phrase, word in QUERY.findall(query):
+            tokens = tokenize(phrase or word)
+            if tokens:
+                clauses.append(tokens)
+        if not clauses:
+            return []
+
+        scores = None
+        matched = collections.defaultdict(set)
+        for tokens in clauses:
+            frequencies = self._phrase(tokens)
+            if fields is not None:
+                frequencies = {
+                    n: f for n, f in frequencies.items() if self.texts[n][0] in fields
+                }
+            clause_scores = collections.defaultdict(float)
+            for number, score in self._bm25(frequencies).items():
+                for statement_id in self.statements[number]:
+                    clause_scores[statement_id] += score
+                    matched[statement_id].add(self.texts[number][0])
+            if scores is None:
+                scores = dict(clause_scores)
+            else:
+                scores = {
+                    s: scores[s] + clause_scores[s]
+                    for s in scores.keys() & clause_scores.keys()
+                }
+            if not scores:
+                return []
+
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], str(item[0])))
+        if limit is not None:
+            ranked = ranked[:limit]
+        return [
+            SearchResult(
+                statement_id=s, score=round(score, 4), fields=sorted(matched[s])
+            )
+            for s, score in ranked
+        ]
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(
+        prog="search",
+        description="builds or queries a full-text index of moalmanac db statements, indications, and documents.",
+    )
+    arg_parser.add_argument(
+        "query",
+        nargs="?",
+        help="query to search for; omit with --build",
+    )
+    arg_parser.add_argument(
+        "--index",
+        help="search index file",
+        default="moalmanac-draft.search.idx",
+    )
+    arg_parser.add_argument(
+        "--build",
+        action="store_true",
+        help="build the index from --input instead of querying it",
+    )
+    arg_parser.add_argument(
+        "--input",
+        help="dereferenced json file to index, with --build",
+        default="moalmanac-draft.dereferenced.json",
+    )
+    arg_parser.add_argument(
+        "--limit",
+        type=int,
+        default=10,
+        help="maximum number of results. Default: 10",
+    )
+    arg_parser.add_argument(
+        "--field",
+        action="append",
+        dest="fields",
+        choices=FIELDS,
+        help="field to search; repeat for several. Default: all fields",
+    )
+    arg_parser.add_argument(
+        "--quiet",
+        action="store_true",
+        help="suppress print messages",
+    )
+    args = arg_parser.parse_args()
+
+    if args.build:
+        dereferenced = read.json_records(file=args.input)
+        SearchIndex.build(dereferenced["content"]).save(args.index, quiet=args.quiet)
+    elif args.query is None:
+        arg_parser.error("a query is required unless --build is given")
+    else:
+        index = SearchIndex.load(args.index)
+        for result in index.search(args.query, limit=args.limit, fields=args.fields):
+            print(f"{result.statement_id}\t{result.score}\t{','.join(result.fields)}")
@@ -0,0 +1,753 @@
+import argparse
+import dataclasses
+import gzip
+import hashlib
+import http.server
+import json
+import os
+import threading
+import typing
+import urllib.parse
+
+# Local imports
+from utils import dereference
+from utils import pagination
+from utils import read
+from utils import shards
+from utils import therapy_index
+
+JSON = "application/json"
+
+# Responses smaller than this are not worth compressing
+GZIP_MIN_BYTES = 1024
+
+
+@dataclasses.dataclass
+class Response:
+    """
+    A pre-serialized JSON response body, with its strong ETag and a lazily compressed copy.
+
+    Attributes:
+        body (bytes): The serialized JSON.
+        etag (str): Strong entity tag, derived from a SHA-256 hash of `body`.
+    """
+
+    body: bytes
+    etag: str = ""
+    _gzipped: bytes | None = dataclasses.field(default=None, repr=False)
+
+    def __post_init__(self):
+        if not self.etag:
+            self.etag = f'"{hashlib.sha256(self.body).hexdigest()[:32]}"'
+
+    @classmethod
+    def from_parts(cls, parts: list[bytes]) -> "Response":
+        """
+        Creates a response for a JSON list from already serialized elements.
+
+        Args:
+            parts (list[bytes]): Serialized JSON values.
+
+        Returns:
+            Response: The response.
+        """
+        return cls(body=b"[" + b",".join(parts) + b"]")
+
+    @property
+    def gzipped(self) -> bytes:
+        """
+        The body compressed with gzip. Compressed once, on first use.
+        """
+        if self._gzipped is None:
+            self._gzipped = gzip.compress(self.body, compresslevel=6, mtime=0)
+        return self._gzipped
+
+
+def serialize(value) -> bytes:
+    """
+    Serializes a value to compact JSON bytes.
+
+    Args:
+        value: A JSON serializable value.
+
+    Returns:
+        bytes: The serialized value.
+    """
+    return json.dumps(value, separators=(",", ":")).encode()
+
+
+class TableIndex:
+    """
+    Pre-serialized records of one dereferenced table, indexed by id and by name.
+
+    Attributes:
+        records (dict[str, Response]): Responses for each record, keyed by record id as a string.
+        names (dict[str, list[str]]): Record ids keyed by casefolded record name, for tables with names.
+        everything (Response): Response listing every record.
+        ids (pagination.IdIndex): Records in stable id order, for paged listings.
+    """
+
+    FILTERS = ("name",)
+
+    # Number of filters whose sorted ranks are kept for paged listings
+    RANKED_CACHE_SIZE = 4096
+
+    def __init__(self, records: list[dict]):
+        """
+        Serializes each record once and indexes it.
+
+        Args:
+            records (list[dict]): Dereferenced records of the table.
+        """
+        self.records = {}
+        self.names = {}
+        self._order = []
+        for record in records:
+            record_id = str(record["id"])
+            self.records[record_id] = Response(body=serialize(record))
+            self._order.append(record_id)
+            if isinstance(record.get("name"), str):
+                self.names.setdefault(record["name"].casefold(), []).append(record_id)
+        self.everything = Response.from_parts(
+            [self.records[record_id].body for record_id in self._order]
+        )
+        self.ids = pagination.IdIndex(record["id"] for record in records)
+        self._positions = {
+            record_id: position for position, record_id in enumerate(self._order)
+        }
+        self._ranked = {}
+
+    def positions(self, **filters: str) -> set[int] | None:
+        """
+        Returns the table positions of the records with a given name, compared case insensitively.
+
+        Args:
+            **filters (str): A `name` to filter by.
+
+        Returns:
+            set[int] | None: Matching record positions, or None if no filter is given.
+
+        Raises:
+            KeyError: If a filter name is not one of `FILTERS`.
+        """
+        for name in filters:
+            if name not in self.FILTERS:
+                raise KeyError(name)
+        if not filters:
+            return None
+        return {
+            self._positions[record_id]
+            for record_id in self.names.get(filters["name"].casefold(), [])
+        }
+
+    def ranked(self, **filters: str) -> list[int] | None:
+        """
+        Returns the sorted ranks in id order of the records that match every given filter, for paged listings. Ranks
+        are kept per filter, so that each page of a filtered listing is found by bisection without sorting again.
+
+        Args:
+            **filters (str): Values keyed by filter name, one of `FILTERS`.
+
+        Returns:
+            list[int] | None: Sorted ranks of the matching records, or None if no filter is given.
+
+        Raises:
+            KeyError: If a filter name is not one of `FILTERS`.
+        """
+        if not filters:
+            return None
+        key = tuple(sorted((name, value.casefold()) for name, value in filters.items()))
+        ranks = self._ranked.get(key)
+        if ranks is None:
+            ranks = self.ids.ranks_of(self.positions(**filters))
+            if len(self._ranked) >= self.RANKED_CACHE_SIZE:
+                self._ranked.pop(next(iter(self._ranked)), None)
+            self._ranked[key] = ranks
+        return ranks
+
+    def list(self, name: str | None = None) -> Response:
+        """
+        Returns the records of the table, optionally only those with a given name.
+
+        Args:
+            name (str | None): Name to filter by, compared case insensitively.
+
+        Returns:
+            Response: A JSON list of records.
+        """
+        if name is None:
+            return self.everything
+        ids = self.names.get(name.casefold(), [])
+        return Response.from_parts([self.records[record_id].body for record_id in ids])
+
+    def page(
+        self,
+        cursor: str | None = None,
+        limit: int = pagination.DEFAULT_LIMIT,
+        ranks: typing.Sequence[int] | None = None,
+    ) -> Response:
+        """
+        Returns one page of records in stable id order.
+
+        Args:
+            cursor (str | None): The `next_cursor` of the previous page, or None for the first page.
+            limit (int): Maximum number of records in the page.
+            ranks (Sequence[int] | None): Sorted ranks of the records to page through, as returned by `ranked`, or None
+                for every record.
+
+        Returns:
+            Response: A JSON object with keys `items`, the page's records, and `next_cursor`, which is null on the
+                last page.
+
+        Raises:
+            ValueError: If the cursor is malformed or the limit is not positive.
+        """
+        page, next_cursor = self.ids.page(cursor, limit=limit, ranks=ranks)
+        items = b",".join(self.records[self._order[position]].body for position in page)
+        return Response(
+            body=b'{"items":['
+            + items
+            + b'],"next_cursor":'
+            + serialize(next_cursor)
+            + b"}"
+        )
+
+
+class StatementIndex(TableIndex):
+    """
+    Pre-serialized dereferenced statements, additionally indexed by the genes, disease, therapies, biomarker types,
+    and strength of evidence that each statement is about.
+
+    Attributes:
+        filters (dict[str, dict[str, set[int]]]): For each filter, statement positions keyed by casefolded name
+            and by primary coding id.
+    """
+
+    FILTERS = ("gene", "disease", "therapy", "biomarker_type", "strength")
+
+    def __init__(self, records: list[dict]):
+        super().__init__(records)
+        self.filters = {name: {} for name in self.FILTERS}
+        for position, statement in enumerate(records):
+            entities = shards.statement_entities(statement)
+            for kind, key in (
+                ("genes", "gene"),
+                ("diseases", "disease"),
+                ("therapies", "therapy"),
+            ):
+                for coding_id, name in entities[kind].items():
+                    self._add(key, coding_id, position)
+                    self._add(key, name, position)
+            for biomarker in statement["proposition"].get("biomarkers", []):
+                for extension in biomarker.get("extensions", []):
+                    if extension["name"] == "biomarker_type":
+                        self._add("biomarker_type", extension["value"], position)
+            strength = statement.get("strength") or {}
+            if strength.get("name"):
+                self._add("strength", strength["name"], position)
+            if strength.get("primaryCoding"):
+                self._add("strength", strength["primaryCoding"]["id"], position)
+
+    def _add(self, name: str, value: str, position: int) -> None:
+        self.filters[name].setdefault(value.casefold(), set()).add(position)
+
+    def positions(self, **filters: str) -> set[int] | None:
+        """
+        Returns the positions of statements that match every given filter.
+
+        Args:
+            **filters (str): Values keyed by filter name, one of `FILTERS`. Values are names or primary coding ids,
+                compared case insensitively.
+
+        Returns:
+            set[int] | None: Matching statement positions, or None if no filter is given.
+
+        Raises:
+            KeyError: If a filter name is not one of `FILTERS`.
+        """
+        positions = None
+        for name, value in filters.items():
+            if name not in self.filters:
+                raise KeyError(name)
+            matches = self.filters[name].get(value.casefold(), set())
+            positions = matches if positions is None else positions & matches
+        return positions
+
+    def matching(self, **filters: str) -> list[str]:
+        """
+        Returns the ids of statements that match every given filter, in statement order.
+
+        Args:
+            **filters (str): Values keyed by filter name, one of `FILTERS`. Values are names or primary coding ids,
+                compared case insensitively.
+
+        Returns:
+            list[str]: Matching statement ids.
+
+        Raises:
+            KeyError: If a filter name is not one of `FILTERS`.
+        """
+        positions = self.positions(**filters)
+        if positions is None:
+            return list(self._order)
+        return [self._order[position] for position in sorted(positions)]
+
+
+class App:
+    """
+    A read-only JSON API over a dereferenced database, answering from pre-serialized, in-memory indexes.
+
+    Routes:
+        GET /                     about metadata and the list of routes
+        GET /about                about metadata
+        GET /statements           statements, filtered by `gene`, `disease`, `therapy`, `biomarker_type`, and
+                                  `strength` query parameters
+        GET /statements/{id}      one statement
+        GET /combinations         therapy combinations and their statements, found by the `therapies` they
+                                  include, `match`, `strategy`, and `type` query parameters
+        GET /{table}              records of a table, filtered by a `name` query parameter
+        GET /{table}/{id}         one record of a table
+
+    Listings are paged in stable id order when a `limit` or `cursor` query parameter is given: the response is an
+    object of `items` and a `next_cursor` to pass as `cursor` for the next page, which is null on the last page.
+
+    The same App can be served by the standard library, with `serve`, or by any ASGI server, since instances are
+    ASGI applications.
+
+    Attributes:
+        tables (dict[str, TableIndex]): Indexes for each table, keyed by table name.
+        about (Response): Response for the about metadata.
+        root (Response): Response for the root route.
+        therapy_index (therapy_index.TherapyIndex): Index of the statements by therapy and therapy combination.
+    """
+
+    def __init__(self, about: dict, db: dereference.Database, cache_size: int = 4096):
+        """
+        Serializes and indexes every table of a dereferenced database.
+
+        Args:
+            about (dict): Database metadata, from referenced/about.json.
+            db (dereference.Database): A Database whose tables have been dereferenced.
+            cache_size (int): Number of filtered list responses to keep.
+        """
+        self.tables = {}
+        for name, _ in dereference._CONCEPT_DIRS:
+            records = getattr(db, name).records
+            index = StatementIndex if name == "statements" else TableIndex
+            self.tables[name] = index(records)
+        self.therapy_index = db.statements.therapy_index or therapy_index.build(
+            db.statements.records
+        )
+        self.about = Response(body=serialize(about))
+        self.root = Response(
+            body=serialize(
+                {
+                    "about": about,
+                    "tables": {
+                        name: len(index.records) for name, index in self.tables.items()
+                    },
+                    "statement_filters": list(StatementIndex.FILTERS),
+                }
+            )
+        )
+        self.cache_size = cache_size
+        self._filtered = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_referenced(cls, directory: str = "referenced") -> "App":
+        """
+        Reads and dereferences the referenced JSON files in a directory, then indexes them.
+
+        Args:
+            directory (str): Path to the folder containing referenced JSON files (default: "referenced").
+
+        Returns:
+            App: The application.
+        """
+        input_paths = {
+            name: os.path.join(directory, f"{name}.json")
+            for name in read.REFERENCED_TABLES
+        }
+        db = dereference.load_database(input_paths)
+        for name in dereference.topological_order():
+            getattr(db, name).dereference(db)
+        about = read.json_records(file=os.path.join(directory, "about.json"))
+        return cls(about=about, db=db)
+
+    def get(self, path: str, query: str = "") -> tuple[int, Response]:
+        """
+        Routes a GET request.
+
+        Args:
+            path (str): The request path, such as `/genes/0`.
+            query (str): The query string, without the leading `?`.
+
+        Returns:
+            tuple[int, Response]: The HTTP status and the response.
+        """
+        segments = [segment for segment in path.split("/") if segment]
+        if not segments:
+            return 200, self.root
+        if segments == ["about"]:
+            return 200, self.about
+        if segments == ["combinations"]:
+            return self.combinations(query)
+        if segments[0] not in self.tables or len(segments) > 2:
+            return 404, error(f"Not found: {path}")
+        table = self.tables[segments[0]]
+        if len(segments) == 2:
+            record = table.records.get(urllib.parse.unquote(segments[1]))
+            if record is None:
+                return 404, error(f"No {segments[0]} record with id {segments[1]}")
+            return 200, record
+
+        parameters = dict(urllib.parse.parse_qsl(query))
+        paging = {
+            name: parameters.pop(name)
+            for name in ("cursor", "limit")
+            if name in parameters
+        }
+        if paging:
+            return self.page(segments[0], parameters, **paging)
+        if not parameters:
+            return 200, table.everything
+        key = (segments[0], tuple(sorted(parameters.items())))
+        response = self._filtered.get(key)
+        if response is not None:
+            return 200, response
+        if isinstance(table, StatementIndex):
+            try:
+                ids = table.matching(**parameters)
+            except KeyError as e:
+                return 400, error(f"Unknown filter {e.args[0]!r} for statements")
+            response = Response.from_parts([table.records[i].body for i in ids])
+        elif set(parameters) == {"name"}:
+            response = table.list(name=parameters["name"])
+        else:
+            return 400, error(f"{segments[0]} can only be filtered by name")
+        self._remember(key, response)
+        return 200, response
+
+    def _remember(self, key: tuple, response: Response) -> None:
+        with self._lock:
+            if len(self._filtered) >= self.cache_size:
+                self._filtered.pop(next(iter(self._filtered)))
+            self._filtered[key] = response
+
+    def combinations(self, query: str) -> tuple[int, Response]:
+        """
+        Answers a lookup of therapy combinations from the therapy index, such as every combination that includes
+        osimertinib. Responses are cached like filtered listings.
+
+        Args:
+            query (str): The query string, without the leading `?`. `therapies` is a comma separated list of
+                therapy ids or names, `match` is one of `therapy_index.TherapyIndex.MATCHES`, and `strategy` and
+                `type` further require a therapy with that therapy strategy or type.
+
+        Returns:
+            tuple[int, Response]: The HTTP status and the response.
+        """
+        parameters = dict(urllib.parse.parse_qsl(query))
+        unknown = set(parameters) - {"therapies", "match", "strategy", "type"}
+        if unknown:
+            return 400, error(f"Unknown parameter {min(unknown)!r} for combinations")
+        key = ("combinations", tuple(sorted(parameters.items())))
+        response = self._filtered.get(key)
+        if response is not None:
+            return 200, response
+        therapies = [
+            therapy.strip()
+            for therapy in parameters.get("therapies", "").split(",")
+            if therapy.strip()
+        ]
+        try:
+            rows = self.therapy_index.query(
+                therapies,
+                match=parameters.get("match", "includes"),
+                strategy=parameters.get("strategy"),
+                therapy_type=parameters.get("type"),
+            )
+        except KeyError as e:
+            return 404, error(e.args[0])
+        except ValueError as e:
+            return 400, error(str(e))
+        response = Response(body=serialize(rows))
+        self._remember(key, response)
+        return 200, response
+
+    def page(
+        self,
+        name: str,
+        filters: dict[str, str],
+        cursor: str | None = None,
+        limit: str | None = None,
+    ) -> tuple[int, Response]:
+        """
+        Answers a paged listing of a table. Pages are not cached, since each is only a slice of pre-serialized
+        records found by bisection into the sorted ranks that the table keeps for each filter.
+
+        Args:
+            name (str): Name of the table.
+            filters (dict[str, str]): Filters from the query string, other than `cursor` and `limit`.
+            cursor (str | None): The `next_cursor` of the previous page, or None for the first page.
+            limit (str | None): Maximum number of records in the page, as given in the query string.
+
+        Returns:
+            tuple[int, Response]: The HTTP status and the response.
+        """
+        table = self.tables[name]
+        try:
+            limit = pagination.DEFAULT_LIMIT if limit is None else int(limit)
+        except ValueError:
+            return 400, error(f"Limit must be an integer: {limit}")
+        try:
+            ranks = table.ranked(**filters)
+        except KeyError as e:
+            if isinstance(table, StatementIndex):
+                return 400, error(f"Unknown filter {e.args[0]!r} for statements")
+            return 400, error(f"{name} can only be filtered by name")
+        try:
+            return 200, table.page(cursor, limit=limit, ranks=ranks)
+        except ValueError as e:
+            return 400, error(str(e))
+
+    def respond(
+        self, method: str, path: str, query: str, headers: dict[str, str]
+    ) -> tuple[int, list[tuple[str, str]], bytes]:
+        """
+        Answers a request, applying conditional requests and content negotiation.
+
+        Args:
+            method (str): The HTTP method.
+            path (str): The request path.
+            query (str): The query string, without the leading `?`.
+            headers (dict[str, str]): Request headers, with lowercase names.
+
+        Returns:
+            tuple[int, list[tuple[str, str]], bytes]: The HTTP status, response headers, and body.
+        """
+        if method not in ("GET", "HEAD"):
+            status, response = 405, error(f"Method {method} not allowed")
+        else:
+            status, response = self.get(path, query)
+        response_headers = [
+            ("Content-Type", JSON),
+            ("ETag", response.etag),
+            ("Vary", "Accept-Encoding"),
+            ("Cache-Control", "public, max-age=0, must-revalidate"),
+        ]
+        tags = parse_etags(headers.get("if-none-match", ""))
+        # "*" matches any current representation
+        if status == 200 and ("*" in tags or response.etag in tags):
+            return 304, response_headers, b""
+
+        body = response.body
+        if len(body) >= GZIP_MIN_BYTES and accepts_gzip(
+            headers.get("accept-encoding", "")
+        ):
+            body = response.gzipped
+            response_headers.append(("Content-Encoding", "gzip"))
+        response_headers.append(("Content-Length", str(len(body))))
+        if method == "HEAD":
+            body = b""
+        return status, response_headers, body
+
+    async def __call__(self, scope, receive, send) -> None:
+        """
+        ASGI entry point.
+        """
+        if scope["type"] == "lifespan":
+            while True:
+                message = await receive()
+                if message["type"] == "lifespan.startup":
+                    await send({"type": "lifespan.startup.complete"})
+                elif message["type"] == "lifespan.shutdown":
+                    await send({"type": "lifespan.shutdown.complete"})
+                    return
+        if scope["type"] != "http":
+            return
+        headers = {
+            name.decode("latin-1").lower(): value.decode("latin-1")
+            for name, value in scope["headers"]
+        }
+        status, response_headers, body = self.respond(
+            scope["method"],
+            scope["path"],
+            scope.get("query_string", b"").decode("latin-1"),
+            headers,
+        )
+        await send(
+            {
+                "type": "http.response.start",
+                "status": status,
+                "headers": [
+                    (name.lower().encode("latin-1"), value.encode("latin-1"))
+                    for name, value in response_headers
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
+
+
+def error(message: str) -> Response:
+    """
+    Creates an error response.
+
+    Args:
+        message (str): Description of the error.
+
+    Returns:
+        Response: A JSON object with key `error`.
+    """
+    return Response(body=serialize({"error": message}))
+
+
+def parse_etags(value: str) -> set[str]:
+    """
+    Parses the entity tags of an If-None-Match header. Weak tags compare equal to their strong counterparts.
+
+    Args:
+        value (str): The header value.
+
+    Returns:
+        set[str]: Quoted entity tags, or {"*"}.
+    """
+    tags = set()
+    for tag in value.split(","):
+        tag = tag.strip()
+        tag = tag.removeprefix("W/")
+        if tag:
+            tags.add(tag)
+    return tags
+
+
+def accepts_gzip(value: str) -> bool:
+    """
+    Returns True if an Accept-Encoding header allows gzip.
+
+    Args:
+        value (str): The header value.
+
+    Returns:
+        bool: True if gzip, or else `*`, is listed with a quality above zero. A quality that is not a number counts
+            as zero.
+    """
+    qualities = {}
+    for coding in value.split(","):
+        name, *parameters = coding.split(";")
+        quality = 1.0
+        for parameter in parameters:
+            key, _, number = parameter.partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    quality = float(number)
+                except ValueError:
+                    quality = 0.0
+        qualities[name.strip().lower()] = quality
+    return qualities.get("gzip", qualities.get("*", 0.0)) > 0
+
+
+def handler(app: App) -> type[http.server.BaseHTTPRequestHandler]:
+    """
+    Creates a request handler class for the standard library HTTP server that answers with an App.
+
+    Args:
+        app (App): The application.
+
+    Returns:
+        type[http.server.BaseHTTPRequestHandler]: The handler class.
+    """
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        # HTTP/1.1 keeps connections alive between requests
+        protocol_version = "HTTP/1.1"
+        # Headers and body are sent in separate writes; without TCP_NODELAY each response waits on a delayed ACK
+        disable_nagle_algorithm = True
+        quiet = False
+
+        def _respond(self):
+            path, _, query = self.path.partition("?")
+            headers = {name.lower(): value for name, value in self.headers.items()}
+            status, response_headers, body = app.respond(
+                self.command, path, query, headers
+            )
+            self.send_response(status)
+            for name, value in response_headers:
+                self.send_header(name, value)
+            self.end_headers()
+            if body:
+                self.wfile.write(body)
+
+        do_GET = _respond
+        do_HEAD = _respond
+        do_POST = _respond
+        do_PUT = _respond
+        do_DELETE = _respond
+
+        def log_message(self, format, *args):
+            if not self.quiet:
+                super().log_message(format, *args)
+
+    return Handler
+
+
+def serve(
+    app: App, host: str = "127.0.0.1", port: int = 8000, quiet: bool = False
+) -> None:
+    """
+    Serves an App with the standard library's threading HTTP server until interrupted.
+
+    Args:
+        app (App): The application.
+        host (str): Address to listen on (default: "127.0.0.1").
+        port (int): Port to listen on (default: 8000).
+        quiet (bool): Suppress per-request log messages if True.
+    """
+    handler_class = handler(app)
+    handler_class.quiet = quiet
+    server = http.server.ThreadingHTTPServer((host, port), handler_class)
+    server.daemon_threads = True
+    print(f"Serving on http://{host}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(
+        prog="server",
+        description="serves the dereferenced moalmanac db as a read-only JSON API.",
+    )
+    arg_parser.add_argument(
+        "--referenced",
+        help="directory of referenced json files to dereference and serve",
+        default="referenced",
+    )
+    arg_parser.add_argument(
+        "--host",
+        help="address to listen on",
+        default="127.0.0.1",
+    )
+    arg_parser.add_argument(
+        "--port",
+        type=int,
+        help="port to listen on",
+        default=8000,
+    )
+    arg_parser.add_argument(
+        "--quiet",
+        action="store_true",
+        help="suppress per-request log messages",
+    )
+    args = arg_parser.parse_args()
+
+    serve(
+        App.from_referenced(args.referenced),
+        host=args.host,
+        port=args.port,
+        quiet=args.quiet,
+    )
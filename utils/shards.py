@@ -0,0 +1,153 @@
+import argparse
+import hashlib
+import json
+import os
+
+# Local imports
+from utils import read
+from utils import write
+
+
+def therapies_of(therapeutic: dict) -> list[dict]:
+    """
+    Returns the therapies of a dereferenced `objectTherapeutic`, which is either a therapy or a therapy group.
+
+    Args:
+        therapeutic (dict): A dereferenced therapy or therapy group record.
+
+    Returns:
+        list[dict]: The therapy itself, or the therapies within the therapy group.
+    """
+    if "therapies" in therapeutic:
+        return therapeutic["therapies"]
+    return [therapeutic]
+
+
+def statement_entities(statement: dict) -> dict[str, dict[str, str]]:
+    """
+    Returns the genes, disease, and therapies that a dereferenced statement is about, keyed by primary coding id.
+
+    Args:
+        statement (dict): A dereferenced statement record.
+
+    Returns:
+        dict[str, dict[str, str]]: Dictionary with keys `genes`, `diseases`, and `therapies`, each mapping the
+            primary coding id of an entity to its name.
+    """
+    proposition = statement["proposition"]
+    genes = {}
+    for biomarker in proposition.get("biomarkers", []):
+        for gene in biomarker.get("genes", []):
+            genes[gene["primaryCoding"]["id"]] = gene["name"]
+    disease = proposition["conditionQualifier"]
+    therapies = {
+        therapy["primaryCoding"]["id"]: therapy["name"]
+        for therapy in therapies_of(proposition["objectTherapeutic"])
+    }
+    return {
+        "genes": genes,
+        "diseases": {disease["primaryCoding"]["id"]: disease["name"]},
+        "therapies": therapies,
+    }
+
+
+def shard_filename(key: str) -> str:
+    """
+    Returns a portable file name for a shard key, such as `hgnc_1097.json` for `hgnc:1097`.
+
+    Args:
+        key (str): A primary coding id.
+
+    Returns:
+        str: The file name.
+    """
+    return "".join(c if c.isalnum() or c in "-._" else "_" for c in key) + ".json"
+
+
+def write_shards(statements: list[dict], output_dir: str, quiet: bool = False) -> dict:
+    """
+    Groups dereferenced statements into shard files by gene, disease, and therapy, and writes an index of them.
+
+    Statements are grouped in one pass and each statement is serialized once, however many shards contain it. Shards
+    are written to `<output_dir>/<genes|diseases|therapies>/<primary coding id>.json` as compact JSON lists of
+    statements, ordered as in `statements`. Shard files left by a previous run for entities that no longer have any
+    statements are removed. The index, `<output_dir>/index.json`, lists each shard's name, file, number of statements,
+    size in bytes, and SHA-256 checksum.
+
+    Args:
+        statements (list[dict]): Dereferenced statement records.
+        output_dir (str): Directory to write shards and the index into.
+        quiet (bool): Suppress print statements if True.
+
+    Returns:
+        dict: The index that was written to `index.json`.
+    """
+    groups = {"genes": {}, "diseases": {}, "therapies": {}}
+    names = {"genes": {}, "diseases": {}, "therapies": {}}
+    serialized = []
+    for position, statement in enumerate(statements):
+        serialized.append(json.dumps(statement, separators=(",", ":")))
+        for kind, entities in statement_entities(statement).items():
+            for key, name in entities.items():
+                groups[kind].setdefault(key, []).append(position)
+                names[kind][key] = name
+
+    index = {}
+    for kind, shards in groups.items():
+        directory = os.path.join(output_dir, kind)
+        os.makedirs(directory, exist_ok=True)
+        index[kind] = {}
+        for key in sorted(shards):
+            content = (
+                "[" + ",".join(serialized[p] for p in shards[key]) + "]"
+            ).encode()
+            filename = shard_filename(key)
+            with open(os.path.join(directory, filename), "wb") as fp:
+                fp.write(content)
+            index[kind][key] = {
+                "name": names[kind][key],
+                "file": f"{kind}/{filename}",
+                "statements": len(shards[key]),
+                "bytes": len(content),
+                "sha256": hashlib.sha256(content).hexdigest(),
+            }
+        written = {shard_filename(key) for key in shards}
+        for filename in os.listdir(directory):
+            if filename.endswith(".json") and filename not in written:
+                os.remove(os.path.join(directory, filename))
+        if not quiet:
+            print(f"{len(shards)} {kind} shards written to {directory}")
+
+    write.dictionary(
+        data=index,
+        keys_list=[],
+        file=os.path.join(output_dir, "index.json"),
+        quiet=quiet,
+    )
+    return index
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(
+        prog="shards",
+        description="writes per-gene, per-disease, and per-therapy bundles of dereferenced moalmanac db statements.",
+    )
+    arg_parser.add_argument(
+        "--input",
+        help="dereferenced json file, as written by utils.dereference",
+        default="moalmanac-draft.dereferenced.json",
+    )
+    arg_parser.add_argument(
+        "--output",
+        help="directory to write shards into",
+        default="shards",
+    )
+    arg_parser.add_argument(
+        "--quiet",
+        action="store_true",
+        help="suppress print messages",
+    )
+    args = arg_parser.parse_args()
+
+    dereferenced = read.json_records(file=args.input)
+    write_shards(dereferenced["content"], output_dir=args.output, quiet=args.quiet)
@@ -0,0 +1,433 @@
+import argparse
+import collections
+import dataclasses
+import functools
+import gzip
+import os
+import re
+import string
+
+# Local imports
+from utils import read
+
+SPELLING_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "spelling"
+)
+# English word list shipped with the repository, and allowed project terms: drugs, genes, agencies, and the like
+WORD_LIST = os.path.join(SPELLING_DIR, "words.txt.gz")
+ALLOWLIST = os.path.join(SPELLING_DIR, "allowlist.txt")
+
+# Word lists searched, in order, when none is given
+WORD_LISTS = [WORD_LIST, "/usr/share/dict/words", "/usr/dict/words"]
+
+# Keys of curated string fields that are checked, wherever they appear within a record
+CHECKED_KEYS = {"description", "indication", "name"}
+
+URL = re.compile(r"(?:https?://|www\.)\S+")
+WORD = re.compile(r"[A-Za-z0-9]+(?:'[A-Za-z]+)?")
+CHECKED_WORD = re.compile(r"[A-Za-z][a-z]{2,}")
+
+# Letters inserted and substituted when generating edits of an unknown word
+LETTERS = string.ascii_lowercase
+
+
+@functools.cache
+def _normalize(token: str) -> str | None:
+    token = token.removesuffix("'s")
+    if CHECKED_WORD.fullmatch(token) is None:
+        return None
+    return token.lower()
+
+
+@functools.lru_cache(maxsize=65536)
+def _words_of(text: str) -> tuple[str, ...]:
+    return tuple(words_of(text))
+
+
+def words_of(text: str) -> list[str]:
+    """
+    Returns the words of a string that are spellchecked, lowercased. Words with digits (`NCT03155997`), acronyms
+    (`FDA`), words with capitals after the first letter (`monarchE`), words shorter than three letters, and URLs
+    are skipped; possessive `'s` is removed.
+
+    Args:
+        text (str): The text to split.
+
+    Returns:
+        list[str]: The words to check.
+    """
+    words = []
+    for token in WORD.findall(URL.sub(" ", text)):
+        word = _normalize(token)
+        if word is not None:
+            words.append(word)
+    return words
+
+
+def curated_strings(record, key: str | None = None):
+    """
+    Yields the curated string fields of a record, with their paths, descending into lists and dictionaries such as
+    extensions.
+
+    Args:
+        record: A record, or a value within one.
+        key (str | None): Key of `record` within its parent.
+
+    Yields:
+        tuple[str, str]: Path of the field, such as `extensions[0].description`, and its value.
+    """
+    if isinstance(record, dict):
+        for child_key, value in record.items():
+            for path, text in curated_strings(value, child_key):
+                yield (f"{child_key}.{path}" if path else child_key), text
+    elif isinstance(record, list):
+        for i, value in enumerate(record):
+            for path, text in curated_strings(value, key):
+                yield (f"[{i}].{path}" if path else f"[{i}]").replace(".[", "["), text
+    elif isinstance(record, str) and key in CHECKED_KEYS:
+        yield "", record
+
+
+@dataclasses.dataclass
+class Misspelling:
+    """
+    A word that is not in the dictionary.
+
+    Attributes:
+        table (str): Table of the record.
+        record_id: Id of the record.
+        path (str): Path of the field within the record.
+        word (str): The unknown word, lowercased.
+        suggestions (list[str]): Known words within the maximum edit distance, closest and most frequent first.
+    """
+
+    table: str
+    record_id: object
+    path: str
+    word: str
+    suggestions: list[str]
+
+
+class SpellChecker:
+    """
+    A dictionary based spellchecker that suggests corrections by generating edits of an unknown word.
+
+    Known words are kept in a set, so checking a word is one lookup. Suggestions are found by generating every
+    deletion, transposition, substitution, and insertion of an unknown word, about 54 per letter, and keeping those
+    that are known words; for a larger maximum edit distance, edits of those edits are generated too. Nothing is
+    built ahead of the first suggestion, so checking text with a few errors costs little more than checking text
+    without any.
+
+    Attributes:
+        words (collections.Counter): Known words and their frequency, used to rank suggestions.
+        max_distance (int): Maximum edit distance of suggestions. Each additional edit multiplies the number of
+            candidates by about 54 times the word's length, so distances above 1 take a fraction of a second per
+            unknown word.
+    """
+
+    def __init__(self, words: collections.Counter, max_distance: int = 1):
+        """
+        Initializes the spellchecker.
+
+        Args:
+            words (collections.Counter): Known words and their frequency, lowercased.
+            max_distance (int): Maximum edit distance of suggestions.
+        """
+        self.words = words
+        self.max_distance = max_distance
+
+    @classmethod
+    def from_tables(
+        cls,
+        data: dict[str, list[dict]],
+        word_lists: list[str] | None = None,
+        allowlists: list[str] | None = None,
+        min_count: int = 5,
+        **kwargs,
+    ) -> "SpellChecker":
+        """
+        Creates a spellchecker whose dictionary is a word list, the project terms harvested by `project_terms`, and
+        any allowlist files. Frequencies of words in the curated text are used to rank suggestions.
+
+        Without a word list, words that occur at least `min_count` times in the curated text are treated as known
+        instead, so that rare variants of common words are still found.
+
+        Args:
+            data (dict[str, list[dict]]): Referenced records keyed by table name.
+            word_lists (list[str] | None): Paths of word lists, one word per line.
+            allowlists (list[str] | None): Paths of additional allowed words, one per line.
+            min_count (int): Without a word list, minimum frequency of a known word in the curated text.
+            **kwargs: Passed to SpellChecker.
+
+        Returns:
+            SpellChecker: The spellchecker.
+        """
+        corpus = collections.Counter()
+        for records in data.values():
+            for record in records:
+                for _, text in curated_strings(record):
+                    corpus.update(_words_of(text))
+
+        words = collections.Counter()
+        for path in (word_lists or []) + (allowlists or []):
+            words.update(read_word_list(path))
+        words.update(project_terms(data))
+        if not word_lists:
+            words.update({word for word, count in corpus.items() if count >= min_count})
+        for word in words:
+            words[word] += corpus.get(word, 0)
+        return cls(words, **kwargs)
+
+    @staticmethod
+    def _edits(word: str) -> set[str]:
+        splits = [(word[:i], word[i:]) for i in range(len(word) + 1)]
+        edits = {left + right[1:] for left, right in splits if right}
+        edits.update(
+            left + right[1] + right[0] + right[2:]
+            for left, right in splits
+            if len(right) > 1
+        )
+        edits.update(
+            left + letter + right[1:]
+            for left, right in splits
+            if right
+            for letter in LETTERS
+        )
+        edits.update(
+            left + letter + right for left, right in splits for letter in LETTERS
+        )
+        return edits
+
+    def known(self, word: str) -> bool:
+        """
+        Returns True if a word is in the dictionary.
+
+        Args:
+            word (str): The word, lowercased.
+
+        Returns:
+            bool: True if known.
+        """
+        return word in self.words
+
+    def suggest(self, word: str, limit: int = 3) -> list[str]:
+        """
+        Returns known words within the maximum edit distance of a word.
+
+        Args:
+            word (str): The word, lowercased.
+            limit (int): Maximum number of suggestions.
+
+        Returns:
+            list[str]: Suggestions, closest first and then most frequent first.
+        """
+        distances = {}
+        candidates = {word}
+        for distance in range(1, self.max_distance + 1):
+            candidates = {
+                edit for candidate in candidates for edit in self._edits(candidate)
+            }
+            for candidate in candidates:
+                if candidate in self.words and candidate not in distances:
+                    distances[candidate] = distance
+        distances.pop(word, None)
+        scored = [
+            (distance, -self.words[candidate], candidate)
+            for candidate, distance in distances.items()
+        ]
+        return [candidate for _, _, candidate in sorted(scored)[:limit]]
+
+    def check_tables(
+        self, data: dict[str, list[dict]], suggestions: bool = True
+    ) -> list[Misspelling]:
+        """
+        Checks the curated string fields of every record: names, descriptions, indications, and the descriptions of
+        extensions.
+
+        Args:
+            data (dict[str, list[dict]]): Referenced records keyed by table name.
+            suggestions (bool): If True, suggest corrections for each unknown word.
+
+        Returns:
+            list[Misspelling]: Unknown words, in table and record order.
+        """
+        misspellings = []
+        cache = {}
+        for table, records in data.items():
+            for record in records:
+                for path, text in curated_strings(record):
+                    for word in _words_of(text):
+                        if self.known(word):
+                            continue
+                        if word not in cache:
+                            cache[word] = self.suggest(word) if suggestions else []
+                        misspellings.append(
+                            Misspelling(
+                                table, record.get("id"), path, word, cache[word]
+                            )
+                        )
+        return misspellings
+
+
+def read_word_list(path: str) -> set[str]:
+    """
+    Reads a word list with one word per line, lowercased, which may be gzip compressed. Possessive entries, such as
+    `Alzheimer's`, and comment lines starting with `#` are skipped.
+
+    Args:
+        path (str): Path to the word list.
+
+    Returns:
+        set[str]: The words.
+    """
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rt", encoding="utf-8", errors="ignore") as fp:
+        lines = fp.read().lower().split("\n")
+    return {
+        word
+        for word in map(str.strip, lines)
+        if word and not word.startswith("#") and not word.endswith("'s")
+    }
+
+
+def find_word_list() -> str | None:
+    """
+    Returns the path of the first word list in `WORD_LISTS` that exists: the repository's own, or else a system
+    word list.
+
+    Returns:
+        str | None: The path, or None if no word list is installed.
+    """
+    for path in WORD_LISTS:
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def project_terms(data: dict[str, list[dict]]) -> set[str]:
+    """
+    Harvests words that are correct by definition from the names of therapies, genes, and documents, as well as
+    the drug names, companies, and titles of documents.
+
+    Args:
+        data (dict[str, list[dict]]): Referenced records keyed by table name.
+
+    Returns:
+        set[str]: The words, lowercased.
+    """
+    terms = set()
+
+    def add(value):
+        if isinstance(value, str):
+            terms.update(words_of(value))
+        elif isinstance(value, list):
+            for item in value:
+                add(item)
+
+    for therapy in data.get("therapies", []):
+        add(therapy.get("name"))
+        for extension in therapy.get("extensions", []):
+            if extension["name"] == "therapy_strategy":
+                add(extension["value"])
+    for gene in data.get("genes", []):
+        add(gene.get("name"))
+    for document in data.get("documents", []):
+        for key in (
+            "name",
+            "title",
+            "aliases",
+            "company",
+            "drug_name_brand",
+            "drug_name_generic",
+        ):
+            add(document.get(key))
+    return terms
+
+
+def report(misspellings: list[Misspelling]) -> str:
+    """
+    Formats misspellings, grouped by word, with where each occurs and suggested corrections.
+
+    Args:
+        misspellings (list[Misspelling]): Misspellings returned by `SpellChecker.check_tables`.
+
+    Returns:
+        str: One line per unknown word.
+    """
+    by_word = {}
+    for misspelling in misspellings:
+        by_word.setdefault(misspelling.word, []).append(misspelling)
+    lines = []
+    for word, occurrences in sorted(by_word.items()):
+        places = ", ".join(f"{m.table}:{m.record_id}:{m.path}" for m in occurrences[:5])
+        if len(occurrences) > 5:
+            places += f", and {len(occurrences) - 5} more"
+        suggestions = occurrences[0].suggestions
+        hint = f" (did you mean {', '.join(suggestions)}?)" if suggestions else ""
+        lines.append(f"{word}{hint}: {places}")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(
+        prog="spellcheck",
+        description="spellchecks names, descriptions, and indications of referenced moalmanac db records.",
+    )
+    arg_parser.add_argument(
+        "--referenced",
+        help="directory of referenced json files",
+        default="referenced",
+    )
+    arg_parser.add_argument(
+        "--words",
+        action="append",
+        help="word list, one word per line; repeat for several. Default: spelling/words.txt.gz",
+    )
+    arg_parser.add_argument(
+        "--allowlist",
+        action="append",
+        help="file of additional allowed words, one per line, besides spelling/allowlist.txt; repeat for several",
+    )
+    arg_parser.add_argument(
+        "--min-count",
+        type=int,
+        default=5,
+        help="without a word list, minimum number of occurrences for a word to be known. Default: 5",
+    )
+    arg_parser.add_argument(
+        "--max-distance",
+        type=int,
+        default=1,
+        help="maximum edit distance of suggestions; 2 takes a fraction of a second per unknown word. Default: 1",
+    )
+    arg_parser.add_argument(
+        "--suggested-only",
+        action="store_true",
+        help="only report unknown words that have a suggested correction",
+    )
+    args = arg_parser.parse_args()
+
+    word_lists = args.words
+    if word_lists is None:
+        found = find_word_list()
+        word_lists = [found] if found else []
+        if not found:
+            print(
+                f"No word list found; treating words seen at least {args.min_count} times as known."
+            )
+
+    data = read.referenced(args.referenced)
+    checker = SpellChecker.from_tables(
+        data,
+        word_lists=word_lists,
+        allowlists=[ALLOWLIST, *(args.allowlist or [])],
+        min_count=args.min_count,
+        max_distance=args.max_distance,
+    )
+    found_misspellings = checker.check_tables(data)
+    if args.suggested_only:
+        found_misspellings = [m for m in found_misspellings if m.suggestions]
+    if found_misspellings:
+        print(report(found_misspellings))
+        raise SystemExit(1)
+    print("No misspellings found.")
@@ -0,0 +1,178 @@
+import argparse
+import collections
+
+# Local imports
+from utils import read
+from utils import shards
+from utils import write
+
+
+def extension_value(record: dict, name: str):
+    """
+    Returns the value of a named extension of a dereferenced record.
+
+    Args:
+        record (dict): A dereferenced record with an `extensions` list.
+        name (str): Name of the extension.
+
+    Returns:
+        The extension's value, or None if the record has no such extension.
+    """
+    for extension in record.get("extensions") or []:
+        if extension["name"] == name:
+            return extension["value"]
+    return None
+
+
+class StatementStats:
+    """
+    Accumulates summary statistics over dereferenced statements, one statement at a time, so that they can be
+    computed in the same loop that resolves the Statements table.
+
+    Attributes:
+        statements (int): Number of statements added.
+        biomarkers (set): Ids of molecular features referenced by statements.
+        diseases (set): Primary coding ids of cancer types referenced by statements.
+        strengths (collections.Counter): Statements per evidence level.
+        therapies (set): Primary coding ids of therapies referenced by statements.
+        documents (set): Ids of documents cited by statements.
+        genes (collections.Counter): Statements per gene.
+        agents (collections.Counter): Statements per agent that published a cited document.
+        therapy_types (collections.Counter): Statements per therapy type.
+        gene_disease (dict[str, collections.Counter]): Statements per disease, for each gene.
+        agent_year (dict[str, collections.Counter]): Statements per year of publication, for each agent.
+    """
+
+    def __init__(self):
+        self.statements = 0
+        self.biomarkers = set()
+        self.diseases = set()
+        self.strengths = collections.Counter()
+        self.therapies = set()
+        self.documents = set()
+        self.genes = collections.Counter()
+        self.agents = collections.Counter()
+        self.therapy_types = collections.Counter()
+        self.gene_disease = collections.defaultdict(collections.Counter)
+        self.agent_year = collections.defaultdict(collections.Counter)
+
+    def add(self, statement: dict) -> None:
+        """
+        Adds one dereferenced statement to the statistics.
+
+        Args:
+            statement (dict): A dereferenced statement record.
+        """
+        self.statements += 1
+        proposition = statement["proposition"]
+        entities = shards.statement_entities(statement)
+        genes = set(entities["genes"].values())
+        diseases = set(entities["diseases"].values())
+
+        self.biomarkers.update(
+            biomarker["id"] for biomarker in proposition.get("biomarkers", [])
+        )
+        self.diseases.update(entities["diseases"])
+        self.therapies.update(entities["therapies"])
+        strength = statement.get("strength") or {}
+        if strength.get("name"):
+            self.strengths[strength["name"]] += 1
+
+        self.genes.update(genes)
+        for gene in genes:
+            self.gene_disease[gene].update(diseases)
+
+        therapy_types = {
+            extension_value(therapy, "therapy_type")
+            for therapy in shards.therapies_of(proposition["objectTherapeutic"])
+        }
+        self.therapy_types.update(t for t in therapy_types if t)
+
+        agents = set()
+        years = collections.defaultdict(set)
+        for document in statement.get("reportedIn") or []:
+            self.documents.add(document["id"])
+            agent = extension_value(document, "agent")
+            if not agent:
+                continue
+            agents.add(agent["name"])
+            date = extension_value(document, "publication_date")
+            if date:
+                years[agent["name"]].add(date[:4])
+        self.agents.update(agents)
+        for agent, agent_years in years.items():
+            self.agent_year[agent].update(agent_years)
+
+    def to_dict(self) -> dict:
+        """
+        Returns the statistics as a JSON serializable dictionary, with counts sorted by key.
+
+        Returns:
+            dict: Dictionary with keys `totals`, `evidence_levels`, `genes`, `agents`, `therapy_types`,
+                `gene_disease`, and `agent_year`.
+        """
+
+        def counts(counter):
+            return dict(sorted(counter.items()))
+
+        return {
+            "totals": {
+                "statements": self.statements,
+                "molecular_features": len(self.biomarkers),
+                "cancer_types": len(self.diseases),
+                "evidence_levels": len(self.strengths),
+                "therapies": len(self.therapies),
+                "documents": len(self.documents),
+                "genes": len(self.genes),
+            },
+            "evidence_levels": counts(self.strengths),
+            "genes": counts(self.genes),
+            "agents": counts(self.agents),
+            "therapy_types": counts(self.therapy_types),
+            "gene_disease": {
+                gene: counts(diseases)
+                for gene, diseases in sorted(self.gene_disease.items())
+            },
+            "agent_year": {
+                agent: counts(years) for agent, years in sorted(self.agent_year.items())
+            },
+        }
+
+
+def summarize(statements: list[dict]) -> dict:
+    """
+    Computes summary statistics over dereferenced statements.
+
+    Args:
+        statements (list[dict]): Dereferenced statement records.
+
+    Returns:
+        dict: The statistics, as returned by `StatementStats.to_dict`.
+    """
+    stats = StatementStats()
+    for statement in statements:
+        stats.add(statement)
+    return stats.to_dict()
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(
+        prog="stats",
+        description="computes summary statistics of dereferenced moalmanac db statements.",
+    )
+    arg_parser.add_argument(
+        "--input",
+        help="dereferenced json file, as written by utils.dereference",
+        default="moalmanac-draft.dereferenced.json",
+    )
+    arg_parser.add_argument(
+        "--output",
+        help="json file to write statistics to",
+        default="stats.json",
+    )
+    args = arg_parser.parse_args()
+
+    dereferenced = read.json_records(file=args.input)
+    write.dictionary(
+        data=summarize(dereferenced["content"]), keys_list=[], file=args.output
+    )
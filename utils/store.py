@@ -0,0 +1,252 @@
+from __future__ import annotations
+
+import argparse
+import os
+import typing
+
+# Local imports
+from utils import dereference
+from utils import read
+
+if typing.TYPE_CHECKING:
+    from utils.cache import BuildCache
+
+
+def _token(value) -> tuple:
+    """
+    Returns what identifies an interned value within the key of its parent: its type, so that `1`, `1.0`, and `True`
+    are not confused, and its identity for dictionaries and lists, which are interned before their parent, or its
+    value for anything else.
+    """
+    if isinstance(value, (dict, list)):
+        return type(value), id(value)
+    return type(value), value
+
+
+class ReleaseStore:
+    """
+    An in-memory store of several dereferenced releases of the database that shares every identical record, and
+    every identical nested object, between releases.
+
+    Records are hash consed as each release is added: a dictionary or list is keyed by its contents, where nested
+    dictionaries and lists, having been interned first, are represented by their identity, so each key is computed
+    in one pass over the release. Strings are interned as well. Tables whose records are all unchanged share one
+    table object. Memory therefore grows with the records that differ between releases, not with the number of
+    releases.
+
+    Views returned by `db_at` share their records with other releases and must be treated as read only. The
+    `summary`, `therapy_index`, and `rankings` of their statements are rebuilt from the shared records, once per
+    shared table.
+
+    Attributes:
+        about (dict[str, dict]): Database metadata of each release, from its about.json.
+    """
+
+    def __init__(self):
+        self.about = {}
+        self._releases = {}
+        self._nodes = {}
+        self._strings = {}
+        self._tables = {}
+
+    def __contains__(self, release: str) -> bool:
+        return release in self._releases
+
+    def __len__(self) -> int:
+        return len(self._releases)
+
+    def releases(self) -> list[str]:
+        """
+        Returns the names of the releases in the store, in the order they were added.
+        """
+        return list(self._releases)
+
+    def db_at(self, release: str) -> dereference.Database:
+        """
+        Returns the dereferenced database of a release.
+
+        Args:
+            release (str): Name of the release.
+
+        Returns:
+            dereference.Database: The release's resolved tables.
+
+        Raises:
+            KeyError: If the release is not in the store.
+        """
+        if release not in self._releases:
+            raise KeyError(f"Release not found: {release}")
+        return self._releases[release]
+
+    def add_directory(
+        self, release: str, directory: str, cache: BuildCache | None = None
+    ) -> dereference.Database:
+        """
+        Reads and dereferences a release from a directory of referenced JSON files, and adds it to the store.
+
+        Args:
+            release (str): Name of the release, such as its version.
+            directory (str): Folder containing the release's referenced JSON files and about.json.
+            cache (BuildCache | None): An instance of utils.cache.BuildCache to load resolved tables from, or None.
+
+        Returns:
+            dereference.Database: The release's view, as returned by `db_at`.
+        """
+        input_paths = {
+            name: os.path.join(directory, f"{name}.json")
+            for name in dereference.TABLE_CLASSES
+        }
+        db = dereference.load_database(input_paths, cache=cache)
+        for name in dereference.topological_order():
+            getattr(db, name).dereference(db)
+        about = read.json_records(file=os.path.join(directory, "about.json"))
+        return self.add(release, db, about=about)
+
+    def add(
+        self, release: str, db: dereference.Database, about: dict | None = None
+    ) -> dereference.Database:
+        """
+        Adds a dereferenced database to the store as a release. The records of `db` are interned in place, so `db`
+        must not be used afterwards except through `db_at`.
+
+        Args:
+            release (str): Name of the release.
+            db (dereference.Database): A database whose tables have all been dereferenced.
+            about (dict | None): Database metadata of the release.
+
+        Returns:
+            dereference.Database: The release's view, as returned by `db_at`.
+
+        Raises:
+            ValueError: If the store already has a release of this name, or a table of `db` is not dereferenced.
+        """
+        if release in self._releases:
+            raise ValueError(f"Release already in store: {release}")
+        for name in dereference.TABLE_CLASSES:
+            if not getattr(db, name)._resolved:
+                raise ValueError(
+                    f"Table {name} of release {release} has not been dereferenced."
+                )
+        self._releases[release] = self._intern_database(db, seen={})
+        self.about[release] = about
+        return self._releases[release]
+
+    def remove(self, release: str) -> None:
+        """
+        Removes a release from the store and releases the records that no other release shares.
+
+        Args:
+            release (str): Name of the release.
+
+        Raises:
+            KeyError: If the release is not in the store.
+        """
+        if release not in self._releases:
+            raise KeyError(f"Release not found: {release}")
+        del self._releases[release]
+        del self.about[release]
+        # Re-intern the remaining releases into empty tables; their nodes are already shared, so they are kept as-is
+        self._nodes = {}
+        self._strings = {}
+        self._tables = {}
+        seen = {}
+        for name, db in self._releases.items():
+            self._releases[name] = self._intern_database(db, seen)
+
+    def stats(self) -> dict:
+        """
+        Returns counts that describe how much of the store is shared between releases.
+
+        Returns:
+            dict: Dictionary with keys `releases`, `records` (summed over releases), `unique_records`, `objects`
+                (unique dictionaries and lists, including nested ones), `strings`, and `tables` (unique table objects).
+        """
+        records = 0
+        unique = set()
+        for db in self._releases.values():
+            for name in dereference.TABLE_CLASSES:
+                table = getattr(db, name)
+                records += len(table.records)
+                unique.update(id(record) for record in table.records)
+        return {
+            "releases": len(self._releases),
+            "records": records,
+            "unique_records": len(unique),
+            "objects": len(self._nodes),
+            "strings": len(self._strings),
+            "tables": len(self._tables),
+        }
+
+    def _intern_database(
+        self, db: dereference.Database, seen: dict
+    ) -> dereference.Database:
+        tables = {}
+        for name, table_class in dereference.TABLE_CLASSES.items():
+            table = getattr(db, name)
+            records = [self._intern(record, seen) for record in table.records]
+            key = (name, tuple(id(record) for record in records))
+            if key not in self._tables:
+                shared = table_class(records=records)
+                shared._resolved = True
+                if isinstance(shared, dereference.Statements):
+                    shared.build_indexes()
+                self._tables[key] = shared
+            tables[name] = self._tables[key]
+        return dereference.Database(**tables)
+
+    def _intern(self, value, seen: dict):
+        """
+        Returns the shared instance of a value, replacing the nested values of dictionaries and lists with their shared
+        instances in place. `seen` maps the identity of values already interned during this pass to their shared
+        instance, so objects referenced from several records are only visited once.
+        """
+        if isinstance(value, str):
+            return self._strings.setdefault(value, value)
+        if not isinstance(value, (dict, list)):
+            return value
+        if id(value) in seen:
+            return seen[id(value)][1]
+        if isinstance(value, dict):
+            for k, v in value.items():
+                interned = self._intern(v, seen)
+                if interned is not v:
+                    value[k] = interned
+            key = [dict]
+            for k, v in value.items():
+                key.append(k)
+                key.extend(_token(v))
+        else:
+            for i, v in enumerate(value):
+                interned = self._intern(v, seen)
+                if interned is not v:
+                    value[i] = interned
+            key = [list]
+            for v in value:
+                key.extend(_token(v))
+        shared = self._nodes.setdefault(tuple(key), value)
+        # The original is kept alive for the rest of the pass, so that its identity is not reused by another object
+        seen[id(value)] = (value, shared)
+        return shared
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(
+        prog="store",
+        description="loads several releases of moalmanac db into one store and reports how much they share.",
+    )
+    arg_parser.add_argument(
+        "releases",
+        nargs="+",
+        metavar="RELEASE=DIRECTORY",
+        help="name of a release and the directory of its referenced json files, such as draft=referenced",
+    )
+    args = arg_parser.parse_args()
+
+    store = ReleaseStore()
+    for argument in args.releases:
+        name, separator, path = argument.partition("=")
+        if not separator:
+            arg_parser.error(f"expected RELEASE=DIRECTORY, got {argument}")
+        store.add_directory(name, path)
+    for name, value in store.stats().items():
+        print(f"{name}: {value:,}")
@@ -0,0 +1,342 @@
+import argparse
+import collections
+import json
+
+# Local imports
+from utils import read
+from utils import shards
+from utils import stats
+
+
+class TherapyIndex:
+    """
+    Indexes dereferenced statements by the therapies of their propositions, one statement at a time, so that it can
+    be built in the same loop that resolves the Statements table.
+
+    Each proposition's `objectTherapeutic`, a therapy or a therapy group, is reduced to its combination: the
+    frozenset of the ids of its therapies. Every lookup by therapy, by exact combination, or by therapy strategy or
+    type is then a dictionary lookup, and subset and superset queries only visit the combinations of the therapies
+    queried.
+
+    Attributes:
+        therapies (dict[int, dict]): Id, name, `therapy_strategy`, and `therapy_type` of each therapy, by id.
+        names (dict[str, int]): Therapy ids keyed by their case folded name.
+        combinations (dict[int, set[frozenset[int]]]): Combinations that each therapy appears in, alone or with
+            others.
+        groups (dict[int, set[int]]): Ids of the therapy groups that contain each therapy.
+        propositions (dict[frozenset[int], set[int]]): Proposition ids of each combination.
+        statements (dict[frozenset[int], list[int]]): Statement ids of each combination, in the order added.
+        by_therapy (dict[int, list[int]]): Statement ids in which each therapy appears, alone or in combination.
+        by_strategy (dict[str, set[int]]): Therapy ids keyed by case folded therapy strategy.
+        by_type (dict[str, set[int]]): Therapy ids keyed by case folded therapy type.
+    """
+
+    MATCHES = ("includes", "exact", "subset")
+
+    def __init__(self):
+        self.therapies = {}
+        self.names = {}
+        self.combinations = collections.defaultdict(set)
+        self.groups = collections.defaultdict(set)
+        self.propositions = collections.defaultdict(set)
+        self.statements = collections.defaultdict(list)
+        self.by_therapy = collections.defaultdict(list)
+        self.by_strategy = collections.defaultdict(set)
+        self.by_type = collections.defaultdict(set)
+
+    def add(self, statement: dict) -> None:
+        """
+        Adds one dereferenced statement to the index.
+
+        Args:
+            statement (dict): A dereferenced statement record.
+        """
+        proposition = statement["proposition"]
+        therapeutic = proposition["objectTherapeutic"]
+        therapies = shards.therapies_of(therapeutic)
+        combination = frozenset(therapy["id"] for therapy in therapies)
+
+        for therapy in therapies:
+            if therapy["id"] not in self.therapies:
+                self._add_therapy(therapy)
+            self.combinations[therapy["id"]].add(combination)
+            self.by_therapy[therapy["id"]].append(statement["id"])
+            if "therapies" in therapeutic:
+                self.groups[therapy["id"]].add(therapeutic["id"])
+        self.propositions[combination].add(proposition["id"])
+        self.statements[combination].append(statement["id"])
+
+    def _add_therapy(self, therapy: dict) -> None:
+        strategies = stats.extension_value(therapy, "therapy_strategy") or []
+        if isinstance(strategies, str):
+            strategies = [strategies]
+        therapy_type = stats.extension_value(therapy, "therapy_type")
+        self.therapies[therapy["id"]] = {
+            "id": therapy["id"],
+            "name": therapy.get("name"),
+            "therapy_strategy": strategies,
+            "therapy_type": therapy_type,
+        }
+        if therapy.get("name"):
+            self.names[therapy["name"].casefold()] = therapy["id"]
+        for strategy in strategies:
+            self.by_strategy[strategy.casefold()].add(therapy["id"])
+        if therapy_type:
+            self.by_type[therapy_type.casefold()].add(therapy["id"])
+
+    def resolve(self, therapy) -> int:
+        """
+        Returns the id of a therapy given its id or its name, matched case insensitively.
+
+        Args:
+            therapy (int | str): Id of the therapy, such as `12` or `"12"`, or its name, such as `Osimertinib`.
+
+        Returns:
+            int: The therapy's id.
+
+        Raises:
+            KeyError: If no statement involves the therapy.
+        """
+        if isinstance(therapy, str) and therapy.casefold() in self.names:
+            return self.names[therapy.casefold()]
+        if str(therapy).isdigit() and int(therapy) in self.therapies:
+            return int(therapy)
+        raise KeyError(f"Therapy not found: {therapy}")
+
+    def with_therapy(self, therapy) -> list[int]:
+        """
+        Returns the statements in which a therapy appears, alone or in any combination.
+
+        Args:
+            therapy (int | str): Id or name of the therapy.
+
+        Returns:
+            list[int]: Statement ids.
+        """
+        return list(self.by_therapy[self.resolve(therapy)])
+
+    def exact(self, therapies: list) -> list[int]:
+        """
+        Returns the statements whose therapeutic is exactly the given therapy or combination of therapies.
+
+        Args:
+            therapies (list[int | str]): Ids or names of the therapies.
+
+        Returns:
+            list[int]: Statement ids.
+        """
+        return list(
+            self.statements.get(
+                frozenset(self.resolve(therapy) for therapy in therapies), []
+            )
+        )
+
+    def supersets(self, therapies: list) -> list[frozenset[int]]:
+        """
+        Returns the combinations that include all of the given therapies, such as every combination with
+        osimertinib and chemotherapy.
+
+        Args:
+            therapies (list[int | str]): Ids or names of the therapies.
+
+        Returns:
+            list[frozenset[int]]: Combinations, ordered by size and then by therapy ids.
+        """
+        ids = [self.resolve(therapy) for therapy in therapies]
+        if not ids:
+            return self._sorted(self.statements)
+        found = set.intersection(*(self.combinations[therapy_id] for therapy_id in ids))
+        return self._sorted(found)
+
+    def subsets(self, therapies: list) -> list[frozenset[int]]:
+        """
+        Returns the combinations made only of the given therapies, such as the regimens available with a formulary.
+
+        Args:
+            therapies (list[int | str]): Ids or names of the therapies.
+
+        Returns:
+            list[frozenset[int]]: Combinations, ordered by size and then by therapy ids.
+        """
+        ids = frozenset(self.resolve(therapy) for therapy in therapies)
+        found = {
+            combination
+            for therapy_id in ids
+            for combination in self.combinations[therapy_id]
+            if combination <= ids
+        }
+        return self._sorted(found)
+
+    def with_strategy(self, strategy: str) -> set[int]:
+        """
+        Returns the therapies with a therapy strategy, such as `EGFR inhibition`, matched case insensitively.
+        """
+        return set(self.by_strategy.get(strategy.casefold(), set()))
+
+    def with_type(self, therapy_type: str) -> set[int]:
+        """
+        Returns the therapies of a therapy type, such as `Targeted therapy`, matched case insensitively.
+        """
+        return set(self.by_type.get(therapy_type.casefold(), set()))
+
+    def statements_of(self, combinations: list[frozenset[int]]) -> list[int]:
+        """
+        Returns the statements of combinations, such as those returned by `supersets` or `subsets`.
+
+        Args:
+            combinations (list[frozenset[int]]): Combinations of therapy ids.
+
+        Returns:
+            list[int]: Sorted statement ids.
+        """
+        return sorted(
+            {
+                statement_id
+                for combination in combinations
+                for statement_id in self.statements[combination]
+            }
+        )
+
+    def query(
+        self,
+        therapies: list,
+        match: str = "includes",
+        strategy: str | None = None,
+        therapy_type: str | None = None,
+    ) -> list[dict]:
+        """
+        Returns the combinations that match the given therapies, with the names of their therapies and their
+        statements.
+
+        Args:
+            therapies (list[int | str]): Ids or names of the therapies.
+            match (str): `includes` for combinations that include all of the therapies, `exact` for the combination
+                of exactly the therapies, or `subset` for combinations made only of the therapies.
+            strategy (str | None): If given, also require a therapy with this therapy strategy.
+            therapy_type (str | None): If given, also require a therapy of this therapy type.
+
+        Returns:
+            list[dict]: For each combination, the `therapies` it is made of, by id and name, and its `statements`.
+
+        Raises:
+            KeyError: If no statement involves one of the therapies.
+            ValueError: If `match` is not one of `MATCHES`.
+        """
+        if match == "exact":
+            ids = frozenset(self.resolve(therapy) for therapy in therapies)
+            results = [ids] if ids in self.statements else []
+        elif match == "subset":
+            results = self.subsets(therapies)
+        elif match == "includes":
+            results = self.supersets(therapies)
+        else:
+            raise ValueError(f"Match must be one of {', '.join(self.MATCHES)}: {match}")
+        if strategy:
+            matching = self.with_strategy(strategy)
+            results = [combination for combination in results if combination & matching]
+        if therapy_type:
+            matching = self.with_type(therapy_type)
+            results = [combination for combination in results if combination & matching]
+        return [
+            {
+                "therapies": [
+                    {"id": therapy_id, "name": self.therapies[therapy_id]["name"]}
+                    for therapy_id in sorted(combination)
+                ],
+                "statements": self.statements[combination],
+            }
+            for combination in results
+        ]
+
+    @staticmethod
+    def _sorted(combinations) -> list[frozenset[int]]:
+        return sorted(
+            combinations,
+            key=lambda combination: (len(combination), sorted(combination)),
+        )
+
+
+def build(statements: list[dict]) -> TherapyIndex:
+    """
+    Builds a therapy index over dereferenced statements.
+
+    Args:
+        statements (list[dict]): Dereferenced statement records.
+
+    Returns:
+        TherapyIndex: The index.
+    """
+    index = TherapyIndex()
+    for statement in statements:
+        index.add(statement)
+    return index
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(
+        prog="therapy_index",
+        description="lists moalmanac db statements by therapy, therapy combination, strategy, or type.",
+    )
+    arg_parser.add_argument(
+        "therapies",
+        nargs="*",
+        help="ids or names of therapies, such as osimertinib",
+    )
+    arg_parser.add_argument(
+        "--input",
+        help="dereferenced json file, as written by utils.dereference",
+        default="moalmanac-draft.dereferenced.json",
+    )
+    query = arg_parser.add_mutually_exclusive_group()
+    query.add_argument(
+        "--exact",
+        action="store_true",
+        help="only list statements whose therapeutic is exactly the given therapies",
+    )
+    query.add_argument(
+        "--subset",
+        action="store_true",
+        help="list statements of combinations made only of the given therapies",
+    )
+    arg_parser.add_argument(
+        "--strategy",
+        help="also require a therapy with this therapy strategy, such as 'EGFR inhibition'",
+    )
+    arg_parser.add_argument(
+        "--type",
+        dest="therapy_type",
+        help="also require a therapy of this therapy type, such as 'Targeted therapy'",
+    )
+    arg_parser.add_argument(
+        "--json",
+        action="store_true",
+        help="print combinations and their statements as json",
+    )
+    args = arg_parser.parse_args()
+
+    if args.exact:
+        match = "exact"
+    elif args.subset:
+        match = "subset"
+    else:
+        match = "includes"
+    therapy_index = build(read.json_records(file=args.input)["content"])
+    try:
+        rows = therapy_index.query(
+            args.therapies,
+            match=match,
+            strategy=args.strategy,
+            therapy_type=args.therapy_type,
+        )
+    except KeyError as e:
+        arg_parser.exit(1, f"{e.args[0]}\n")
+
+    if args.json:
+        print(json.dumps(rows, indent=2))
+    else:
+        for row in rows:
+            names = " + ".join(therapy["name"] for therapy in row["therapies"])
+            statements = ", ".join(map(str, row["statements"]))
+            print(f"{names} ({len(row['statements'])}): {statements}")
+        if not rows:
+            print("No statements found.")
@@ -0,0 +1,247 @@
+from __future__ import annotations
+
+import argparse
+import functools
+import json
+import os
+import sys
+import typing
+
+# Local imports
+from utils import read
+
+try:
+    import fastjsonschema
+except ImportError:
+    fastjsonschema = None
+
+if typing.TYPE_CHECKING:
+    from utils.cache import BuildCache
+
+SCHEMA_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "schemas"
+)
+TABLES = ["about", *read.REFERENCED_TABLES]
+
+
+def load_schema(table: str, directory: str = SCHEMA_DIR) -> dict:
+    """
+    Loads the JSON Schema of a referenced table.
+
+    Args:
+        table (str): Name of the table, such as `biomarkers`, or `about`.
+        directory (str): Folder containing one `<table>.json` schema per table (default: schemas/).
+
+    Returns:
+        dict: The schema.
+    """
+    return read.json_records(file=os.path.join(directory, f"{table}.json"))
+
+
+def record_schema(schema: dict) -> dict:
+    """
+    Returns the schema of a single record of a table schema, keeping the table schema's definitions so that
+    references to them still resolve.
+
+    Args:
+        schema (dict): A table schema, whose `items` describe each record.
+
+    Returns:
+        dict: The record schema.
+    """
+    return {
+        "$schema": schema.get("$schema"),
+        **schema["items"],
+        "definitions": schema.get("definitions", {}),
+    }
+
+
+def _require_fastjsonschema() -> None:
+    if fastjsonschema is None:
+        raise ImportError(
+            "Validation requires the fastjsonschema package; install it with pip install fastjsonschema."
+        )
+
+
+@functools.cache
+def _compile(code: str) -> typing.Callable:
+    # The code is generated by fastjsonschema from our own schemas, as fastjsonschema.compile does itself
+    namespace = {}
+    exec(compile(code, "<validator>", "exec"), namespace)  # noqa: S102
+    return namespace["validate"]
+
+
+def compiled(schema: dict, cache: BuildCache | None = None) -> typing.Callable:
+    """
+    Compiles a schema to a validator function. Code generation is done by fastjsonschema; the generated source is
+    kept in the build cache, keyed by the schema and the fastjsonschema version, and compiled validators are kept in
+    memory, so each schema is only translated once.
+
+    Args:
+        schema (dict): The schema to compile.
+        cache (BuildCache | None): An instance of utils.cache.BuildCache to keep generated code in, or None.
+
+    Returns:
+        Callable: A function that takes data and a `name_prefix` and raises
+            fastjsonschema.JsonSchemaValueException at the first violation.
+
+    Raises:
+        ImportError: If fastjsonschema is not installed.
+    """
+    _require_fastjsonschema()
+    serialized = json.dumps(schema, sort_keys=True)
+    code = None
+    if cache is not None:
+        key = cache.digest("validator", fastjsonschema.VERSION, serialized)
+        code = cache.get(key)
+    if code is None:
+        code = fastjsonschema.compile_to_code(schema)
+        if cache is not None:
+            cache.put(key, code)
+    return _compile(code)
+
+
+def validate_table(
+    table: str, records, schema: dict | None = None, cache: BuildCache | None = None
+) -> list[str]:
+    """
+    Validates a table against its schema. The whole table is first checked in one call of the compiled table
+    validator; only if that fails is each record checked on its own, so that every invalid record is reported.
+
+    Args:
+        table (str): Name of the table.
+        records (list[dict] | dict): The table's records, or the metadata dictionary for `about`.
+        schema (dict | None): The table's schema. If None, loaded with `load_schema`.
+        cache (BuildCache | None): An instance of utils.cache.BuildCache to keep generated code in, or None.
+
+    Returns:
+        list[str]: One message per violation found, prefixed with the table and record id; empty if the table is
+            valid.
+    """
+    if schema is None:
+        schema = load_schema(table)
+    try:
+        compiled(schema, cache=cache)(records, name_prefix=table)
+        return []
+    except fastjsonschema.JsonSchemaValueException as e:
+        if schema.get("type") != "array" or not isinstance(records, list):
+            return [e.message]
+
+    validate_record = compiled(record_schema(schema), cache=cache)
+    errors = []
+    for index, record in enumerate(records):
+        record_id = record.get("id", index) if isinstance(record, dict) else index
+        try:
+            validate_record(record, name_prefix=f"{table}[{record_id!r}]")
+        except fastjsonschema.JsonSchemaValueException as e:
+            errors.append(e.message)
+    return errors
+
+
+def validate_files(
+    input_paths: dict, cache: BuildCache | None = None
+) -> dict[str, list[str]]:
+    """
+    Validates referenced JSON files against their schemas.
+
+    With a cache, files are parsed through the cache, and a file that has passed validation is not validated again
+    until its content or its schema changes.
+
+    Args:
+        input_paths (dict): Dictionary of paths to referenced JSON files, keyed by table name.
+        cache (BuildCache | None): An instance of utils.cache.BuildCache, or None.
+
+    Returns:
+        dict[str, list[str]]: Violations of each invalid table, keyed by table name; empty if every file is valid.
+
+    Raises:
+        ImportError: If fastjsonschema is not installed.
+    """
+    _require_fastjsonschema()
+    invalid = {}
+    for table, path in input_paths.items():
+        schema = load_schema(table)
+        if cache is None:
+            errors = validate_table(table, read.json_records(file=path), schema=schema)
+        else:
+            digest = cache.file_digest(path)
+            key = cache.digest(
+                "valid",
+                fastjsonschema.VERSION,
+                digest,
+                json.dumps(schema, sort_keys=True),
+            )
+            if cache.get(key):
+                continue
+            errors = validate_table(
+                table, cache.parsed(path, digest=digest), schema=schema, cache=cache
+            )
+            if not errors:
+                cache.put(key, True)
+        if errors:
+            invalid[table] = errors
+    return invalid
+
+
+def report(
+    invalid: dict[str, list[str]], limit: int | None = None, file=sys.stdout
+) -> None:
+    """
+    Prints violations returned by `validate_files`.
+
+    Args:
+        invalid (dict[str, list[str]]): Violations keyed by table name.
+        limit (int | None): Maximum number of violations to print per table, or None for all.
+        file: Stream to print to (default: stdout).
+    """
+    for table, errors in invalid.items():
+        for message in errors[:limit]:
+            print(message, file=file)
+        if limit is not None and len(errors) > limit:
+            print(f"{table}: {len(errors) - limit} more violations", file=file)
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(
+        prog="validate",
+        description="validates referenced moalmanac db json files against their json schemas.",
+    )
+    arg_parser.add_argument(
+        "--referenced",
+        help="directory of referenced json files",
+        default="referenced",
+    )
+    arg_parser.add_argument(
+        "--table",
+        action="append",
+        dest="tables",
+        choices=TABLES,
+        help="table to validate; repeat for several. Default: all tables",
+    )
+    arg_parser.add_argument(
+        "--cache",
+        action=argparse.BooleanOptionalAction,
+        default=True,
+        help="keep generated validators and validation results in the build cache. Use --no-cache to skip",
+    )
+    arg_parser.add_argument(
+        "--cache-dir",
+        help="directory for the build cache. Default: .moalmanac-cache",
+        default=".moalmanac-cache",
+    )
+    args = arg_parser.parse_args()
+
+    build_cache = None
+    if args.cache:
+        from utils.cache import BuildCache
+
+        build_cache = BuildCache(directory=args.cache_dir)
+    paths = {
+        table: os.path.join(args.referenced, f"{table}.json")
+        for table in args.tables or TABLES
+    }
+    found = validate_files(paths, cache=build_cache)
+    report(found)
+    if found:
+        raise SystemExit(1)
+    print(f"{len(paths)} tables match their schemas.")
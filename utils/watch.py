@@ -0,0 +1,450 @@
+from __future__ import annotations
+
+import json
+import os
+import sys
+import time
+import typing
+
+# Local imports
+from utils import dereference
+from utils import read
+from utils import validate
+
+if typing.TYPE_CHECKING:
+    from utils.cache import BuildCache
+
+try:
+    import inotify_simple
+except ImportError:
+    inotify_simple = None
+
+
+class PollingWatcher:
+    """
+    Detects changes to a set of files by comparing their modification time and size at a fixed interval.
+
+    Attributes:
+        paths (list[str]): Paths of the files to watch.
+        interval (float): Seconds to wait between polls.
+    """
+
+    def __init__(self, paths: list[str], interval: float = 0.2):
+        """
+        Initializes the watcher and records the current state of each file.
+
+        Args:
+            paths (list[str]): Paths of the files to watch.
+            interval (float): Seconds to wait between polls.
+        """
+        self.paths = paths
+        self.interval = interval
+        self._state = {path: self._stat(path) for path in paths}
+
+    @staticmethod
+    def _stat(path: str) -> tuple[int, int] | None:
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def wait(self) -> set[str]:
+        """
+        Blocks until at least one watched file changes.
+
+        Returns:
+            set[str]: Paths of the files that changed.
+        """
+        while True:
+            time.sleep(self.interval)
+            changed = set()
+            for path in self.paths:
+                state = self._stat(path)
+                if state != self._state[path]:
+                    self._state[path] = state
+                    changed.add(path)
+            if changed:
+                return changed
+
+    def close(self) -> None:
+        """
+        Releases resources held by the watcher. Polling holds none.
+        """
+
+
+class InotifyWatcher:
+    """
+    Detects changes to a set of files with Linux inotify, via the optional `inotify_simple` package. Parent
+    directories are watched, rather than the files themselves, so that editors which save by writing a new file
+    and renaming it over the original are detected.
+
+    Attributes:
+        paths (list[str]): Paths of the files to watch.
+        debounce (float): Seconds to wait for further events after the first, so one save triggers one rebuild.
+    """
+
+    def __init__(self, paths: list[str], debounce: float = 0.05):
+        """
+        Initializes the watcher and registers a watch for each parent directory.
+
+        Args:
+            paths (list[str]): Paths of the files to watch.
+            debounce (float): Seconds to wait for further events after the first.
+        """
+        self.paths = paths
+        self.debounce = debounce
+        self._inotify = inotify_simple.INotify()
+        flags = (
+            inotify_simple.flags.CLOSE_WRITE
+            | inotify_simple.flags.MOVED_TO
+            | inotify_simple.flags.CREATE
+        )
+        self._directories = {}
+        for path in paths:
+            directory = os.path.dirname(os.path.abspath(path))
+            if directory not in self._directories.values():
+                descriptor = self._inotify.add_watch(directory, flags)
+                self._directories[descriptor] = directory
+        self._targets = {os.path.abspath(path): path for path in paths}
+
+    def wait(self) -> set[str]:
+        """
+        Blocks until at least one watched file changes.
+
+        Returns:
+            set[str]: Paths of the files that changed.
+        """
+        while True:
+            events = self._inotify.read()
+            events += self._inotify.read(timeout=int(self.debounce * 1000))
+            changed = set()
+            for event in events:
+                path = os.path.join(self._directories[event.wd], event.name)
+                if path in self._targets:
+                    changed.add(self._targets[path])
+            if changed:
+                return changed
+
+    def close(self) -> None:
+        """
+        Closes the inotify file descriptor.
+        """
+        self._inotify.close()
+
+
+def file_watcher(
+    paths: list[str], interval: float = 0.2, polling: bool = False
+) -> InotifyWatcher | PollingWatcher:
+    """
+    Returns an inotify based watcher when available, otherwise a polling watcher.
+
+    Args:
+        paths (list[str]): Paths of the files to watch.
+        interval (float): Seconds to wait between polls, if polling.
+        polling (bool): If True, always use polling.
+
+    Returns:
+        InotifyWatcher | PollingWatcher: The watcher.
+    """
+    if not polling and inotify_simple is not None:
+        try:
+            return InotifyWatcher(paths)
+        except OSError:
+            pass
+    return PollingWatcher(paths, interval=interval)
+
+
+class IncrementalBuild:
+    """
+    Keeps the parsed and dereferenced Database resident so that a change to one referenced file only re-parses the
+    tables that depend on it, re-resolves them, and rewrites the outputs whose content changed.
+
+    Attributes:
+        input_paths (dict): Dictionary of paths to referenced JSON files, keyed by table name and `about`.
+        output (str): File path for the dereferenced JSON output.
+        write_concepts (bool): If True, also write per-concept JSON files to dereferenced/<entity>/.
+        quiet (bool): Suppress print statements when writing individual entities if True.
+        cache (BuildCache | None): Build cache that tables are loaded from and stored in, or None.
+        check_schemas (bool): If True, changed files are validated against their schemas before they are used.
+        stats_file (str | None): File path to write summary statistics of the statements to, or None to skip.
+        binary_file (str | None): File path to write the binary encoding of the dereferenced database to, or None to
+            skip.
+        rankings_file (str | None): File path to write the rank order of the statements to, or None to skip.
+    """
+
+    def __init__(
+        self,
+        input_paths: dict,
+        output: str,
+        write_concepts: bool = True,
+        quiet: bool = False,
+        cache: BuildCache | None = None,
+        check_schemas: bool = False,
+        stats_file: str | None = None,
+        binary_file: str | None = None,
+        rankings_file: str | None = None,
+    ):
+        """
+        Initializes the build. No files are read until `build` is called.
+
+        Args:
+            input_paths (dict): Dictionary of paths to referenced JSON files, keyed by table name and `about`.
+            output (str): File path for the dereferenced JSON output.
+            write_concepts (bool): If True, also write per-concept JSON files to dereferenced/<entity>/.
+            quiet (bool): Suppress print statements when writing individual entities if True.
+            cache (BuildCache | None): An instance of utils.cache.BuildCache, or None to build without a cache.
+            check_schemas (bool): If True, validate changed files against their schemas before using them.
+            stats_file (str | None): File path to write summary statistics of the statements to, or None to skip.
+            binary_file (str | None): File path to write the binary encoding of the dereferenced database to, or
+                None to skip.
+            rankings_file (str | None): File path to write the rank order of the statements to, or None to skip.
+        """
+        self.input_paths = input_paths
+        self.output = output
+        self.write_concepts = write_concepts
+        self.quiet = quiet
+        self.cache = cache
+        self.check_schemas = check_schemas
+        self.stats_file = stats_file
+        self.binary_file = binary_file
+        self.rankings_file = rankings_file
+        self.about = None
+        self.db = None
+        self._written = {}
+        self._fragments = {}
+
+    def build(self) -> None:
+        """
+        Parses every referenced file, dereferences every table, and writes all outputs.
+        """
+        self.about = read.json_records(file=self.input_paths["about"])
+        self.db = dereference.load_database(self.input_paths, cache=self.cache)
+        tables = set(dereference.TABLE_CLASSES)
+        self._resolve(tables)
+        self._write(tables, about_changed=True)
+
+    def update(self, paths: set[str]) -> set[str]:
+        """
+        Re-parses the changed files, re-resolves affected tables, and rewrites affected outputs. If a changed file
+        is invalid or cannot be parsed or dereferenced, the previous state is kept and the error is re-raised.
+
+        Args:
+            paths (set[str]): Paths of referenced files that changed.
+
+        Returns:
+            set[str]: Names of the tables that were re-resolved.
+
+        Raises:
+            ValueError: If a changed file does not match its schema, or contains invalid JSON.
+        """
+        names = {name for name, path in self.input_paths.items() if path in paths}
+        about_changed = "about" in names
+        changed = names - {"about"}
+
+        if self.check_schemas and changed:
+            invalid = validate.validate_files(
+                {name: self.input_paths[name] for name in sorted(changed)},
+                cache=self.cache,
+            )
+            if invalid:
+                validate.report(invalid, limit=20, file=sys.stderr)
+                raise ValueError(
+                    f"Referenced files do not match their schemas: {', '.join(invalid)}"
+                )
+
+        previous_about = self.about
+        affected = dereference.dependents(changed)
+        previous_tables = {name: getattr(self.db, name) for name in affected}
+        try:
+            if about_changed:
+                self.about = read.json_records(file=self.input_paths["about"])
+            # Tables are resolved in place, so every affected table is parsed again rather than copied
+            for name in affected:
+                table = dereference.TABLE_CLASSES[name]
+                setattr(self.db, name, table(records=self._parse(name)))
+            self._resolve(affected)
+        except Exception:
+            self.about = previous_about
+            for name, table in previous_tables.items():
+                setattr(self.db, name, table)
+            raise
+        self._write(affected, about_changed=about_changed)
+        return affected
+
+    def _parse(self, name: str) -> list[dict]:
+        if self.cache is None:
+            return read.json_records(file=self.input_paths[name])
+        return self.cache.parsed(self.input_paths[name])
+
+    def _resolve(self, tables: set[str]) -> None:
+        for name in sorted(tables):
+            getattr(self.db, name).dereference(self.db)
+        if self.cache is not None:
+            keys = dereference.table_keys(self.input_paths, self.cache, tables=tables)
+            for name in tables:
+                table = getattr(self.db, name)
+                if table._cache_key != keys[name]:
+                    table._cache_key = keys[name]
+                    table._from_cache = False
+            dereference.store_database(self.db, self.cache)
+
+    def _write(self, tables: set[str], about_changed: bool) -> None:
+        statements_changed = False
+        for name, output_dir in dereference._CONCEPT_DIRS:
+            if name in tables:
+                changed = self._write_records(name, output_dir)
+                statements_changed |= name == "statements" and changed
+        if statements_changed or about_changed:
+            dereference.write_outputs(
+                self.db,
+                about=self.about,
+                input_paths=self.input_paths,
+                output=self.output,
+                cache=self.cache,
+                stats_file=self.stats_file,
+                binary_file=self.binary_file,
+                rankings_file=self.rankings_file,
+                serialized=self._serialize(),
+            )
+
+    def _write_records(self, name: str, output_dir: str) -> bool:
+        """
+        Serializes the records of a table and writes those whose content differs from what was last written, then
+        removes files of records that no longer exist.
+
+        Records are compared with the records last written, which is much faster than serializing them, so only
+        changed records pay for serialization. Equal values of different JSON types, such as 1 and 1.0, compare
+        equal; a change of type alone is picked up by the next full build.
+
+        Returns:
+            bool: True if any record was added, changed, removed, or reordered.
+        """
+        previous = self._written.get(name, {})
+        current = {}
+        changed = False
+        for record in getattr(self.db, name).records:
+            cached = previous.get(record["id"])
+            if cached is not None and cached[0] == record:
+                current[record["id"]] = (record, cached[1])
+                continue
+            changed = True
+            pretty = json.dumps(record, indent=2)
+            current[record["id"]] = (record, pretty)
+            if self.write_concepts:
+                self._write_file(
+                    os.path.join(output_dir, f"{record['id']}.json"), pretty
+                )
+        removed = previous.keys() - current.keys()
+        if self.write_concepts:
+            for record_id in removed:
+                path = os.path.join(output_dir, f"{record_id}.json")
+                if os.path.exists(path):
+                    os.remove(path)
+        changed |= bool(removed) or list(previous) != list(current)
+        self._written[name] = current
+        return changed
+
+    def _write_file(self, path: str, content: str) -> None:
+        with open(path, "w") as outfile:
+            outfile.write(content)
+        if not self.quiet:
+            print(f"JSON successfully written to {path}")
+
+    def _serialize(self) -> str:
+        """
+        Serializes the dereferenced JSON output from cached serializations of each statement, indented once per
+        serialization. The result is identical to serializing `{"about": ..., "content": [...]}` with `indent=2`.
+        """
+        statements = self._written["statements"]
+        fragments = {}
+        for record_id, (_, pretty) in statements.items():
+            cached = self._fragments.get(record_id)
+            if cached is not None and cached[0] is pretty:
+                fragments[record_id] = cached
+            else:
+                fragments[record_id] = (
+                    pretty,
+                    "    " + pretty.replace("\n", "\n    "),
+                )
+        self._fragments = fragments
+        about = json.dumps(self.about, indent=2).replace("\n", "\n  ")
+        content = ",\n".join(
+            fragments[record["id"]][1] for record in self.db.statements.records
+        )
+        if content:
+            content = f"[\n{content}\n  ]"
+        else:
+            content = "[]"
+        return f'{{\n  "about": {about},\n  "content": {content}\n}}'
+
+
+def run(
+    input_paths: dict,
+    output: str,
+    write_concepts: bool = True,
+    quiet: bool = False,
+    interval: float = 0.2,
+    polling: bool = False,
+    log: typing.Callable[[str], None] = print,
+    cache: BuildCache | None = None,
+    check_schemas: bool = False,
+    stats_file: str | None = None,
+    binary_file: str | None = None,
+    rankings_file: str | None = None,
+) -> None:
+    """
+    Builds the dereferenced outputs once, then rebuilds affected outputs whenever a referenced file changes. Runs
+    until interrupted.
+
+    Args:
+        input_paths (dict): Dictionary of paths to referenced JSON files, keyed by table name and `about`.
+        output (str): File path for the dereferenced JSON output.
+        write_concepts (bool): If True, also write per-concept JSON files to dereferenced/<entity>/.
+        quiet (bool): Suppress print statements when writing individual entities if True.
+        interval (float): Seconds to wait between polls, if polling.
+        polling (bool): If True, poll for changes even if inotify is available.
+        log (typing.Callable[[str], None]): Function used to report progress.
+        cache (BuildCache | None): An instance of utils.cache.BuildCache, or None to build without a cache.
+        check_schemas (bool): If True, validate changed files against their schemas before rebuilding.
+        stats_file (str | None): File path to write summary statistics of the statements to, or None to skip.
+        binary_file (str | None): File path to write the binary encoding of the dereferenced database to, or None to
+            skip.
+        rankings_file (str | None): File path to write the rank order of the statements to, or None to skip.
+    """
+    build = IncrementalBuild(
+        input_paths=input_paths,
+        output=output,
+        write_concepts=write_concepts,
+        quiet=quiet,
+        cache=cache,
+        check_schemas=check_schemas,
+        stats_file=stats_file,
+        binary_file=binary_file,
+        rankings_file=rankings_file,
+    )
+    start = time.perf_counter()
+    build.build()
+    log(f"Initial build finished in {time.perf_counter() - start:.2f}s")
+
+    watcher = file_watcher(
+        list(input_paths.values()), interval=interval, polling=polling
+    )
+    log(f"Watching {len(input_paths)} referenced files with {type(watcher).__name__}")
+    try:
+        while True:
+            changed = watcher.wait()
+            start = time.perf_counter()
+            try:
+                affected = build.update(changed)
+            except (json.JSONDecodeError, KeyError, OSError, ValueError) as e:
+                log(f"Rebuild failed, keeping previous outputs: {e}")
+                continue
+            log(
+                f"Rebuilt {', '.join(sorted(affected)) or 'about'} after changes to "
+                f"{', '.join(sorted(changed))} in {time.perf_counter() - start:.2f}s"
+            )
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.close()
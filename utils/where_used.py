@@ -0,0 +1,169 @@
+import argparse
+import collections
+import json
+
+# Local imports
+from utils import dereference
+from utils import read
+
+
+class ReverseIndex:
+    """
+    An index from each referenced record to the records that reference it, built from each table's `references`,
+    which covers the declared `foreign_keys` and the therapies and therapy groups that propositions resolve in
+    `Propositions.dereference_therapeutics`.
+
+    Attributes:
+        ids (dict[str, dict[str, object]]): For each table, its record ids keyed by their string form, so that ids
+            given on the command line can be matched to integer or string ids.
+        users (dict[tuple[str, object], list[tuple[str, object]]]): For each `(table, id)`, the `(table, id)` of
+            records that reference it directly.
+    """
+
+    def __init__(self, data: dict[str, list[dict]]):
+        """
+        Builds the index.
+
+        Args:
+            data (dict[str, list[dict]]): Referenced records keyed by table name.
+        """
+        self.ids = {}
+        self.users = collections.defaultdict(list)
+        for name, table_class in dereference.TABLE_CLASSES.items():
+            records = data.get(name, [])
+            self.ids[name] = {str(record["id"]): record["id"] for record in records}
+            for record in records:
+                for reference in dict.fromkeys(table_class.references(record)):
+                    self.users[reference].append((name, record["id"]))
+
+    def resolve(self, table: str, record_id) -> tuple[str, object]:
+        """
+        Returns the key of a record, matching its id by string form.
+
+        Args:
+            table (str): Name of the record's table.
+            record_id: Id of the record, such as `12` or `"12"`.
+
+        Returns:
+            tuple[str, object]: The table name and the record's id as stored.
+
+        Raises:
+            KeyError: If the table or the record does not exist.
+        """
+        if table not in self.ids:
+            raise KeyError(f"Table not found: {table}")
+        if str(record_id) not in self.ids[table]:
+            raise KeyError(f"Record not found in {table}: {record_id}")
+        return table, self.ids[table][str(record_id)]
+
+    def direct(self, table: str, record_id) -> list[tuple[str, object]]:
+        """
+        Returns the records that reference a record directly.
+
+        Args:
+            table (str): Name of the record's table.
+            record_id: Id of the record.
+
+        Returns:
+            list[tuple[str, object]]: Pairs of table name and record id.
+        """
+        return list(self.users.get(self.resolve(table, record_id), []))
+
+    def where_used(
+        self, table: str, record_id, tables: list[str] | None = None
+    ) -> dict[str, list]:
+        """
+        Returns every record that references a record, directly or transitively, such as the statements that would
+        be affected by a change to a coding.
+
+        Args:
+            table (str): Name of the record's table.
+            record_id: Id of the record.
+            tables (list[str] | None): Tables to report dependent records of. If None, all tables.
+
+        Returns:
+            dict[str, list]: Sorted ids of dependent records, keyed by table name in dependency order. Tables
+                without dependent records are omitted.
+
+        Raises:
+            KeyError: If the table or the record does not exist.
+        """
+        start = self.resolve(table, record_id)
+        found = set()
+        queue = collections.deque([start])
+        while queue:
+            for user in self.users.get(queue.popleft(), []):
+                if user not in found:
+                    found.add(user)
+                    queue.append(user)
+
+        dependents = collections.defaultdict(list)
+        for name, user_id in found:
+            if tables is None or name in tables:
+                dependents[name].append(user_id)
+        return {
+            name: sorted(dependents[name], key=lambda value: (str(type(value)), value))
+            for name in dereference.topological_order()
+            if name in dependents
+        }
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(
+        prog="where-used",
+        description="lists every record that depends on a referenced record, such as the statements affected by "
+        "changing a coding, therapy, or document.",
+    )
+    arg_parser.add_argument(
+        "table",
+        choices=list(dereference.TABLE_CLASSES),
+        help="table of the record",
+    )
+    arg_parser.add_argument(
+        "id",
+        help="id of the record",
+    )
+    arg_parser.add_argument(
+        "--referenced",
+        help="directory of referenced json files",
+        default="referenced",
+    )
+    arg_parser.add_argument(
+        "--table",
+        action="append",
+        dest="tables",
+        choices=list(dereference.TABLE_CLASSES),
+        help="table to list dependent records of; repeat for several. Default: all tables",
+    )
+    arg_parser.add_argument(
+        "--direct",
+        action="store_true",
+        help="only list records that reference the record directly",
+    )
+    arg_parser.add_argument(
+        "--json",
+        action="store_true",
+        help="print dependent records as json",
+    )
+    args = arg_parser.parse_args()
+
+    index = ReverseIndex(read.referenced(args.referenced))
+    try:
+        if args.direct:
+            result = collections.defaultdict(list)
+            for name, user_id in index.direct(args.table, args.id):
+                if args.tables is None or name in args.tables:
+                    result[name].append(user_id)
+            result = dict(result)
+        else:
+            result = index.where_used(args.table, args.id, tables=args.tables)
+    except KeyError as e:
+        arg_parser.exit(1, f"{e.args[0]}\n")
+
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        for name, ids in result.items():
+            print(f"{name} ({len(ids)}): {', '.join(str(user_id) for user_id in ids)}")
+        if not result:
+            print(f"No records depend on {args.table} {args.id}.")
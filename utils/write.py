@@ -1,5 +1,13 @@
 import json
 
+# Local imports
+from utils import read
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
 
 def dictionary(
     data: dict,
@@ -77,3 +85,119 @@ def records(data: list[dict], file: str) -> None:
         print(f"JSON successfully written to {file}")
     except IOError as e:
         raise IOError(f"Failed to write to file {file}: {e}")
+
+
+def serialized(content: str, file: str, quiet: bool = False) -> None:
+    """
+    Writes an already serialized JSON string to a file.
+
+    Args:
+        content (str): The serialized JSON.
+        file (str): The output file path.
+        quiet (bool): Suppress print statement if True
+
+    Raises:
+        OSError: If writing to the file fails.
+    """
+    try:
+        with open(file, "w") as outfile:
+            outfile.write(content)
+        if not quiet:
+            print(f"JSON successfully written to {file}")
+    except OSError as e:
+        raise OSError(f"Failed to write to file {file}: {e}") from e
+
+
+def encode_binary(data) -> bytes:
+    """
+    Encodes JSON data in the compact binary format read by utils.read.decode_binary.
+
+    Every distinct string, including keys, is stored once in a string table, and every distinct object or array once
+    in a node table, with its strings and nested nodes replaced by their index. Repeated values, such as coding
+    systems, extension names and descriptions, and records embedded in many statements, therefore cost one index per
+    use. The tables are serialized with MessagePack.
+
+    Args:
+        data: JSON serializable data.
+
+    Returns:
+        bytes: The encoded data.
+
+    Raises:
+        ImportError: If msgpack is not installed.
+        TypeError: If the data contains values that cannot be represented in JSON.
+    """
+    if msgpack is None:
+        raise ImportError(
+            "Writing binary files requires the msgpack package; install it with pip install msgpack."
+        )
+    strings = {}
+    nodes = []
+    node_ids = {}
+    # Objects already encoded, by identity, so objects that are shared in memory are only visited once
+    seen = {}
+
+    def value(item):
+        if isinstance(item, str):
+            if item not in strings:
+                strings[item] = len(strings)
+            return read.BINARY_STRING, strings[item]
+        if isinstance(item, (dict, list)):
+            if id(item) not in seen:
+                seen[id(item)] = (item, node(item))
+            return read.BINARY_NODE, seen[id(item)][1]
+        if item is None or isinstance(item, (bool, int, float)):
+            return read.BINARY_LITERAL, item
+        raise TypeError(
+            f"Object of type {type(item).__name__} is not JSON serializable"
+        )
+
+    def node(item):
+        if isinstance(item, dict):
+            keys = [value(str(key))[1] for key in item]
+            encoded = [value(child) for child in item.values()]
+        else:
+            keys = None
+            encoded = [value(child) for child in item]
+        kinds = bytes(kind for kind, _ in encoded)
+        values = [child for _, child in encoded]
+        # Types are part of the key so that 1, 1.0, and True are not merged
+        key = (
+            keys is None,
+            tuple(keys or ()),
+            kinds,
+            tuple((type(child), child) for child in values),
+        )
+        if key not in node_ids:
+            node_ids[key] = len(nodes)
+            nodes.append([kinds, values] if keys is None else [kinds, keys, values])
+        return node_ids[key]
+
+    root_kind, root = value(data)
+    return msgpack.packb(
+        [read.BINARY_FORMAT, read.BINARY_VERSION, list(strings), nodes, root_kind, root]
+    )
+
+
+def binary(data, file: str, quiet: bool = False, content: bytes | None = None) -> None:
+    """
+    Writes JSON data to a file in the compact binary format read by utils.read.binary_records.
+
+    Args:
+        data: JSON serializable data.
+        file (str): The output file path.
+        quiet (bool): Suppress print statement if True
+        content (bytes | None): The data already encoded by `encode_binary`, if available.
+
+    Raises:
+        OSError: If writing to the file fails.
+    """
+    if content is None:
+        content = encode_binary(data)
+    try:
+        with open(file, "wb") as outfile:
+            outfile.write(content)
+        if not quiet:
+            print(f"Binary successfully written to {file}")
+    except OSError as e:
+        raise OSError(f"Failed to write to file {file}: {e}")